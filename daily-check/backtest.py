@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+
+from batch import compute_signal_panel, get_universe_data
+from main import get_stored_historical_fng, process_fng
+
+
+BUY_SIGNALS = ('BUY', 'CAUTIOUS BUY')
+
+DAYS_PER_YEAR = 365.25
+
+
+def _previous(values: np.ndarray, fill) -> np.ndarray:
+    """Shift any-dtype array down one row along axis 0."""
+    result = np.empty_like(values)
+    result[0] = fill
+    result[1:] = values[:-1]
+    return result
+
+def _last_true_index(mask: np.ndarray) -> np.ndarray:
+    """Row index of the most recent True at or before each row, -1 if none yet."""
+    rows = np.arange(mask.shape[0]).reshape((-1,) + (1,) * (mask.ndim - 1))
+    return np.maximum.accumulate(np.where(mask, rows, -1), axis=0)
+
+def _money_weighted_return(contributions, final_value, years_to_end, iterations=100) -> np.ndarray:
+    """
+    Annualized money-weighted return (IRR) for every ticker at once.
+
+    Solves sum(c_t * (1 + r) ** y_t) = V_T with Newton steps vectorized across
+    tickers, where y_t is the time in years from contribution t to the last bar.
+    """
+    # Only contribution days carry cash flows
+    flow_rows = (contributions != 0).any(axis=1)
+    contributions, years_to_end = contributions[flow_rows], years_to_end[flow_rows]
+
+    rate = np.full(final_value.shape, 0.05)
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        for _ in range(iterations):
+            growth = (1 + rate) ** years_to_end
+            f = (contributions * growth).sum(axis=0) - final_value
+            df = (contributions * years_to_end * growth / (1 + rate)).sum(axis=0)
+            step = np.where(df != 0, f / df, 0.0)
+            rate = np.clip(rate - step, -0.99, 10.0)
+            if np.nanmax(np.abs(step), initial=0.0) < 1e-10:
+                break
+
+    return np.where(contributions.sum(axis=0) > 0, rate, np.nan)
+
+def _max_drawdown(values, flows, active) -> np.ndarray:
+    """
+    Largest peak-to-trough fall of the time-weighted unit value.
+
+    Contributions are stripped out of each day's return so new money does not
+    hide losses or count as gains.
+    """
+    prev_values = _previous(values, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        daily_growth = np.where(active & (prev_values > 0), (values - flows) / prev_values, 1.0)
+    unit_value = np.cumprod(daily_growth, axis=0)
+    peak = np.maximum.accumulate(unit_value, axis=0)
+    return (unit_value / peak - 1).min(axis=0)
+
+def simulate_dca(close, invest_mask, contributions, active, years_to_end) -> dict:
+    """
+    Simulate a DCA portfolio over a bars x tickers panel without per-day loops.
+
+    Contributions are set aside as cash, and all cash saved so far is invested at
+    the close on every day invest_mask is True.
+
+    Args:
+        close (np.ndarray): Closing prices, bars x tickers
+        invest_mask (np.ndarray): True on days the portfolio buys
+        contributions (np.ndarray): Cash added on each day
+        active (np.ndarray): True on days inside the backtest window
+        years_to_end (np.ndarray): Years from each bar to the last bar
+
+    Returns:
+        dict: Per-ticker arrays 'total_contributed', 'final_value', 'cash',
+              'cagr', 'max_drawdown' and 'avg_cost'
+    """
+    invest_mask = invest_mask & active
+    price = np.where(active, close, 0.0)
+
+    contributed = np.cumsum(contributions, axis=0)
+
+    # On a buy day everything contributed up to that day has been invested
+    last_buy = _last_true_index(invest_mask)
+    invested = np.where(
+        last_buy >= 0,
+        np.take_along_axis(contributed, np.maximum(last_buy, 0), axis=0),
+        0.0,
+    )
+    invested_today = np.diff(invested, axis=0, prepend=0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shares_bought = np.where(invested_today > 0, invested_today / price, 0.0)
+    shares = np.cumsum(shares_bought, axis=0)
+
+    cash = contributed - invested
+    values = shares * price + cash
+
+    final_value = values[-1]
+    total_shares = shares[-1]
+    total_invested = invested[-1]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_cost = np.where(total_shares > 0, total_invested / total_shares, np.nan)
+
+    return {
+        'total_contributed': contributed[-1],
+        'final_value': final_value,
+        'cash': cash[-1],
+        'cagr': _money_weighted_return(contributions, final_value, years_to_end),
+        'max_drawdown': _max_drawdown(values, contributions, active),
+        'avg_cost': avg_cost,
+    }
+
+def prepare_backtest(close_panel: pd.DataFrame, fng_df: pd.DataFrame, monthly_budget=1000.0,
+                     start_date=None) -> dict:
+    """
+    Build the signal panel and contribution schedule shared by every backtest.
+
+    Args:
+        close_panel (pd.DataFrame): Dates x tickers closing prices
+        fng_df (pd.DataFrame): Processed FNG data from process_fng()
+        monthly_budget (float): Cash contributed per month
+        start_date (str, optional): 'YYYY-MM-DD' first date to contribute on
+
+    Returns:
+        dict: 'panel' from compute_signal_panel(), plus bars x tickers arrays
+              'active', 'contributions' and 'years_to_end'
+    """
+    panel = compute_signal_panel(close_panel, fng_df)
+    dates = panel['date']
+
+    active = ~np.isnan(panel['200ma'])
+    if start_date is not None:
+        active &= dates >= np.datetime64(start_date, 'D')
+
+    # First active bar of every calendar month, per ticker
+    months = dates.astype('datetime64[M]')
+    new_month = (months != _previous(months, np.datetime64('NaT'))) | ~_previous(active, False)
+    contributions = np.where(active & new_month, float(monthly_budget), 0.0)
+
+    years_to_end = (dates[-1] - dates).astype('timedelta64[D]').astype(float) / DAYS_PER_YEAR
+    years_to_end = np.where(active, years_to_end, 0.0)
+
+    return {
+        'panel': panel,
+        'active': active,
+        'contributions': contributions,
+        'years_to_end': years_to_end,
+    }
+
+def run_backtest(close_panel: pd.DataFrame, fng_df: pd.DataFrame, monthly_budget=1000.0,
+                 start_date=None) -> pd.DataFrame:
+    """
+    Backtest the daily signal as a DCA strategy against naive monthly DCA.
+
+    Both strategies receive monthly_budget on the first trading day of every
+    month once a ticker has a full 200-day moving average. Naive DCA invests it
+    straight away; the signal strategy holds it as cash until the next BUY or
+    CAUTIOUS BUY day and then invests everything it has saved.
+
+    Args:
+        close_panel (pd.DataFrame): Dates x tickers closing prices
+        fng_df (pd.DataFrame): Processed FNG data from process_fng()
+        monthly_budget (float): Cash contributed per month
+        start_date (str, optional): 'YYYY-MM-DD' first date to contribute on
+
+    Returns:
+        pd.DataFrame: One row per ticker with signal strategy metrics, the same
+                      metrics prefixed with 'naive_', and the differences
+    """
+    inputs = prepare_backtest(close_panel, fng_df, monthly_budget=monthly_budget, start_date=start_date)
+    panel, active = inputs['panel'], inputs['active']
+    contributions, years_to_end = inputs['contributions'], inputs['years_to_end']
+    close, dates = panel['Close'], panel['date']
+    last_dates = dates[-1]
+
+    buy_days = np.isin(panel['signal'], BUY_SIGNALS)
+    strategy = simulate_dca(close, buy_days, contributions, active, years_to_end)
+    naive = simulate_dca(close, contributions > 0, contributions, active, years_to_end)
+
+    first_active = np.argmax(active, axis=0)[np.newaxis]
+    first_dates = np.where(active.any(axis=0), np.take_along_axis(dates, first_active, axis=0)[0], np.datetime64('NaT'))
+    results = pd.DataFrame({'start': first_dates, 'end': last_dates}, index=close_panel.columns)
+    for key, values in strategy.items():
+        results[key] = values
+    for key, values in naive.items():
+        results[f'naive_{key}'] = values
+
+    results['cagr_diff'] = results['cagr'] - results['naive_cagr']
+    results['avg_cost_diff_pct'] = (results['avg_cost'] / results['naive_avg_cost'] - 1) * 100
+    results.index.name = 'ticker'
+
+    return results
+
+def backtest_universe(tickers, monthly_budget=1000.0, period='max', start_date=None) -> pd.DataFrame:
+    """
+    Download full histories and backtest the signal for one or many tickers.
+
+    Args:
+        tickers (list): Ticker symbols to backtest
+        monthly_budget (float): Cash contributed per month
+        period (str): yfinance period string for the price history
+        start_date (str, optional): 'YYYY-MM-DD' first date to contribute on
+
+    Returns:
+        pd.DataFrame: Backtest metrics from run_backtest()
+    """
+    close_panel = get_universe_data(tickers, period=period)
+    fng_df = process_fng(get_stored_historical_fng())
+    return run_backtest(close_panel, fng_df, monthly_budget=monthly_budget, start_date=start_date)
+
+if __name__ == '__main__':
+    print(backtest_universe(['VOO']).T)
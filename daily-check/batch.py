@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+
+import http_pool
+from http_pool import YAHOO_TIMEOUT
+from kernel import MA_WINDOWS, bull_bear, lookup_by_date, rolling_mean, shift, signal
+from lazy import lazy_import
+from main import FETCH_TIMEOUTS, fetch_concurrently, get_stored_historical_fng, process_fng
+from price_cache import YAHOO_CHART_URL, fetch_history
+from replay import recorded
+
+
+yf = lazy_import('yfinance')
+
+# Seconds allowed for downloading a whole universe
+BATCH_DEADLINE_SECONDS = 300
+
+
+def get_universe_data(tickers, period='202d', group_size=100) -> pd.DataFrame:
+    """
+    Get closing prices for a universe of tickers using grouped yfinance downloads.
+
+    Args:
+        tickers (list): Ticker symbols to download (e.g., ['VOO', 'QQQ'])
+        period (str): yfinance period string, same as get_ticker_data()
+        group_size (int): Number of tickers requested per yf.download() call
+
+    Returns:
+        pd.DataFrame: Dates x tickers panel of closing prices. Dates are naive
+                      exchange-local dates, missing bars are NaN.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    panels = []
+
+    for i in range(0, len(tickers), group_size):
+        group = tickers[i:i + group_size]
+
+        # A local Yahoo stand-in only serves the per-ticker chart endpoint
+        if http_pool.resolve_url(YAHOO_CHART_URL) != YAHOO_CHART_URL:
+            panels.append(pd.DataFrame({ticker: fetch_history(ticker, period=period)['Close'] for ticker in group}))
+            continue
+
+        # One HTTP round trip per group instead of one per ticker
+        raw = recorded('yahoo', f"download {','.join(group)} period={period}", lambda: yf.download(
+            group,
+            period=period,
+            interval='1d',
+            auto_adjust=True,
+            actions=False,
+            group_by='column',
+            threads=True,
+            progress=False,
+            timeout=YAHOO_TIMEOUT,
+        ))
+
+        if raw is None or raw.empty:
+            print(f"No data returned for tickers: {group}")
+            continue
+
+        panels.append(raw['Close'])
+
+    if not panels:
+        return pd.DataFrame(columns=tickers, dtype=float)
+
+    close_panel = pd.concat(panels, axis=1)
+
+    # Match process_data(), which joins on the exchange-local calendar date
+    if close_panel.index.tz is not None:
+        close_panel.index = close_panel.index.tz_localize(None)
+    close_panel.index = close_panel.index.normalize()
+
+    return close_panel.reindex(columns=[t for t in tickers if t in close_panel.columns])
+
+def _align_to_latest(values: np.ndarray) -> np.ndarray:
+    """
+    Return row indices that push each column's NaNs to the top.
+
+    Valid bars keep their order, so every column ends on its own latest bar and
+    rolling windows only ever span real trading days for that ticker.
+    """
+    return np.argsort(~np.isnan(values), axis=0, kind='stable')
+
+def compute_signal_panel(close_panel: pd.DataFrame, fng_df: pd.DataFrame) -> dict:
+    """
+    Compute moving averages, bull/bear sentiment and signals for every ticker at once.
+
+    Args:
+        close_panel (pd.DataFrame): Dates x tickers closing prices from get_universe_data()
+        fng_df (pd.DataFrame): Processed FNG data from process_fng()
+
+    Returns:
+        dict: 2D arrays (bars x tickers) keyed by 'date', 'Close', 'prev_close',
+              '50ma', '100ma', '200ma', 'fng_value', 'rating', 'bullbear' and
+              'signal'. Rows are aligned so the last row is each ticker's latest bar.
+    """
+    values = close_panel.to_numpy(dtype=float)
+    order = _align_to_latest(values)
+
+    close = np.take_along_axis(values, order, axis=0)
+    dates = close_panel.index.to_numpy(dtype='datetime64[D]')[order]
+    dates = np.where(np.isnan(close), np.datetime64('NaT'), dates)
+
+    # Rolling means for all tickers in a single pass over the panel
+    panel = {'date': dates, 'Close': close}
+    for window in MA_WINDOWS:
+        panel[f'{window}ma'] = rolling_mean(close, window)
+
+    prev_close = shift(close)
+    panel['prev_close'] = prev_close
+
+    # Look up FNG by date with a single searchsorted over the whole panel
+    if fng_df.empty:
+        fng_value = np.full(close.shape, np.nan)
+        rating = np.full(close.shape, 'Unknown', dtype=object)
+    else:
+        fng_dates = pd.to_datetime(fng_df['date']).to_numpy(dtype='datetime64[D]')
+        fng_value = lookup_by_date(dates, fng_dates, fng_df['fng_value'].to_numpy(dtype=float), np.nan)
+        rating = lookup_by_date(dates, fng_dates, fng_df['rating'].to_numpy(dtype=object), np.nan)
+    panel['fng_value'] = fng_value
+    panel['rating'] = rating
+
+    panel['bullbear'] = bull_bear(close, panel['50ma'], panel['200ma'])
+    panel['signal'] = signal(fng_value, close, prev_close, panel['50ma'], panel['200ma'])
+
+    return panel
+
+def get_signal_table(close_panel: pd.DataFrame, raw_fng_data: dict) -> pd.DataFrame:
+    """
+    Build a per-ticker table of the previous and current signal.
+
+    Mirrors process_data() -> add_signal() for every ticker: the last two bars
+    with complete moving averages are compared.
+
+    Args:
+        close_panel (pd.DataFrame): Dates x tickers closing prices from get_universe_data()
+        raw_fng_data (dict): Raw FNG data from get_raw_historical_fng()
+
+    Returns:
+        pd.DataFrame: One row per ticker with the latest bar's features plus
+                      'prev_signal', 'signal' and 'changed' columns
+    """
+    if len(close_panel) < 2:
+        raise ValueError(f"Expected at least 2 bars for analysis, got {len(close_panel)}")
+
+    fng_df = process_fng(raw_fng_data)
+    panel = compute_signal_panel(close_panel, fng_df)
+
+    last = {key: arr[-1] for key, arr in panel.items()}
+    prev = {key: arr[-2] for key, arr in panel.items()}
+
+    complete = ~np.isnan(prev['200ma'])
+
+    table = pd.DataFrame({
+        'ticker': close_panel.columns,
+        'date': pd.to_datetime(last['date']).date,
+        'Close': last['Close'],
+        'prev_close': last['prev_close'],
+        '50ma': last['50ma'],
+        '100ma': last['100ma'],
+        '200ma': last['200ma'],
+        'bullbear': last['bullbear'],
+        'fng_value': last['fng_value'],
+        'rating': last['rating'],
+        'prev_signal': np.where(complete, prev['signal'], None),
+        'signal': np.where(complete, last['signal'], None),
+    })
+    table['changed'] = complete & (table['prev_signal'] != table['signal'])
+
+    return table.set_index('ticker')
+
+def run_batch(tickers, raw_fng_data=None, group_size=100):
+    """
+    Evaluate the daily signal for a whole universe of tickers.
+
+    Args:
+        tickers (list): Ticker symbols to evaluate
+        raw_fng_data (dict, optional): Raw FNG data. Read from the FNG store if not provided.
+        group_size (int): Number of tickers requested per yf.download() call
+
+    Returns:
+        tuple: (signal_table, changes) where signal_table is the DataFrame from
+               get_signal_table() and changes is a list of dicts with 'ticker',
+               'prev_signal' and 'signal' for every ticker whose signal shifted
+    """
+    sources = {'universe': lambda: get_universe_data(tickers, group_size=group_size)}
+    if raw_fng_data is None:
+        sources['fng'] = get_stored_historical_fng
+
+    # Larger universes take longer, so the universe download gets no per-source limit
+    results, errors = fetch_concurrently(sources, timeouts={'fng': FETCH_TIMEOUTS['fng']}, deadline=BATCH_DEADLINE_SECONDS)
+    if 'universe' not in results:
+        raise RuntimeError(f"Could not fetch universe data: {errors['universe']}")
+
+    close_panel = results['universe']
+    if raw_fng_data is None:
+        raw_fng_data = results.get('fng', {})
+    signal_table = get_signal_table(close_panel, raw_fng_data)
+
+    changes = [
+        {'ticker': ticker, 'prev_signal': row['prev_signal'], 'signal': row['signal']}
+        for ticker, row in signal_table[signal_table['changed']].iterrows()
+    ]
+
+    missing = [t for t in tickers if t not in signal_table.index]
+    if missing:
+        print(f"Tickers without data: {missing}")
+
+    return signal_table, changes
+
+if __name__ == '__main__':
+    table, changes = run_batch(['VOO', 'QQQ', 'SPY'])
+    print(table)
+    print(changes)
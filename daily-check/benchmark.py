@@ -0,0 +1,233 @@
+import argparse
+import fnmatch
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+import pandas as pd
+
+import main
+from batch import get_signal_table
+from fng_parser import parse_fng_payload
+from synthetic import make_fng_payload, make_ticker_history, make_universe_panel
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+# Fail when a case's median time or peak memory grows by more than these fractions
+TIME_THRESHOLD = 0.25
+MEMORY_THRESHOLD = 0.10
+
+# Each case is timed until it has run MIN_REPEAT times and for at least MIN_TIME
+# seconds, or MAX_REPEAT times, whichever comes first
+MIN_REPEAT = 3
+MAX_REPEAT = 50
+MIN_TIME = 0.5
+
+ROW_SIZES = {'200': 200, '10k': 10_000}
+UNIVERSE_TICKERS = 500
+UNIVERSE_ROWS = 202
+
+STAGES = ('process_fng', 'parse_fng_payload', 'add_moving_averages', 'process_data', 'add_bull_bear', 'add_signal')
+UNIVERSE_STAGES = ('pipeline_per_ticker', 'get_signal_table')
+
+
+def _merged_frame(ticker_df, fng_df) -> pd.DataFrame:
+    """The frame process_data() hands to add_bull_bear(), without its final tail()."""
+    df = main.add_moving_averages(ticker_df).reset_index()
+    df['date'] = df['Date'].dt.tz_localize(None).dt.normalize()
+    df = df.merge(fng_df, on='date', how='left')
+    return df.dropna(subset=['50ma', '100ma', '200ma'])
+
+def _run_per_ticker(histories, raw_fng_data):
+    return [main.add_signal(main.process_data(history, raw_fng_data)) for history in histories]
+
+def stage_cases(label, rows) -> dict:
+    """
+    Benchmark cases for every pipeline stage on one synthetic ticker.
+
+    Args:
+        label (str): Size label used in case names, e.g. '10k'
+        rows (int): Number of daily bars
+
+    Returns:
+        dict: Case name -> (function, args)
+    """
+    ticker_df = make_ticker_history(rows)
+    raw_fng_data = make_fng_payload(ticker_df.index)
+    fng_df = main.process_fng(raw_fng_data)
+    merged = _merged_frame(ticker_df, fng_df)
+    with_sentiment = main.add_bull_bear(merged)
+
+    return {
+        f'process_fng/{label}': (main.process_fng, (raw_fng_data,)),
+        f'parse_fng_payload/{label}': (parse_fng_payload, (raw_fng_data,)),
+        f'add_moving_averages/{label}': (main.add_moving_averages, (ticker_df,)),
+        f'process_data/{label}': (main.process_data, (ticker_df, raw_fng_data)),
+        f'add_bull_bear/{label}': (main.add_bull_bear, (merged,)),
+        f'add_signal/{label}': (main.add_signal, (with_sentiment,)),
+    }
+
+def universe_cases(tickers=UNIVERSE_TICKERS, rows=UNIVERSE_ROWS) -> dict:
+    """
+    Benchmark cases for a whole universe, one ticker at a time and batched.
+
+    Args:
+        tickers (int): Number of tickers
+        rows (int): Daily bars per ticker
+
+    Returns:
+        dict: Case name -> (function, args)
+    """
+    label = f'{tickers}x{rows}'
+    histories = [make_ticker_history(rows, seed=seed) for seed in range(tickers)]
+    close_panel = make_universe_panel(tickers, rows)
+    raw_fng_data = make_fng_payload(histories[0].index)
+
+    return {
+        f'pipeline_per_ticker/{label}': (_run_per_ticker, (histories, raw_fng_data)),
+        f'get_signal_table/{label}': (get_signal_table, (close_panel, raw_fng_data)),
+    }
+
+def build_cases(pattern='*') -> dict:
+    """
+    Build every benchmark case whose name matches a glob pattern.
+
+    Synthetic inputs are only generated for groups that have a matching case.
+    """
+    groups = [
+        ([f'{stage}/{label}' for stage in STAGES], partial(stage_cases, label, rows))
+        for label, rows in ROW_SIZES.items()
+    ]
+    universe_label = f'{UNIVERSE_TICKERS}x{UNIVERSE_ROWS}'
+    groups.append(([f'{stage}/{universe_label}' for stage in UNIVERSE_STAGES], universe_cases))
+
+    cases = {}
+    for names, build in groups:
+        if any(fnmatch.fnmatch(name, pattern) for name in names):
+            cases.update({name: case for name, case in build().items() if fnmatch.fnmatch(name, pattern)})
+
+    return cases
+
+def time_case(func, args) -> dict:
+    """
+    Time one case after a warm-up call.
+
+    Returns:
+        dict: 'median_ms' and 'runs'
+    """
+    func(*args)
+
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < MIN_REPEAT or (time.perf_counter() - started < MIN_TIME and len(samples) < MAX_REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+
+    return {'median_ms': statistics.median(samples) * 1000, 'runs': len(samples)}
+
+def peak_memory(func, args) -> float:
+    """
+    Peak memory allocated during one call, in KiB.
+
+    Measured in a separate call because tracing slows the code down. NumPy
+    reports its array buffers to tracemalloc, so they are included.
+    """
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+def run_benchmarks(pattern='*') -> dict:
+    """
+    Run every matching case.
+
+    Args:
+        pattern (str): Glob pattern on case names, e.g. 'add_signal/*'
+
+    Returns:
+        dict: Case name -> {'median_ms', 'runs', 'peak_kb'}
+    """
+    results = {}
+    for name, (func, args) in build_cases(pattern).items():
+        result = time_case(func, args)
+        result['peak_kb'] = peak_memory(func, args)
+        results[name] = result
+        print(f"{name:<40} {result['median_ms']:10.2f} ms {result['peak_kb']:12.0f} KiB  ({result['runs']} runs)")
+    return results
+
+def find_regressions(results, baseline, time_threshold=TIME_THRESHOLD, memory_threshold=MEMORY_THRESHOLD) -> list:
+    """
+    Compare results with the baseline.
+
+    Returns:
+        list: One message per case and metric beyond its threshold
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric, threshold in (('median_ms', time_threshold), ('peak_kb', memory_threshold)):
+            limit = baseline[name][metric] * (1 + threshold)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {result[metric]:.1f} > {limit:.1f} (baseline {baseline[name][metric]:.1f})"
+                )
+    return regressions
+
+def load_baseline(path=BASELINE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_baseline(baseline: dict, path=BASELINE_PATH) -> None:
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the daily-check pipeline stages on synthetic data.')
+    parser.add_argument('pattern', nargs='?', default='*', help="glob on case names, e.g. 'add_signal/*' (default: all)")
+    parser.add_argument('--threshold', type=float, default=TIME_THRESHOLD,
+                        help='allowed slowdown vs baseline as a fraction (default: 0.25)')
+    parser.add_argument('--memory-threshold', type=float, default=MEMORY_THRESHOLD,
+                        help='allowed peak memory growth vs baseline as a fraction (default: 0.10)')
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the new baseline')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.pattern)
+    baseline = load_baseline()
+
+    if args.update_baseline:
+        for name, result in results.items():
+            baseline[name] = {'median_ms': round(result['median_ms'], 3), 'peak_kb': round(result['peak_kb'], 1)}
+        save_baseline(baseline)
+        print(f"Baseline updated for {len(results)} cases")
+        return 0
+
+    # A case without a baseline is not checked, so that must not pass as a green gate
+    missing = [name for name in results if name not in baseline]
+    if missing:
+        print(f"No baseline for {len(missing)} cases. Run with --update-baseline to record them:")
+        for name in missing:
+            print(f"  {name}")
+
+    regressions = find_regressions(results, baseline, args.threshold, args.memory_threshold)
+    if regressions:
+        print("Benchmark regressions detected:")
+        for message in regressions:
+            print(f"  {message}")
+
+    return 1 if regressions or missing else 0
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
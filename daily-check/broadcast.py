@@ -0,0 +1,276 @@
+import asyncio
+import os
+import time
+
+import httpx
+
+import http_pool
+from main import get_telebot_token
+from replay import ReplayMissError, call_key, get_mode, load_recording, next_key, save_recording
+from spans import span
+
+
+TELEGRAM_API = 'https://api.telegram.org'
+
+# Telegram allows about 30 messages per second per bot. Paid broadcasts
+# (allow_paid_broadcast) raise that to 1000 per second, which is what reaching
+# 50k subscribers inside a minute needs: set CHAMELEON_TELEGRAM_RATE=1000.
+GLOBAL_RATE = float(os.getenv('CHAMELEON_TELEGRAM_RATE', '30'))
+
+# Minimum seconds between messages to the same chat. Groups and channels are
+# limited to 20 messages per minute.
+PRIVATE_CHAT_INTERVAL = 1.0
+GROUP_CHAT_INTERVAL = 3.0
+
+# Requests in flight at once, which is also the connection pool size
+MAX_CONCURRENCY = int(os.getenv('CHAMELEON_TELEGRAM_CONCURRENCY', '100'))
+
+# Attempts per message before it is reported as failed
+MAX_ATTEMPTS = 5
+
+# First backoff in seconds after a network error or 5xx, doubled on each retry
+RETRY_BACKOFF = 1.0
+
+
+class RateLimiter:
+    """
+    Evenly spaced send slots shared by every worker on the event loop.
+
+    Slots are reserved without awaiting, so no lock is needed between workers.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_slot = 0.0
+
+    async def acquire(self):
+        """Wait for the next free slot."""
+        now = time.monotonic()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def pause(self, seconds):
+        """Hold back every slot for at least the given number of seconds."""
+        self.next_slot = max(self.next_slot, time.monotonic() + seconds)
+
+
+class RecordReplayTransport(httpx.AsyncBaseTransport):
+    """
+    httpx counterpart of replay.RecordReplayAdapter, for deliver()'s async client.
+
+    Recordings share the adapter's keys and format, so a broadcast replays
+    without network access like every http_pool call.
+
+    Args:
+        mode (str): 'record' or 'replay'
+        transport (httpx.AsyncBaseTransport): Sends the live requests
+    """
+
+    # The recorded content is already decoded
+    _DROPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+    def __init__(self, mode, transport):
+        self.mode = mode
+        self.transport = transport
+
+    async def handle_async_request(self, request):
+        key = next_key(call_key(request.method, str(request.url), await request.aread()))
+
+        if self.mode == 'replay':
+            status, reason, headers, content = load_recording('http', key)
+            headers = {name: value for name, value in headers.items() if name.lower() not in self._DROPPED_HEADERS}
+            return httpx.Response(status, headers=headers, content=content, request=request)
+
+        response = await self.transport.handle_async_request(request)
+        if self.mode == 'record':
+            content = await response.aread()
+            save_recording('http', key, (response.status_code, response.reason_phrase, dict(response.headers), content))
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def _chat_interval(chat_id) -> float:
+    """Group and channel ids are negative or '@username', private chats are positive."""
+    chat_id = str(chat_id)
+    if chat_id.startswith('@') or chat_id.startswith('-'):
+        return GROUP_CHAT_INTERVAL
+    return PRIVATE_CHAT_INTERVAL
+
+def _error_details(response: httpx.Response) -> tuple:
+    """Get (description, parameters) from a Telegram error body, tolerating non-JSON bodies."""
+    try:
+        payload = response.json()
+    except ValueError:
+        return response.text[:200], {}
+    return payload.get('description', ''), payload.get('parameters') or {}
+
+async def deliver(bot_name, messages, paid=False, transport=None, api_base=None) -> dict:
+    """
+    Send many Telegram messages under the global and per-chat rate limits.
+
+    A fixed pool of workers drains a queue of messages. Every send waits for a
+    slot from the global limiter and from its chat's limiter. A 429 pauses both
+    for retry_after seconds and puts the message back on the queue, network
+    errors and 5xx back off exponentially, and a rotated token (401) is
+    refreshed once for the whole broadcast.
+
+    Args:
+        bot_name (str): Bot whose token is used
+        messages (iterable): Dicts with 'chat_id' and 'text', and optionally 'parse_mode'
+        paid (bool): If True, send as Telegram paid broadcasts
+        transport (httpx.AsyncBaseTransport, optional): Transport override, e.g. for a
+            test. Defaults to the record/replay transport when a replay mode is set.
+        api_base (str, optional): Telegram Bot API base URL. Defaults to
+            TELEGRAM_API, after any http_pool host override.
+
+    Returns:
+        dict: Delivery report with 'total', 'sent', 'failed' (list of dicts with
+              'chat_id', 'status' and 'description'), 'retries', 'throttled'
+              (429 responses) and 'elapsed_seconds'
+
+    Raises:
+        ReplayMissError: In replay mode, if a send was never recorded
+    """
+    started = time.monotonic()
+    messages = list(messages)
+    report = {'total': len(messages), 'sent': 0, 'failed': [], 'retries': 0, 'throttled': 0}
+    if not messages:
+        report['elapsed_seconds'] = 0.0
+        return report
+
+    api_base = api_base or http_pool.resolve_url(TELEGRAM_API)
+    token = {'value': get_telebot_token(bot_name), 'refresh': None}
+    global_limiter = RateLimiter(1.0 / GLOBAL_RATE)
+    chat_limiters = {}
+
+    queue = asyncio.Queue()
+    for message in messages:
+        queue.put_nowait((message, 1))
+
+    def fail(message, status, description):
+        report['failed'].append({'chat_id': message['chat_id'], 'status': status, 'description': description})
+
+    def retry(message, attempt, status, description):
+        if attempt >= MAX_ATTEMPTS:
+            fail(message, status, description)
+        else:
+            report['retries'] += 1
+            queue.put_nowait((message, attempt + 1))
+
+    async def send(client, message, attempt):
+        chat_id = message['chat_id']
+        chat_limiter = chat_limiters.get(chat_id)
+        if chat_limiter is None:
+            chat_limiter = chat_limiters[chat_id] = RateLimiter(_chat_interval(chat_id))
+
+        await chat_limiter.acquire()
+        await global_limiter.acquire()
+
+        data = {'chat_id': chat_id, 'text': message['text']}
+        if message.get('parse_mode'):
+            data['parse_mode'] = message['parse_mode']
+        if paid:
+            data['allow_paid_broadcast'] = 'true'
+
+        sent_token = token['value']
+        try:
+            response = await client.post(f"{api_base}/bot{sent_token}/sendMessage", data=data)
+        except httpx.HTTPError as e:
+            chat_limiter.pause(RETRY_BACKOFF * 2 ** (attempt - 1))
+            retry(message, attempt, None, str(e))
+            return
+
+        if response.status_code == 200:
+            report['sent'] += 1
+            return
+
+        description, parameters = _error_details(response)
+
+        if response.status_code == 429:
+            report['throttled'] += 1
+            retry_after = float(parameters.get('retry_after', 1))
+            chat_limiter.pause(retry_after)
+            global_limiter.pause(retry_after)
+            retry(message, attempt, 429, description)
+        elif response.status_code == 401:
+            # The first 401 fetches the new version once for the whole broadcast;
+            # messages in flight with the old token wait for it and are retried
+            if token['refresh'] is None:
+                token['refresh'] = asyncio.create_task(asyncio.to_thread(get_telebot_token, bot_name, True))
+            token['value'] = await token['refresh']
+            if token['value'] != sent_token:
+                retry(message, attempt, 401, description)
+            else:
+                fail(message, 401, description)
+        elif response.status_code == 400 and 'migrate_to_chat_id' in parameters:
+            # The group was upgraded to a supergroup with a new id
+            retry({**message, 'chat_id': parameters['migrate_to_chat_id']}, attempt, 400, description)
+        elif response.status_code >= 500:
+            chat_limiter.pause(RETRY_BACKOFF * 2 ** (attempt - 1))
+            retry(message, attempt, response.status_code, description)
+        else:
+            # Blocked by the user, chat not found, bad request: retrying will not help
+            fail(message, response.status_code, description)
+
+    replay_misses = []
+
+    async def worker(client):
+        while True:
+            message, attempt = await queue.get()
+            try:
+                await send(client, message, attempt)
+            except ReplayMissError as e:
+                # Raised below like any other unrecorded call, not reported as a failed delivery
+                replay_misses.append(e)
+            except Exception as e:
+                fail(message, None, f"Unexpected error: {e}")
+            finally:
+                queue.task_done()
+
+    connect_timeout, read_timeout = http_pool.get_timeout(TELEGRAM_API)
+    limits = httpx.Limits(max_connections=MAX_CONCURRENCY, max_keepalive_connections=MAX_CONCURRENCY)
+    timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+
+    mode = get_mode()
+    if transport is None and mode is not None:
+        transport = RecordReplayTransport(mode, httpx.AsyncHTTPTransport(limits=limits))
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout, transport=transport) as client:
+        workers = [asyncio.create_task(worker(client)) for _ in range(min(MAX_CONCURRENCY, len(messages)))]
+        await queue.join()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    if replay_misses:
+        raise replay_misses[0]
+
+    report['elapsed_seconds'] = round(time.monotonic() - started, 3)
+    return report
+
+def broadcast_message(bot_name, chat_ids, msg, parse_mode=None, paid=False) -> dict:
+    """
+    Send the same message to many chats and wait for the delivery report.
+
+    Args:
+        bot_name (str): Bot whose token is used
+        chat_ids (iterable): Chat ids or '@channel' usernames
+        msg (str): Message text
+        parse_mode (str, optional): Telegram parse mode
+        paid (bool): If True, send as Telegram paid broadcasts
+
+    Returns:
+        dict: Delivery report from deliver()
+    """
+    messages = [{'chat_id': chat_id, 'text': msg, 'parse_mode': parse_mode} for chat_id in chat_ids]
+    with span('broadcast', bot=bot_name, chats=len(messages)):
+        report = asyncio.run(deliver(bot_name, messages, paid=paid))
+
+    if report['failed']:
+        print(f"Broadcast via {bot_name}: {len(report['failed'])} of {report['total']} messages failed")
+
+    return report
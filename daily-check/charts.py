@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import market_data
+from price_cache import CACHE_DIR
+
+
+# Telegram file_ids of uploaded charts, by bot and chart key. A file_id only
+# works for the bot that uploaded the photo.
+CHART_FILE_IDS_PATH = os.getenv('CHAMELEON_CHART_FILE_IDS_PATH', os.path.join(CACHE_DIR, 'chart_file_ids.json'))
+
+# Bars shown on the chart
+CHART_ROWS = 200
+
+# Part of every chart key, so a change to the drawing code invalidates old charts
+CHART_VERSION = 1
+
+# Rendered charts kept in memory per warm instance
+CHART_CACHE_SIZE = 8
+
+# FNG levels drawn as guides, matching the signal rules
+FNG_BUY_LEVEL = 40
+FNG_WAIT_LEVEL = 60
+
+CHART_COLUMNS = ('Close', '50ma', '100ma', '200ma', 'fng_value')
+
+_executor = None
+_executor_lock = threading.Lock()
+_png_cache = OrderedDict()
+_png_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Get the single render worker process, starting it on first use.
+
+    The worker comes from a forkserver rather than a fork of this process,
+    which has fetch and bot threads running: a lock one of them held at fork
+    time would stay locked in the worker forever.
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('forkserver'))
+        return _executor
+
+def chart_data(signal_frame: pd.DataFrame, rows=CHART_ROWS) -> dict:
+    """
+    Take the arrays a chart needs from a compute_signal_frame() result.
+
+    Plain arrays keep the hand-off to the render process small.
+
+    Args:
+        signal_frame (pd.DataFrame): Output of compute_signal_frame()
+        rows (int): Number of most recent bars to chart
+
+    Returns:
+        dict: 'date' (datetime64[D]) and float64 arrays keyed by CHART_COLUMNS
+    """
+    tail = signal_frame.tail(rows)
+    data = {'date': pd.to_datetime(tail['date']).to_numpy(dtype='datetime64[D]')}
+    for column in CHART_COLUMNS:
+        data[column] = tail[column].to_numpy(dtype=float)
+    return data
+
+def chart_key(data: dict, title) -> str:
+    """Hash of everything drawn on the chart."""
+    digest = hashlib.sha1(f'{CHART_VERSION}|{title}'.encode())
+    for name in ('date', *CHART_COLUMNS):
+        digest.update(np.ascontiguousarray(data[name]).tobytes())
+    return digest.hexdigest()
+
+def render_chart(data: dict, title) -> bytes:
+    """
+    Draw price, moving averages and Fear and Greed into a PNG in memory.
+
+    Runs in the render process. matplotlib is only imported there, so it costs
+    the Cloud Function nothing on runs without a signal shift.
+
+    Args:
+        data (dict): Output of chart_data()
+        title (str): Chart title
+
+    Returns:
+        bytes: PNG image
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    dates = data['date'].astype('datetime64[ms]').astype(object)
+    fig, (price_ax, fng_ax) = plt.subplots(
+        2, 1, figsize=(10, 6), sharex=True, gridspec_kw={'height_ratios': [3, 1]}
+    )
+
+    price_ax.plot(dates, data['Close'], color='black', linewidth=1.2, label='Close')
+    price_ax.plot(dates, data['50ma'], color='tab:blue', linewidth=1, label='50MA')
+    price_ax.plot(dates, data['100ma'], color='tab:orange', linewidth=1, label='100MA')
+    price_ax.plot(dates, data['200ma'], color='tab:red', linewidth=1, label='200MA')
+    price_ax.set_title(title)
+    price_ax.legend(loc='upper left', frameon=False, ncol=4)
+    price_ax.grid(alpha=0.3)
+
+    fng_ax.plot(dates, data['fng_value'], color='tab:green', linewidth=1)
+    fng_ax.axhline(FNG_BUY_LEVEL, color='tab:green', linestyle='--', linewidth=0.8)
+    fng_ax.axhline(FNG_WAIT_LEVEL, color='tab:red', linestyle='--', linewidth=0.8)
+    fng_ax.set_ylim(0, 100)
+    fng_ax.set_ylabel('F&G')
+    fng_ax.grid(alpha=0.3)
+
+    fig.autofmt_xdate()
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=100)
+    plt.close(fig)
+    return buffer.getvalue()
+
+def _remember_png(key, png) -> None:
+    with _png_lock:
+        _png_cache[key] = png
+        _png_cache.move_to_end(key)
+        while len(_png_cache) > CHART_CACHE_SIZE:
+            _png_cache.popitem(last=False)
+
+def _cached_png(key):
+    with _png_lock:
+        png = _png_cache.get(key)
+        if png is not None:
+            _png_cache.move_to_end(key)
+        return png
+
+def submit_chart(data: dict, title) -> tuple:
+    """
+    Start rendering a chart in the worker process, unless it is cached.
+
+    Args:
+        data (dict): Output of chart_data()
+        title (str): Chart title
+
+    Returns:
+        tuple: (key, Future resolving to the PNG bytes)
+    """
+    key = chart_key(data, title)
+
+    png = _cached_png(key)
+    if png is not None:
+        future = Future()
+        future.set_result(png)
+        return key, future
+
+    def remember(done):
+        if not done.cancelled() and done.exception() is None:
+            _remember_png(key, done.result())
+
+    future = get_executor().submit(render_chart, data, title)
+    future.add_done_callback(remember)
+    return key, future
+
+async def render_chart_async(data: dict, title) -> tuple:
+    """
+    Render a chart without blocking the event loop.
+
+    Returns:
+        tuple: (key, PNG bytes)
+    """
+    key, future = submit_chart(data, title)
+    return key, await asyncio.wrap_future(future)
+
+def load_file_ids(path=CHART_FILE_IDS_PATH) -> dict:
+    """Load the bot -> chart key -> file_id map, pulling the bucket copy first."""
+    market_data.pull(path)
+    if not os.path.exists(path):
+        return {}
+
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading chart file ids: {e}")
+        return {}
+
+def get_file_id(bot_name, key, path=CHART_FILE_IDS_PATH):
+    """Telegram file_id of a chart the bot already uploaded, or None."""
+    return load_file_ids(path).get(bot_name, {}).get(key)
+
+def save_file_id(bot_name, key, file_id, path=CHART_FILE_IDS_PATH) -> None:
+    """Remember the file_id Telegram assigned to an uploaded chart."""
+    file_ids = load_file_ids(path)
+    file_ids.setdefault(bot_name, {})[key] = file_id
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(file_ids, f, indent=2)
+    os.replace(tmp_path, path)
+    market_data.push(path)
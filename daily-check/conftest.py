@@ -0,0 +1,11 @@
+import os
+import tempfile
+
+
+# Set before any test module imports the code, which reads these at import time.
+# Tests never touch the real cache or print span records.
+os.environ.setdefault('CHAMELEON_CACHE_DIR', tempfile.mkdtemp(prefix='chameleon-test-cache-'))
+os.environ['CHAMELEON_SPANS'] = '0'
+os.environ.pop('CHAMELEON_REPLAY_MODE', None)
+os.environ.pop('CHAMELEON_HTTP_OVERRIDES', None)
+os.environ.pop('CHAMELEON_DATA_BUCKET', None)
@@ -0,0 +1,342 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import market_data
+from kernel import close_drop_pct, signal, to_dates
+from ma_state import VALIDATE_EVERY, MovingAverageState
+from price_cache import CACHE_DIR, fetch_minute_bars
+from signal_state import (MARKET_CLOSE_HOUR, MARKET_TIMEZONE, SIGNAL_STATE_PATH, load_signal_state,
+                          save_signal_state)
+from spans import span
+
+
+# Intraday mode polls one-minute bars during US market hours and announces a
+# CAUTIOUS BUY as soon as the session's drop crosses the threshold, instead of
+# waiting for the daily check after the close. Deployed as the `intraday`
+# entry point in main.py and scheduled every minute, or run as a loop with
+# `python intraday.py`.
+#
+# An early alert is not retracted if the session recovers before the close.
+# CAUTIOUS BUY is a prompt to accumulate during the drop, and the daily check
+# after the close evaluates the finished bar as usual: it announces a shift
+# to any other signal and only skips the CAUTIOUS BUY that already went out.
+
+INTRADAY_STATE_DIR = os.path.join(CACHE_DIR, 'intraday')
+INTRADAY_TICKERS = ('VOO',)
+
+INTRADAY_BOT = 'financial-chameleon'
+INTRADAY_CHAT_ID = '@thefinancialchameleon'
+
+# The only signal worth announcing before the close
+EARLY_SIGNAL = 'CAUTIOUS BUY'
+
+# Consecutive minute bars the early signal must hold before it is announced
+DEBOUNCE_BARS = int(os.getenv('CHAMELEON_INTRADAY_DEBOUNCE', '3'))
+
+MARKET_OPEN_HOUR = 9
+MARKET_OPEN_MINUTE = 30
+
+# Seconds after the minute to poll, so the finished bar is published
+POLL_SECONDS = 60
+POLL_DELAY_SECONDS = 5
+
+
+class IntradayTracker:
+    """
+    One ticker's developing session.
+
+    The moving average state holds the daily closes before the session plus
+    one bar for the session itself, which every new minute bar overwrites in
+    O(1). Memory is that ring buffer and a few scalars however long the session
+    runs, and nothing is recomputed from history after the first bar.
+
+    Args:
+        ticker (str): Stock ticker symbol
+        session_date (str): Session date in 'YYYY-MM-DD' format
+        ma_state (MovingAverageState): Seeded with the closes before the session
+        prev_close (float): Previous session's close, for close_drop_pct
+        fng_value (float): Latest Fear and Greed value
+        armed (bool): False if the early signal must not be announced this session
+    """
+
+    def __init__(self, ticker, session_date, ma_state, prev_close, fng_value, armed=True):
+        self.ticker = ticker
+        self.session_date = session_date
+        self.ma_state = ma_state
+        self.prev_close = prev_close
+        self.fng_value = fng_value
+        self.armed = armed
+        self.last_bar = None
+        self.bars = 0
+        self.streak = 0
+        self.latest = {}
+
+    @classmethod
+    def start(cls, ticker, session_date, daily_close: pd.Series, fng_value, armed=True):
+        """
+        Seed a tracker from daily closes, ignoring any bar for the session itself.
+
+        Args:
+            daily_close (pd.Series): Daily closes indexed by (possibly tz-aware) date
+
+        Raises:
+            ValueError: If there is no close before the session
+        """
+        before = daily_close[to_dates(daily_close.index) < np.datetime64(session_date, 'D')].dropna()
+        if before.empty:
+            raise ValueError(f"No daily closes for {ticker} before {session_date}")
+
+        ma_state = MovingAverageState.from_history(ticker, before)
+        return cls(ticker, session_date, ma_state, float(before.iloc[-1]), fng_value, armed=armed)
+
+    def update(self, bar_time, close) -> bool:
+        """
+        Apply one minute bar in O(1).
+
+        Args:
+            bar_time (int): Bar start in epoch seconds. Bars not newer than the
+                            last one applied are ignored.
+            close (float): Bar close
+
+        Returns:
+            bool: True when the early signal fires on this bar
+        """
+        if self.last_bar is not None and bar_time <= self.last_bar:
+            return False
+
+        close = float(close)
+        self.last_bar = int(bar_time)
+        self.bars += 1
+        self.ma_state.update(self.session_date, close)
+
+        mas = self.ma_state.moving_averages()
+        current = signal(
+            np.array([self.fng_value], dtype=float),
+            np.array([close]),
+            np.array([self.prev_close]),
+            np.array([mas['50ma']]),
+            np.array([mas['200ma']]),
+        )[0]
+
+        self.latest = {
+            'time': self.last_bar,
+            'close': close,
+            'close_drop_pct': float(close_drop_pct(close, self.prev_close)),
+            '50ma': mas['50ma'],
+            '200ma': mas['200ma'],
+            'signal': current,
+        }
+
+        self.streak = self.streak + 1 if current == EARLY_SIGNAL else 0
+        if self.armed and self.streak >= DEBOUNCE_BARS:
+            self.armed = False
+            return True
+        return False
+
+    def to_dict(self) -> dict:
+        return {
+            'ticker': self.ticker,
+            'session_date': self.session_date,
+            'ma_state': self.ma_state.to_dict(),
+            'prev_close': self.prev_close,
+            'fng_value': self.fng_value,
+            'armed': self.armed,
+            'last_bar': self.last_bar,
+            'bars': self.bars,
+            'streak': self.streak,
+            'latest': self.latest,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        tracker = cls(
+            data['ticker'],
+            data['session_date'],
+            MovingAverageState.from_dict(data['ma_state']),
+            data['prev_close'],
+            data['fng_value'],
+            armed=data['armed'],
+        )
+        tracker.last_bar = data['last_bar']
+        tracker.bars = data['bars']
+        tracker.streak = data['streak']
+        tracker.latest = data['latest']
+        return tracker
+
+
+def get_tracker_path(ticker) -> str:
+    safe_name = ticker.replace(os.sep, '_').replace('/', '_')
+    return os.path.join(INTRADAY_STATE_DIR, f'{safe_name}.json')
+
+def load_tracker(ticker):
+    """
+    Load a ticker's persisted intraday tracker, pulling the bucket copy first.
+
+    Each poll may run on a different Cloud Function instance.
+
+    Returns:
+        IntradayTracker or None: None if there is none yet or it cannot be read
+    """
+    path = get_tracker_path(ticker)
+    market_data.pull(path)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path) as f:
+            return IntradayTracker.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error reading intraday state for {ticker}: {e}")
+        return None
+
+def save_tracker(tracker: IntradayTracker) -> None:
+    os.makedirs(INTRADAY_STATE_DIR, exist_ok=True)
+    path = get_tracker_path(tracker.ticker)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(tracker.to_dict(), f, default=float)
+    os.replace(tmp_path, path)
+    market_data.push(path)
+
+def is_market_open(now=None) -> bool:
+    """Whether US regular trading hours are in progress. Exchange holidays are not known here."""
+    now = now or datetime.now(MARKET_TIMEZONE)
+    now = now.astimezone(MARKET_TIMEZONE)
+    minutes = now.hour * 60 + now.minute
+    return now.weekday() < 5 and MARKET_OPEN_HOUR * 60 + MARKET_OPEN_MINUTE <= minutes < MARKET_CLOSE_HOUR * 60
+
+def start_tracker(ticker, session_date) -> IntradayTracker:
+    """Seed a tracker for a new session from the stored daily prices and FNG data."""
+    from main import get_stored_historical_fng, process_fng
+
+    fng_df = process_fng(get_stored_historical_fng())
+    fng_value = float(fng_df['fng_value'].iloc[-1]) if not fng_df.empty else np.nan
+
+    # Nothing to announce if the last daily check already said CAUTIOUS BUY, or
+    # if this session's alert went out before the tracker was lost
+    market_data.pull(SIGNAL_STATE_PATH)
+    state = load_signal_state(ticker)
+    armed = state.get('signal') != EARLY_SIGNAL and (state.get('early_alert') or {}).get('bar_date') != session_date
+
+    return IntradayTracker.start(ticker, session_date, market_data.get_prices(ticker)['Close'], fng_value, armed=armed)
+
+def build_early_signal_message(tracker: IntradayTracker) -> str:
+    """Build the intraday CAUTIOUS BUY announcement text"""
+    latest = tracker.latest
+
+    telegram_msg = f"🦎 EARLY SIGNAL 🦎\n\n"
+    telegram_msg += f"🟡 New Signal: {EARLY_SIGNAL}\n\n"
+    telegram_msg += (
+        f"{tracker.ticker} is down {abs(latest['close_drop_pct']):.1f}% today at ${latest['close']:.2f}. "
+        "Consider accumulating at your own discretion - volatility may present opportunities for patient investors.\n\n"
+    )
+    telegram_msg += f"🔔 Stay adaptable to market shifts with @thefinancialchameleon"
+
+    return telegram_msg
+
+def announce_early_signal(tracker: IntradayTracker) -> None:
+    """Send the early signal and record it, so the daily check does not announce it again."""
+    from main import send_message
+
+    send_message(INTRADAY_BOT, INTRADAY_CHAT_ID, build_early_signal_message(tracker))
+
+    market_data.pull(SIGNAL_STATE_PATH)
+    state = load_signal_state(tracker.ticker)
+    state['early_alert'] = {'bar_date': tracker.session_date, 'signal': EARLY_SIGNAL}
+    save_signal_state(tracker.ticker, state)
+    market_data.push(SIGNAL_STATE_PATH)
+
+def poll_ticker(ticker, now=None) -> dict:
+    """
+    Apply every minute bar published since the last poll, announcing the early signal if it fires.
+
+    Only the newest close of each poll matters for the signal, so a bar that
+    was still forming when it was first seen is not revisited.
+
+    Args:
+        ticker (str): Stock ticker symbol
+        now (datetime, optional): Current time, for tests
+
+    Returns:
+        dict: The latest bar's close, close_drop_pct, moving averages and
+              signal, plus 'bars' applied this session and 'fired'
+    """
+    now = (now or datetime.now(MARKET_TIMEZONE)).astimezone(MARKET_TIMEZONE)
+    session_date = now.strftime('%Y-%m-%d')
+
+    tracker = load_tracker(ticker)
+    if tracker is None or tracker.session_date != session_date:
+        tracker = start_tracker(ticker, session_date)
+
+    fired = False
+    for bar_time, close in fetch_minute_bars(ticker, since=tracker.last_bar).items():
+        fired = tracker.update(bar_time, close) or fired
+
+    # Re-sum the running averages from the ring buffer now and then to stop drift
+    if tracker.ma_state.updates_since_validation >= VALIDATE_EVERY:
+        tracker.ma_state.reconcile()
+
+    try:
+        if fired:
+            announce_early_signal(tracker)
+    except Exception:
+        # Re-armed so the next poll announces it, instead of losing it for the session
+        tracker.armed = True
+        raise
+    finally:
+        save_tracker(tracker)
+
+    return {**tracker.latest, 'bars': tracker.bars, 'fired': fired}
+
+def poll_all(tickers=INTRADAY_TICKERS, now=None) -> str:
+    """
+    Poll every intraday ticker once.
+
+    Returns:
+        str: One status line per ticker, or why nothing was polled
+    """
+    if not is_market_open(now):
+        return "Market closed. Skipped."
+
+    lines = []
+    for ticker in tickers:
+        try:
+            with span(f'poll {ticker}', ticker=ticker):
+                latest = poll_ticker(ticker, now=now)
+        except Exception as e:
+            print(f"Error polling {ticker}: {e}")
+            lines.append(f"{ticker}: error")
+            continue
+
+        if not latest.get('signal'):
+            lines.append(f"{ticker}: no bars yet")
+            continue
+
+        fired = " (announced)" if latest['fired'] else ""
+        lines.append(
+            f"{ticker}: ${latest['close']:.2f} ({latest['close_drop_pct']:+.1f}%), {latest['signal']}{fired}"
+        )
+
+    return "\n".join(lines)
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Poll minute bars during market hours and announce an early CAUTIOUS BUY.')
+    parser.add_argument('tickers', nargs='*', default=list(INTRADAY_TICKERS), help='default: VOO')
+    parser.add_argument('--once', action='store_true', help='poll once and exit')
+    args = parser.parse_args(argv)
+
+    while True:
+        print(poll_all(args.tickers))
+        if args.once or not is_market_open():
+            return 0
+        time.sleep(POLL_SECONDS - time.time() % POLL_SECONDS + POLL_DELAY_SECONDS)
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
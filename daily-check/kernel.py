@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+
+from rules import compile_rules
+
+
+MA_WINDOWS = (50, 100, 200)
+
+# Upper bounds (inclusive) for each rating, matching get_rating() in process_fng()
+FNG_RATING_BOUNDS = np.array([25, 45, 55, 75], dtype=float)
+FNG_RATINGS = np.array(['Extreme Fear', 'Fear', 'Neutral', 'Greed', 'Extreme Greed'], dtype=object)
+
+# The add_signal() strategy, in the declarative format of rules.py
+SIGNAL_RULES = {
+    'rules': [
+        # always 'buy' signal when market is fearful
+        {'when': ['fng_value < 40'], 'then': 'BUY'},
+        # CAUTIOUS BUY when close is at least 1.5% lower than previous close
+        {'when': ['drop_pct <= -1.5'], 'then': 'CAUTIOUS BUY'},
+        # always 'wait' signal when market is greedy
+        {'when': ['fng_value > 60'], 'then': 'WAIT'},
+        # if neutral, only buy based on moving average conditions
+        {'when': ['close > ma200', 'close < ma50', 'ma50 > ma200'], 'then': 'BUY'},
+    ],
+    'default': 'WAIT',
+}
+SIGNAL_EVALUATOR = compile_rules(SIGNAL_RULES)
+
+# Categories of the compact string columns built by process_data() and add_signal()
+RATING_CATEGORIES = (*FNG_RATINGS, 'Unknown')
+SENTIMENT_CATEGORIES = ('bull', 'bear', 'neutral', 'unknown')
+SIGNAL_CATEGORIES = tuple(dict.fromkeys([rule['then'] for rule in SIGNAL_RULES['rules']] + [SIGNAL_RULES['default']]))
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing rolling mean along axis 0, NaN until a full window of valid values.
+
+    Equivalent to pd.Series.rolling(window).mean() for every column at once. Sums
+    are taken on values relative to the first row to keep cumulative rounding
+    error far below price precision on multi-decade histories.
+
+    Args:
+        values (np.ndarray): 1D (bars) or 2D (bars x tickers) float array
+        window (int): Number of bars in the window
+
+    Returns:
+        np.ndarray: Array of the same shape holding the rolling means
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.full(values.shape, np.nan)
+    if values.shape[0] < window:
+        return result
+
+    valid = ~np.isnan(values)
+    first_valid = np.argmax(valid, axis=0)[np.newaxis]
+    base = np.nan_to_num(np.take_along_axis(values, first_valid, axis=0))
+    shifted = np.where(valid, values - base, 0.0)
+
+    zeros = np.zeros((1,) + values.shape[1:])
+    csum = np.concatenate([zeros, np.cumsum(shifted, axis=0)])
+    ccount = np.concatenate([zeros, np.cumsum(valid, axis=0)])
+
+    window_sum = csum[window:] - csum[:-window]
+    window_count = ccount[window:] - ccount[:-window]
+
+    result[window - 1:] = np.where(window_count == window, window_sum / window + base, np.nan)
+    return result
+
+def shift(values: np.ndarray, periods=1) -> np.ndarray:
+    """Shift an array down along axis 0, filling the gap with NaN."""
+    result = np.full(values.shape, np.nan)
+    result[periods:] = values[:-periods]
+    return result
+
+def close_drop_pct(close: np.ndarray, prev_close: np.ndarray) -> np.ndarray:
+    """Percentage change from the previous close, as in add_signal()."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return ((close - prev_close) / prev_close) * 100
+
+def fng_rating(fng_value: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of get_rating() in process_fng().
+
+    Args:
+        fng_value (np.ndarray): Fear and Greed values
+
+    Returns:
+        np.ndarray: Object array of rating strings
+    """
+    # side='left' makes each bound inclusive; NaN sorts last, as in get_rating()
+    bucket = np.searchsorted(FNG_RATING_BOUNDS, np.asarray(fng_value, dtype=float), side='left')
+    return FNG_RATINGS[bucket]
+
+def bull_bear(close, ma50, ma200) -> np.ndarray:
+    """
+    Vectorized equivalent of determine_sentiment() in add_bull_bear().
+
+    Returns:
+        np.ndarray: Object array of 'bull', 'bear', 'neutral' or 'unknown'
+    """
+    sentiment = np.select(
+        [
+            np.isnan(close) | np.isnan(ma50) | np.isnan(ma200),
+            (close > ma50) & (ma50 > ma200),
+            (close < ma50) & (ma50 < ma200),
+        ],
+        ['unknown', 'bull', 'bear'],
+        default='neutral',
+    )
+    return sentiment.astype(object)
+
+def ma_buy_condition(close, ma50, ma200) -> np.ndarray:
+    """Neutral-market BUY rule: close between the 200MA and 50MA in an uptrend."""
+    return (close > ma200) & (close < ma50) & (ma50 > ma200)
+
+def signal_features(fng_value, close, prev_close, ma50, ma200) -> dict:
+    """Feature arrays the signal rules are written against."""
+    return {
+        'fng_value': fng_value,
+        'close': close,
+        'prev_close': prev_close,
+        'drop_pct': close_drop_pct(close, prev_close),
+        'ma50': ma50,
+        'ma200': ma200,
+    }
+
+def signal(fng_value, close, prev_close, ma50, ma200, rules=SIGNAL_EVALUATOR) -> np.ndarray:
+    """
+    Vectorized equivalent of the np.where chain in add_signal().
+
+    Args:
+        rules (CompiledRules): Strategy to evaluate, SIGNAL_RULES by default
+
+    Returns:
+        np.ndarray: Object array of 'BUY', 'CAUTIOUS BUY' or 'WAIT'
+    """
+    return rules(signal_features(fng_value, close, prev_close, ma50, ma200))
+
+def to_dates(index: pd.Index) -> np.ndarray:
+    """Convert a (possibly tz-aware) DatetimeIndex to exchange-local datetime64[D]."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.to_numpy(dtype='datetime64[D]')
+
+def lookup_by_date(dates: np.ndarray, key_dates: np.ndarray, key_values: np.ndarray, fill):
+    """
+    Left-join values onto an array of dates without building a DataFrame.
+
+    Args:
+        dates (np.ndarray): datetime64[D] array of any shape to look up
+        key_dates (np.ndarray): Sorted, unique datetime64[D] keys
+        key_values (np.ndarray): Values aligned with key_dates
+        fill: Value used where a date has no key
+
+    Returns:
+        np.ndarray: Array shaped like dates
+    """
+    if len(key_dates) == 0:
+        return np.full(dates.shape, fill, dtype=np.asarray(key_values).dtype)
+
+    pos = np.clip(np.searchsorted(key_dates, dates), 0, len(key_dates) - 1)
+    hit = key_dates[pos] == dates
+    return np.where(hit, key_values[pos], fill)
+
+def compute_signal_frame(ticker_df: pd.DataFrame, fng_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute every feature of process_data() -> add_signal() over the full history.
+
+    Works on NumPy arrays end to end and builds a single DataFrame at the end,
+    so there are no intermediate frame copies or row-wise applies. The last two
+    rows match add_signal(process_data(ticker_df, raw_fng_data)).
+
+    Args:
+        ticker_df (pd.DataFrame): Raw ticker data from get_ticker_data()
+        fng_df (pd.DataFrame): Processed FNG data from process_fng()
+
+    Returns:
+        pd.DataFrame: One row per bar with complete moving averages, with the same
+                      columns add_signal() returns
+    """
+    close_all = ticker_df['Close'].to_numpy(dtype=float)
+    mas = {f'{window}ma': rolling_mean(close_all, window) for window in MA_WINDOWS}
+
+    # process_data() drops bars without all moving averages before add_signal()
+    complete = ~np.isnan(mas['50ma']) & ~np.isnan(mas['100ma']) & ~np.isnan(mas['200ma'])
+    dates = to_dates(ticker_df.index)[complete]
+    close = close_all[complete]
+    ma50, ma200 = mas['50ma'][complete], mas['200ma'][complete]
+
+    if fng_df.empty:
+        fng_value = np.full(close.shape, np.nan)
+        rating = np.full(close.shape, 'Unknown', dtype=object)
+    else:
+        fng_dates = pd.to_datetime(fng_df['date']).to_numpy(dtype='datetime64[D]')
+        fng_value = lookup_by_date(dates, fng_dates, fng_df['fng_value'].to_numpy(dtype=float), np.nan)
+        rating = lookup_by_date(dates, fng_dates, fng_df['rating'].to_numpy(dtype=object), np.nan)
+
+    prev_close = shift(close)
+
+    columns = {ticker_df.index.name or 'index': ticker_df.index[complete]}
+    for column in ticker_df.columns:
+        columns[column] = ticker_df[column].to_numpy()[complete]
+    for name, ma in mas.items():
+        columns[name] = ma[complete]
+    columns.update({
+        'date': pd.to_datetime(dates).date,
+        'fng_value': fng_value,
+        'rating': rating,
+        'bullbear': bull_bear(close, ma50, ma200),
+        'prev_close': prev_close,
+        'close_drop_pct': close_drop_pct(close, prev_close),
+        'signal': signal(fng_value, close, prev_close, ma50, ma200),
+    })
+
+    return pd.DataFrame(columns)
@@ -0,0 +1,55 @@
+import importlib
+import importlib.util
+import sys
+import threading
+import types
+
+
+class _LazyModule(types.ModuleType):
+    """
+    Stand-in that imports the real module on first attribute access.
+
+    importlib.util.LazyLoader is not thread-safe: threads that touch a fresh
+    lazy module together can see it half initialized. The first access here
+    imports under a lock, so every other thread waits for the finished module.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self._lazy_lock = threading.Lock()
+        self._lazy_module = None
+
+    def _load(self):
+        module = self._lazy_module
+        if module is None:
+            with self._lazy_lock:
+                if self._lazy_module is None:
+                    self._lazy_module = importlib.import_module(self.__name__)
+                module = self._lazy_module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+def lazy_import(name):
+    """
+    Import a module on first attribute access instead of at import time.
+
+    Heavy dependencies are only paid for on code paths that actually use them,
+    which keeps Cloud Function cold starts short. Safe to use from several
+    threads at once.
+
+    Args:
+        name (str): Fully qualified module name (e.g., 'yfinance')
+
+    Returns:
+        module: The module, or a placeholder that finishes importing on first use
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    return _LazyModule(name)
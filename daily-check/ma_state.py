@@ -0,0 +1,265 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from kernel import MA_WINDOWS
+
+
+# Cloud Functions only allow writes under /tmp, so default there
+CACHE_DIR = os.getenv('CHAMELEON_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'chameleon-cache'))
+MA_STATE_DIR = os.path.join(CACHE_DIR, 'ma_state')
+
+# Reconcile running sums against a full recompute after this many updates
+VALIDATE_EVERY = 20
+
+# Largest absolute difference tolerated between running and recomputed averages
+VALIDATION_TOLERANCE = 1e-8
+
+
+class MovingAverageState:
+    """
+    Rolling-window state for one ticker's moving averages.
+
+    A single ring buffer holds the last max(windows) closes, with one running sum
+    per window, so every new close updates all averages in constant time.
+    """
+
+    def __init__(self, ticker, windows=MA_WINDOWS):
+        self.ticker = ticker
+        self.windows = tuple(windows)
+        self.capacity = max(self.windows)
+        self.buffer = np.zeros(self.capacity)
+        self.sums = np.zeros(len(self.windows))
+        self.count = 0
+        self.last_date = None
+        self.updates_since_validation = 0
+
+    def push(self, close):
+        """Add a new bar in O(1)."""
+        head = self.count % self.capacity
+        for i, window in enumerate(self.windows):
+            # The bar that leaves this window is the one `window` bars before the new one
+            leaving = self.buffer[(head - window) % self.capacity] if self.count >= window else 0.0
+            self.sums[i] += close - leaving
+        self.buffer[head] = close
+        self.count += 1
+        self.updates_since_validation += 1
+
+    def replace_last(self, close):
+        """Overwrite the newest bar in O(1), e.g. as an intraday bar develops."""
+        if self.count == 0:
+            raise ValueError(f"No bars in moving average state for {self.ticker}")
+        head = (self.count - 1) % self.capacity
+        self.sums += close - self.buffer[head]
+        self.buffer[head] = close
+        self.updates_since_validation += 1
+
+    def update(self, date, close):
+        """
+        Apply one daily close.
+
+        A bar for the same date as the newest one replaces it, a newer date is
+        pushed, and an older date is ignored.
+
+        Args:
+            date (str): Bar date in 'YYYY-MM-DD' format
+            close (float): Closing (or latest) price for that date
+
+        Returns:
+            bool: True if the state changed
+        """
+        if self.last_date is not None and date < self.last_date:
+            return False
+
+        if date == self.last_date:
+            self.replace_last(float(close))
+        else:
+            self.push(float(close))
+            self.last_date = date
+
+        return True
+
+    def closes(self) -> np.ndarray:
+        """Buffered closes, oldest first."""
+        n = min(self.count, self.capacity)
+        start = self.count - n
+        return self.buffer[np.arange(start, start + n) % self.capacity]
+
+    def moving_averages(self) -> dict:
+        """
+        Current moving averages.
+
+        Returns:
+            dict: e.g. {'50ma': 412.3, '100ma': 405.1, '200ma': nan}. A window is
+                  NaN until it has seen enough bars.
+        """
+        return {
+            f'{window}ma': (self.sums[i] / window) if self.count >= window else np.nan
+            for i, window in enumerate(self.windows)
+        }
+
+    def reconcile(self, history: pd.Series = None) -> float:
+        """
+        Compare the running averages with a full recompute and repair any drift.
+
+        Args:
+            history (pd.Series, optional): Full daily close history indexed by date.
+                If given, the state is rebuilt from it whenever it disagrees.
+                Otherwise the running sums are re-summed from the ring buffer.
+
+        Returns:
+            float: Largest absolute difference found before repair
+        """
+        current = self.moving_averages()
+
+        if history is None:
+            closes = self.closes()
+            for i, window in enumerate(self.windows):
+                self.sums[i] = closes[-window:].sum()
+            rebuilt = self
+        else:
+            rebuilt = MovingAverageState.from_history(self.ticker, history, self.windows)
+
+        expected = rebuilt.moving_averages()
+        current_values = np.array(list(current.values()))
+        expected_values = np.array([expected[key] for key in current])
+        if (np.isnan(current_values) != np.isnan(expected_values)).any():
+            drift = np.inf
+        else:
+            drift = float(np.nanmax(np.abs(current_values - expected_values), initial=0.0))
+
+        if drift > VALIDATION_TOLERANCE:
+            print(f"Moving average state for {self.ticker} drifted by {drift}, rebuilding")
+
+        if rebuilt is not self:
+            self.__dict__.update(rebuilt.__dict__)
+        self.updates_since_validation = 0
+
+        return drift
+
+    @classmethod
+    def from_history(cls, ticker, history: pd.Series, windows=MA_WINDOWS):
+        """
+        Seed a state from a daily close history with a full recompute.
+
+        Args:
+            ticker (str): Stock ticker symbol
+            history (pd.Series): Daily closes indexed by (possibly tz-aware) date
+            windows (tuple): Moving average windows
+
+        Returns:
+            MovingAverageState: State positioned on the last bar of the history
+        """
+        state = cls(ticker, windows)
+        history = history.dropna()
+        closes = history.to_numpy(dtype=float)[-state.capacity:]
+
+        state.count = len(closes)
+        state.buffer[np.arange(state.count) % state.capacity] = closes
+        # Short windows still sum every buffered close: push() subtracts them
+        # once they leave the window, whether or not it had filled by then
+        for i, window in enumerate(state.windows):
+            state.sums[i] = closes[-window:].sum()
+        if len(history):
+            state.last_date = pd.Timestamp(history.index[-1]).strftime('%Y-%m-%d')
+        state.updates_since_validation = 0
+
+        return state
+
+    def to_dict(self) -> dict:
+        return {
+            'ticker': self.ticker,
+            'windows': list(self.windows),
+            'buffer': self.closes().tolist(),
+            'sums': self.sums.tolist(),
+            'count': self.count,
+            'last_date': self.last_date,
+            'updates_since_validation': self.updates_since_validation,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        state = cls(data['ticker'], data['windows'])
+        closes = np.asarray(data['buffer'], dtype=float)
+        # Put the newest close back at ring position count - 1
+        positions = data['count'] - len(closes) + np.arange(len(closes))
+        state.buffer[positions % state.capacity] = closes
+        state.sums = np.asarray(data['sums'], dtype=float)
+        state.count = data['count']
+        state.last_date = data['last_date']
+        state.updates_since_validation = data['updates_since_validation']
+        return state
+
+
+def get_state_path(ticker) -> str:
+    safe_name = ticker.replace(os.sep, '_').replace('/', '_')
+    return os.path.join(MA_STATE_DIR, f'{safe_name}.json')
+
+def load_ma_state(ticker):
+    """
+    Load the persisted moving average state for a ticker.
+
+    Args:
+        ticker (str): Stock ticker symbol
+
+    Returns:
+        MovingAverageState or None: None if no state has been saved yet
+    """
+    path = get_state_path(ticker)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path) as f:
+            return MovingAverageState.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error reading moving average state for {ticker}: {e}")
+        return None
+
+def save_ma_state(state: MovingAverageState) -> None:
+    os.makedirs(MA_STATE_DIR, exist_ok=True)
+    path = get_state_path(state.ticker)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state.to_dict(), f)
+    os.replace(tmp_path, path)
+
+def update_moving_averages(ticker, bars: pd.Series, history_loader=None, validate=False) -> dict:
+    """
+    Advance a ticker's persisted moving averages with its newest bars.
+
+    Only bars on or after the state's last date are applied, so a caller only
+    needs the latest close instead of 200 days of history. The daily check does
+    not use this: it fetches the full window anyway to hash its inputs and
+    evaluate the signal rows. intraday.py builds on MovingAverageState directly.
+
+    Args:
+        ticker (str): Stock ticker symbol
+        bars (pd.Series): Recent closes indexed by date, oldest first
+        history_loader (callable, optional): Returns the full close history for
+            the ticker. Used to seed a new state and for periodic reconciliation.
+        validate (bool): If True, reconcile against a full recompute now
+
+    Returns:
+        dict: Current moving averages plus 'date' of the newest bar
+    """
+    state = load_ma_state(ticker)
+
+    if state is None:
+        history = history_loader() if history_loader is not None else bars
+        state = MovingAverageState.from_history(ticker, history)
+
+    for date, close in bars.dropna().items():
+        state.update(pd.Timestamp(date).strftime('%Y-%m-%d'), close)
+
+    if validate or state.updates_since_validation >= VALIDATE_EVERY:
+        state.reconcile(history_loader() if history_loader is not None else None)
+
+    save_ma_state(state)
+
+    result = state.moving_averages()
+    result['date'] = state.last_date
+    return result
@@ -1,30 +1,41 @@
 import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime, timedelta
 
 # data manipulation packages
 import numpy as np
 import pandas as pd
 
-# financial imports
-import fear_and_greed
-import yfinance as yf
+import charts
+import http_pool
+import market_data
+from fng_parser import parse_fng_payload
+from kernel import (MA_WINDOWS, RATING_CATEGORIES, SENTIMENT_CATEGORIES, SIGNAL_CATEGORIES, bull_bear,
+                    close_drop_pct, compute_signal_frame, lookup_by_date, shift, signal, to_dates)
+from signal_state import (SIGNAL_STATE_PATH, get_expected_session_date, get_latest_bar_date, hash_inputs,
+                          is_session_checked, load_signal_state, save_signal_state)
+from spans import end_trace, span, start_trace, timing_summary, traced
 
-# telegram - using requests for synchronous HTTP calls
+# telegram - using pooled requests sessions for synchronous HTTP calls
 
 
-def get_ticker_data(ticker) -> pd.DataFrame:
+@traced('fetch ticker')
+def get_ticker_data(ticker, refresh=False) -> pd.DataFrame:
     """
-    Get raw ticker data from yfinance.
+    Get raw ticker data from yfinance, served from the shared price cache.
     
     Args:
         ticker (str): Stock ticker symbol (e.g., 'VOO', 'AAPL')
+        refresh (bool): If True, discard cached bars and download the full window
         
     Returns:
         pd.DataFrame: Raw price data with OHLCV columns
     """
 
-    ticker_data = yf.Ticker(ticker)
-    return ticker_data.history(period='202d')
+    return market_data.get_prices(ticker, rows=202, refresh=refresh)
 
 def get_raw_historical_fng(start_date=None, days_back=5) -> dict:
     """
@@ -54,7 +65,7 @@ def get_raw_historical_fng(start_date=None, days_back=5) -> dict:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }      
         
-        response = requests.get(url, headers=headers)
+        response = http_pool.get(url, headers=headers)
         response.raise_for_status()
         
         return response.json()
@@ -66,6 +77,113 @@ def get_raw_historical_fng(start_date=None, days_back=5) -> dict:
         print(f"Error parsing FNG data: {e}")
         return {}
 
+@traced('fetch FNG')
+def get_stored_historical_fng() -> dict:
+    """
+    Get the full Fear and Greed Index history from the shared FNG store.
+    
+    The store is backfilled on first use and afterwards only the days it is
+    missing are requested from CNN.
+    
+    Returns:
+        dict: Raw JSON data in the same shape as get_raw_historical_fng()
+    """
+    return market_data.get_fng(fetch=lambda start_date: get_raw_historical_fng(start_date=start_date))
+
+# Per-source limits for the fetch stage, in seconds
+FETCH_TIMEOUTS = {
+    'ticker': 30,
+    'fng': 20,
+}
+FETCH_DEADLINE_SECONDS = 45
+
+# Module-level so worker threads are reused across warm invocations
+_fetch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='fetch')
+
+def fetch_concurrently(sources: dict, timeouts=None, deadline=FETCH_DEADLINE_SECONDS):
+    """
+    Run every data source at the same time and collect what finishes in time.
+    
+    Args:
+        sources (dict): Source name -> zero-argument callable returning its data
+        timeouts (dict, optional): Source name -> seconds allowed for that source,
+                                   counted from when a worker starts running it
+        deadline (float): Seconds allowed for the whole stage, across all sources
+        
+    Returns:
+        tuple: (results, errors) dicts keyed by source name. A source that failed
+               or ran out of time appears only in errors.
+    """
+    timeouts = timeouts or {}
+    stage_end = time.monotonic() + deadline
+    started = {name: {'event': threading.Event(), 'at': None} for name in sources}
+    
+    def run(name, fetch):
+        started[name]['at'] = time.monotonic()
+        started[name]['event'].set()
+        return fetch()
+    
+    futures = {name: _fetch_executor.submit(run, name, fetch) for name, fetch in sources.items()}
+    
+    results = {}
+    errors = {}
+    for name, future in futures.items():
+        limit = timeouts.get(name, deadline)
+        
+        try:
+            # Sources queued behind others only start their clock once a worker picks them up
+            if not started[name]['event'].wait(max(stage_end - time.monotonic(), 0)):
+                raise FuturesTimeoutError()
+            end = min(started[name]['at'] + limit, stage_end)
+            results[name] = future.result(timeout=max(end - time.monotonic(), 0))
+        except FuturesTimeoutError:
+            # The worker cannot be interrupted, but nothing waits on it any more
+            future.cancel()
+            if started[name]['at'] is None:
+                errors[name] = f"not started within the {deadline}s deadline"
+            elif started[name]['at'] + limit <= stage_end:
+                errors[name] = f"timed out after {limit}s"
+            else:
+                errors[name] = f"timed out at the {deadline}s deadline"
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+    
+    for name, error in errors.items():
+        print(f"Error fetching {name}: {error}")
+    
+    return results, errors
+
+def fetch_market_data(ticker='VOO') -> dict:
+    """
+    Fetch ticker prices and Fear and Greed data concurrently.
+    
+    Args:
+        ticker (str): Stock ticker symbol
+        
+    Returns:
+        dict: 'ticker_data' (raw price DataFrame) and 'raw_fng_data' (raw FNG
+              payload, {} if it could not be fetched in time)
+        
+    Raises:
+        RuntimeError: If the ticker data could not be fetched in time
+    """
+    results, errors = fetch_concurrently(
+        {
+            'ticker': lambda: get_ticker_data(ticker),
+            'fng': get_stored_historical_fng,
+        },
+        timeouts=FETCH_TIMEOUTS,
+    )
+    
+    if 'ticker' not in results:
+        raise RuntimeError(f"Could not fetch {ticker} data: {errors['ticker']}")
+    
+    return {
+        'ticker_data': results['ticker'],
+        'raw_fng_data': results.get('fng', {}),
+    }
+
+@traced('process_fng')
 def process_fng(raw_data: dict) -> pd.DataFrame:
     """
     Process raw Fear and Greed Index data into a DataFrame.
@@ -74,53 +192,15 @@ def process_fng(raw_data: dict) -> pd.DataFrame:
         raw_data (dict): Raw JSON data from the CNN API
         
     Returns:
-        pd.DataFrame: DataFrame with columns ['date', 'fng_value', 'rating']
+        pd.DataFrame: DataFrame with columns ['date' (datetime64), 'fng_value' (float32),
+                      'rating' (categorical)]
     """
     if not raw_data:
         return pd.DataFrame()
     
     try:
-        # Extract historical data
-        historical_data = raw_data['fear_and_greed_historical']['data']
-        
-        # Create DataFrame
-        fng_df = pd.DataFrame(historical_data)
-        
-        # Convert timestamp to readable datetime
-        fng_df['x'] = pd.to_datetime(fng_df['x'], unit='ms')
-        fng_df = fng_df.rename(columns={'x': 'datetime', 'y': 'fng_value'})
-        
-        # Filter to only keep rows with 00:00:00 timestamp (end-of-day values)
-        fng_df = fng_df[fng_df['datetime'].dt.time == pd.Timestamp('00:00:00').time()]
-        
-        # Now extract just the date part
-        fng_df['date'] = fng_df['datetime'].dt.date
-        
-        # Add rating column based on fng_value
-        def get_rating(value):
-            if value <= 25:
-                return "Extreme Fear"
-            elif value <= 45:
-                return "Fear"
-            elif value <= 55:
-                return "Neutral"
-            elif value <= 75:
-                return "Greed"
-            else:
-                return "Extreme Greed"
-        
-        # Round fng_value to whole number (0 decimal places)
-        fng_df['fng_value'] = fng_df['fng_value'].round(0)
-        
-        fng_df['rating'] = fng_df['fng_value'].apply(get_rating)
-        
-        # Reset index to have date as a column
-        fng_df = fng_df.reset_index(drop=True)
-        
-        # Sort by date
-        fng_df = fng_df.sort_values('date')
-        
-        return fng_df[['date', 'fng_value', 'rating']]
+        # End-of-day headline values only; parse_fng_payload() also reads the sub-indicators
+        return parse_fng_payload(raw_data, indicators=False)
     
     except (KeyError, ValueError) as e:
         print(f"Error processing FNG data: {e}")
@@ -136,7 +216,8 @@ def add_moving_averages(ticker_df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Ticker data with moving averages added
     """
-    df = ticker_df.copy()
+    # Only columns are added, so the new frame shares the caller's data instead of copying it
+    df = ticker_df.copy(deep=False)
     
     # Calculate moving averages
     df['50ma'] = df['Close'].rolling(window=50, center=False).mean()
@@ -145,6 +226,7 @@ def add_moving_averages(ticker_df: pd.DataFrame) -> pd.DataFrame:
     
     return df
 
+@traced('add_signal')
 def add_signal(processed_df: pd.DataFrame) -> pd.DataFrame:
     """
     Add signal column to processed dataframe.
@@ -153,32 +235,34 @@ def add_signal(processed_df: pd.DataFrame) -> pd.DataFrame:
         processed_df (pd.DataFrame): Processed dataframe with ticker data, moving averages, and FNG data
         
     Returns:
-        pd.DataFrame: Dataframe with signal column added
+        pd.DataFrame: Last 2 rows with prev_close, close_drop_pct and a categorical signal column added
     """
-    df = processed_df.copy()
+    # Only the last 2 rows are returned, and each needs just the row before it
+    df = processed_df.iloc[-3:]
     
     # Calculate previous close for CAUTIOUS BUY logic
-    df['prev_close'] = df['Close'].shift(1)
-    df['close_drop_pct'] = ((df['Close'] - df['prev_close']) / df['prev_close']) * 100
-    
-    df['signal'] = np.where(
-        # always 'buy' signal when market is fearful
-        df['fng_value'] < 40, 'BUY', np.where(
-            # CAUTIOUS BUY when close is at least 1.5% lower than previous close
-            df['close_drop_pct'] <= -1.5, 'CAUTIOUS BUY', np.where(
-                # always 'wait' signal when market is greedy
-                df['fng_value'] > 60, 'WAIT', np.where(
-                    # if neutral, only buy based on moving average conditions
-                    (df['Close'] > df['200ma']) & (df['Close'] < df['50ma']) & (df['50ma'] > df['200ma']), 'BUY', 'WAIT'
-                )
-            )
-        )
+    close = df['Close'].to_numpy(dtype=float)
+    prev_close = shift(close)
+    
+    signals = signal(
+        df['fng_value'].to_numpy(dtype=float),
+        close,
+        prev_close,
+        df['50ma'].to_numpy(dtype=float),
+        df['200ma'].to_numpy(dtype=float),
+    )
+    
+    df = df.assign(
+        prev_close=prev_close,
+        close_drop_pct=close_drop_pct(close, prev_close),
+        signal=pd.Categorical(signals, categories=SIGNAL_CATEGORIES),
     )
     
     # Return only the last 2 rows to maintain the expected output
     return df.tail(2)
 
-def process_data(ticker_df: pd.DataFrame, raw_fng_data: dict) -> pd.DataFrame:
+@traced('process_data')
+def process_data(ticker_df: pd.DataFrame, raw_fng_data: dict, fng_df=None) -> pd.DataFrame:
     """
     Process raw ticker data and FNG data into a combined dataframe with all features.
     Returns only the last three complete rows with bull/bear sentiment included.
@@ -186,38 +270,48 @@ def process_data(ticker_df: pd.DataFrame, raw_fng_data: dict) -> pd.DataFrame:
     Args:
         ticker_df (pd.DataFrame): Raw ticker data from get_ticker_data()
         raw_fng_data (dict): Raw FNG data from get_raw_historical_fng()
+        fng_df (pd.DataFrame, optional): raw_fng_data already run through process_fng(),
+                                         so a caller that needs it too parses it only once
         
     Returns:
-        pd.DataFrame: Processed data with moving averages, FNG data, and bull/bear sentiment (last 3 rows only)
+        pd.DataFrame: Processed data with moving averages, FNG data, and bull/bear sentiment (last 3 rows only).
+                      'date' is datetime64, 'fng_value' float32, 'rating' and 'bullbear' categorical.
     """
     # Process FNG data
-    fng_df = process_fng(raw_fng_data)
+    if fng_df is None:
+        fng_df = process_fng(raw_fng_data)
     
-    # Add moving averages to ticker data
-    df_with_ma = add_moving_averages(ticker_df)
+    # Moving averages need the full history, but only of the Close column
+    close = ticker_df['Close']
+    mas = {f'{window}ma': close.rolling(window=window, center=False).mean().to_numpy() for window in MA_WINDOWS}
     
-    # Prepare ticker data for joining
-    df_with_ma = df_with_ma.reset_index()
-    df_with_ma['date'] = pd.to_datetime(df_with_ma['Date']).dt.date
+    # Positions of the last 3 rows with every moving average. Only these rows are
+    # joined and labelled, so no full-history frame is built or copied.
+    complete = ~np.isnan(mas['50ma']) & ~np.isnan(mas['100ma']) & ~np.isnan(mas['200ma'])
+    rows = np.flatnonzero(complete)[-3:]
+    dates = to_dates(ticker_df.index[rows])
     
-    # Prepare FNG data for joining
+    # Look up FNG data by date, carrying ratings as category codes
     if not fng_df.empty:
-        # Join FNG data with ticker data on date
-        df_combined = df_with_ma.merge(fng_df, on='date', how='left')
+        fng_dates = fng_df['date'].to_numpy(dtype='datetime64[D]')
+        fng_value = lookup_by_date(dates, fng_dates, fng_df['fng_value'].to_numpy(dtype=np.float32), np.nan)
+        rating_codes = pd.Categorical(fng_df['rating'], categories=RATING_CATEGORIES).codes
+        rating = pd.Categorical.from_codes(lookup_by_date(dates, fng_dates, rating_codes, -1), categories=RATING_CATEGORIES)
     else:
         # If no FNG data, add empty FNG columns
-        df_combined = df_with_ma.copy()
-        df_combined['fng_value'] = np.nan
-        df_combined['rating'] = 'Unknown'
+        fng_value = np.full(len(rows), np.nan, dtype=np.float32)
+        rating = pd.Categorical(['Unknown'] * len(rows), categories=RATING_CATEGORIES)
     
-    # Drop rows with missing moving average data
-    df_complete = df_combined.dropna(subset=['50ma', '100ma', '200ma'])
+    df_complete = ticker_df.iloc[rows].reset_index()
+    df_complete.index = rows
+    for name, ma in mas.items():
+        df_complete[name] = ma[rows]
+    df_complete['date'] = dates
+    df_complete['fng_value'] = fng_value
+    df_complete['rating'] = rating
     
     # Add bull/bear sentiment
-    df_with_sentiment = add_bull_bear(df_complete)
-    
-    # Return only the last 3 rows
-    return df_with_sentiment.tail(3)
+    return add_bull_bear(df_complete)
 
 def add_bull_bear(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -227,7 +321,7 @@ def add_bull_bear(df: pd.DataFrame) -> pd.DataFrame:
         df (pd.DataFrame): DataFrame that must contain columns 'Close', '50ma', '200ma'
         
     Returns:
-        pd.DataFrame: DataFrame with 'bullbear' column added
+        pd.DataFrame: DataFrame with a categorical 'bullbear' column added
         
     Raises:
         ValueError: If required columns are missing from the dataframe
@@ -239,46 +333,76 @@ def add_bull_bear(df: pd.DataFrame) -> pd.DataFrame:
     if missing_columns:
         raise ValueError(f"DataFrame is missing required columns: {missing_columns}")
     
-    df_copy = df.copy()
-    
-    def determine_sentiment(row):
-        price = row['Close']
-        ma50 = row['50ma']
-        ma200 = row['200ma']
-        
-        # Handle missing data
-        if pd.isna(price) or pd.isna(ma50) or pd.isna(ma200):
-            return 'unknown'
-        
-        if (price > ma50) and (ma50 > ma200):
-            return 'bull'
-        elif (price < ma50) and (ma50 < ma200):
-            return 'bear'
-        else:
-            return 'neutral'
+    # Only a column is added, so the new frame shares the caller's data instead of copying it
+    df_copy = df.copy(deep=False)
     
-    df_copy['bullbear'] = df_copy.apply(determine_sentiment, axis=1)
+    df_copy['bullbear'] = pd.Categorical(
+        bull_bear(
+            df_copy['Close'].to_numpy(dtype=float),
+            df_copy['50ma'].to_numpy(dtype=float),
+            df_copy['200ma'].to_numpy(dtype=float),
+        ),
+        categories=SENTIMENT_CATEGORIES,
+    )
     return df_copy
 
-def access_secret(secret_name):
+# Secret Manager client and secret values are cached per warm instance
+SECRET_TTL_SECONDS = 60 * 60
+
+_secret_client = None
+_secret_cache = {}
+_secret_lock = threading.Lock()
+
+def get_secret_client():
+    """Get the shared SecretManagerServiceClient, creating it on first use."""
+    global _secret_client
 
     from google.cloud import secretmanager
 
+    with _secret_lock:
+        if _secret_client is None:
+            _secret_client = secretmanager.SecretManagerServiceClient()
+        return _secret_client
+
+def access_secret(secret_name, refresh=False):
+    """
+    Get a bot token from Secret Manager, served from the process-wide cache.
+    
+    Args:
+        secret_name (str): Bot name, e.g. 'financial-chameleon'
+        refresh (bool): If True, skip the cache and fetch the latest version
+        
+    Returns:
+        str: The secret value
+    """
+    cached = _secret_cache.get(secret_name)
+    if not refresh and cached is not None:
+        value, fetched_at = cached
+        if time.monotonic() - fetched_at < SECRET_TTL_SECONDS:
+            return value
+
     secret_dict = {
         'financial-chameleon': 'the-financial-chameleon-tele-bot',
         'trading-chameleon': 'the-trading-chameleon-tele-bot',
         'crypto-chameleon': 'the-crypto-chameleon-tele-bot'
     }
 
-    client = secretmanager.SecretManagerServiceClient()
+    client = get_secret_client()
     project_id = "the-financial-chameleon"
     secret_id = secret_dict[secret_name]
     name = f"projects/{project_id}/secrets/{secret_id}/versions/latest"
     response = client.access_secret_version(request={"name": name})
 
-    return response.payload.data.decode('UTF-8')
+    value = response.payload.data.decode('UTF-8')
+    _secret_cache[secret_name] = (value, time.monotonic())
+    return value
 
-def get_telebot_token(bot_name):
+def clear_secret_cache():
+    """Drop every cached secret so the next lookup goes to Secret Manager."""
+    _secret_cache.clear()
+
+@traced('token lookup')
+def get_telebot_token(bot_name, refresh=False):
     import os
     
     # Check if running in GCP Cloud Functions (multiple environment variables indicate GCP)
@@ -287,7 +411,7 @@ def get_telebot_token(bot_name):
         os.getenv('K_SERVICE') or 
         os.getenv('GCLOUD_PROJECT')):
         # Running in GCP, use Secret Manager
-        return access_secret(bot_name)
+        return access_secret(bot_name, refresh=refresh)
     else:
         # Running locally, use environment variables
         from dotenv import load_dotenv
@@ -309,10 +433,44 @@ def get_telebot_token(bot_name):
             
         return token
 
-def send_message(bot_name, chat_id, msg, parse_mode=None):
+# Longest Telegram retry_after, in seconds, worth waiting for within one run
+TELEGRAM_MAX_RETRY_AFTER = 30
+
+def post_telegram(bot_name, method, data, files=None):
+    """
+    Call a Bot API method, refreshing a rotated token and waiting out a 429 once each.
+    
+    Args:
+        bot_name (str): Bot whose token is used
+        method (str): Bot API method, e.g. 'sendMessage'
+        data (dict): Form fields
+        files (dict, optional): Multipart file fields
+        
+    Returns:
+        dict: Telegram response
+    """
     token = get_telebot_token(bot_name)
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
+    response = http_pool.post(f"https://api.telegram.org/bot{token}/{method}", data=data, files=files)
+    
+    # A rotated token shows up as 401, so fetch the latest version once and retry
+    if response.status_code == 401:
+        token = get_telebot_token(bot_name, refresh=True)
+        response = http_pool.post(f"https://api.telegram.org/bot{token}/{method}", data=data, files=files)
+    
+    # Back-to-back sends to one chat, e.g. a message and its chart, can be throttled
+    if response.status_code == 429:
+        try:
+            retry_after = float(response.json().get('parameters', {}).get('retry_after', 1))
+        except ValueError:
+            retry_after = 1.0
+        if retry_after <= TELEGRAM_MAX_RETRY_AFTER:
+            time.sleep(retry_after)
+            response = http_pool.post(f"https://api.telegram.org/bot{token}/{method}", data=data, files=files)
     
+    response.raise_for_status()
+    return response.json()
+
+def send_message(bot_name, chat_id, msg, parse_mode=None):
     data = {
         'chat_id': chat_id,
         'text': msg
@@ -321,12 +479,38 @@ def send_message(bot_name, chat_id, msg, parse_mode=None):
     if parse_mode:
         data['parse_mode'] = parse_mode
     
-    response = requests.post(url, data=data)
-    response.raise_for_status()
-    return response.json()
+    with span(f"send {chat_id}", chat_id=chat_id, bot=bot_name):
+        return post_telegram(bot_name, 'sendMessage', data)
 
-def send_signal_change_message(bot_name, chat_id, current_signal, current_row, debug=False):
-    """Send signal change message to telegram channel"""
+def send_photo(bot_name, chat_id, photo, caption=None):
+    """
+    Send a photo: new image bytes, uploaded from memory, or the file_id of one the bot already sent.
+    
+    Args:
+        bot_name (str): Bot whose token is used
+        chat_id (str): Chat id or '@channel'
+        photo (bytes or str): PNG bytes, or a Telegram file_id
+        caption (str, optional): Photo caption
+        
+    Returns:
+        dict: Telegram response
+    """
+    data = {'chat_id': chat_id}
+    files = None
+    
+    if isinstance(photo, bytes):
+        files = {'photo': ('chart.png', photo, 'image/png')}
+    else:
+        data['photo'] = photo
+    
+    if caption:
+        data['caption'] = caption
+    
+    with span(f"send photo {chat_id}", chat_id=chat_id, bot=bot_name, upload=files is not None):
+        return post_telegram(bot_name, 'sendPhoto', data, files=files)
+
+def build_signal_change_message(current_signal, current_row, debug=False):
+    """Build the signal change announcement text"""
     # Choose emoji based on signal
     if current_signal == 'BUY':
         signal_emoji = "🟢"
@@ -363,18 +547,129 @@ def send_signal_change_message(bot_name, chat_id, current_signal, current_row, d
     telegram_msg += f"{qualitative_msg}\n\n"
     telegram_msg += f"🔔 Stay adaptable to market shifts with @thefinancialchameleon"
     
+    return telegram_msg
+
+def send_signal_change_message(bot_name, chat_id, current_signal, current_row, debug=False):
+    """
+    Send signal change message to one telegram channel, or broadcast it to many chats.
+
+    Args:
+        bot_name (str): Bot whose token is used
+        chat_id (str or list): A chat id or '@channel', or a list of them
+        current_signal (str): The new signal
+        current_row (pd.Series): The row the new signal was computed on
+        debug (bool): If True, mark the message as a debugging message
+
+    Returns:
+        dict: Telegram response for a single chat, or the delivery report for a list
+    """
+    telegram_msg = build_signal_change_message(current_signal, current_row, debug=debug)
+
+    if isinstance(chat_id, (list, tuple, set)):
+        from broadcast import broadcast_message
+        return broadcast_message(bot_name, chat_id, telegram_msg)
+
     # Send to main channel
-    send_message(bot_name, chat_id, telegram_msg)
+    return send_message(bot_name, chat_id, telegram_msg)
 
-def main(request=None):
-    """Cloud Function entry point and main logic"""
+# Seconds to wait for the render process before giving up on the chart
+CHART_TIMEOUT = 60
+
+def submit_signal_chart(ticker, fng_df, current_signal, bar_date):
+    """
+    Start rendering the price/MA/FNG chart for a signal shift in the background.
+    
+    Args:
+        ticker (str): Stock ticker symbol
+        fng_df (pd.DataFrame): Processed FNG data from process_fng()
+        current_signal (str): The new signal, shown in the title
+        bar_date (str): Date of the bar the signal was computed on
+        
+    Returns:
+        tuple: (data, title, key, future) for send_signal_chart()
+    """
+    # Enough history for every charted bar to have a 200MA
+    history = market_data.get_prices(ticker, rows=charts.CHART_ROWS + 199)
+    data = charts.chart_data(compute_signal_frame(history, fng_df))
+    title = f"{ticker} · {current_signal} · {bar_date}"
+    key, future = charts.submit_chart(data, title)
+    return data, title, key, future
+
+def send_signal_chart(bot_name, chat_ids, chart, caption=None):
+    """
+    Send a chart from submit_signal_chart() to chats, uploading it at most once per bot.
+    
+    Later sends, including re-runs, reuse the file_id Telegram assigned to the upload.
     
-    # get raw data
-    raw_ticker_data = get_ticker_data('VOO')
-    raw_fng_data = get_raw_historical_fng()
+    Args:
+        bot_name (str): Bot whose token is used
+        chat_ids (iterable): Chat ids or '@channel' usernames
+        chart (tuple): Result of submit_signal_chart()
+        caption (str, optional): Photo caption
+    """
+    data, title, key, future = chart
+    file_id = charts.get_file_id(bot_name, key)
+    
+    for chat_id in chat_ids:
+        if file_id is not None:
+            try:
+                send_photo(bot_name, chat_id, file_id, caption=caption)
+                continue
+            except requests.exceptions.HTTPError as e:
+                # An unusable file_id is a 400; upload the bytes again instead
+                if e.response is None or e.response.status_code != 400:
+                    raise
+                print(f"Chart file_id rejected for {chat_id}, uploading again: {e}")
+        
+        response = send_photo(bot_name, chat_id, future.result(timeout=CHART_TIMEOUT), caption=caption)
+        file_id = response['result']['photo'][-1]['file_id']
+        charts.save_file_id(bot_name, key, file_id)
+
+def main(request=None):
+    """Cloud Function entry point, timing every stage of the run as spans"""
+    start_trace('daily-check')
+    try:
+        return run_daily_check()
+    finally:
+        end_trace()
 
+def run_daily_check(snapshot=None):
+    """
+    Main logic of the daily check
+    
+    Args:
+        snapshot (dict, optional): Already fetched 'ticker_data' and 'raw_fng_data'
+                                   for VOO, e.g. from runner.py. Fetched here if not provided.
+    """
+    
+    # Scheduler retries and weekend runs have nothing new to evaluate. The
+    # intraday function and other instances share the state through the bucket.
+    market_data.pull(SIGNAL_STATE_PATH)
+    state = load_signal_state('VOO')
+    session_date = get_expected_session_date()
+    if is_session_checked(state, session_date):
+        print(f"VOO already evaluated through {session_date}, skipping")
+        return f"No new bar since {state['bar_date']}. Skipped."
+    
+    # get raw data, all sources at once
+    if snapshot is None:
+        snapshot = fetch_market_data('VOO')
+
+    # A holiday has no new bar: remember the session so retries skip the fetch too
+    bar_date = get_latest_bar_date(snapshot['ticker_data'])
+    input_hash = hash_inputs(snapshot['ticker_data'], snapshot['raw_fng_data'])
+    if state.get('bar_date') == bar_date and state.get('input_hash') == input_hash:
+        state['checked_session'] = session_date
+        save_signal_state('VOO', state)
+        market_data.push(SIGNAL_STATE_PATH)
+        print(f"No new VOO bar for session {session_date}, skipping")
+        return f"No new bar since {bar_date}. Skipped."
+
+    # Parsed once, for the signal rows, the stored indicators and the chart
+    fng_df = process_fng(snapshot['raw_fng_data'])
+    
     # process data and get the last 2 complete rows
-    processed_data = process_data(raw_ticker_data, raw_fng_data)
+    processed_data = process_data(snapshot['ticker_data'], snapshot['raw_fng_data'], fng_df=fng_df)
     
     # add signals to processed data
     final_data = add_signal(processed_data)
@@ -382,11 +677,27 @@ def main(request=None):
     # Ensure we have exactly 2 rows for signal comparison
     if len(final_data) != 2:
         raise ValueError(f"Expected exactly 2 rows for analysis, got {len(final_data)}")
+    
+    # Store the daily indicator rows for the weekly job to aggregate
+    market_data.save_indicators('VOO', compute_signal_frame(snapshot['ticker_data'], fng_df))
 
     # Check if signal changed between the two rows
     signals = final_data['signal'].tolist()
+    state.update({
+        'bar_date': bar_date,
+        'signal': signals[1],
+        'input_hash': input_hash,
+        'checked_session': session_date,
+    })
+    # Intraday mode may have announced this bar's CAUTIOUS BUY before the close
+    early_alert = state.get('early_alert') or {}
+    already_announced = state.get('announced_bar_date') == bar_date or (
+        early_alert.get('bar_date') == bar_date and early_alert.get('signal') == signals[1]
+    )
     if signals[0] == signals[1]:
         signal_change_msg = "Signal unchanged. No message sent to main channel.\n\n"
+    elif already_announced:
+        signal_change_msg = f"Signal is {signals[1]}. Change for {bar_date} was already announced to main channel.\n\n"
     else:
         signal_change_msg = f"❗ Signal changed! Signal is now {signals[1]}. Update will be sent to main channel. ❗\n\n"
 
@@ -394,19 +705,38 @@ def main(request=None):
         current_signal = signals[1]
         current_row = final_data.iloc[1]
         
+        # The chart renders in its own process while the announcement goes out
+        try:
+            chart = submit_signal_chart('VOO', fng_df, current_signal, bar_date)
+        except Exception as e:
+            print(f"Error preparing signal chart: {e}")
+            chart = None
+        
         send_signal_change_message(
             bot_name='financial-chameleon',
             chat_id='@thefinancialchameleon',
             current_signal=current_signal,
             current_row=current_row
         )
+        state['announced_bar_date'] = bar_date
+        
+        # The announcement is out, a missing chart only gets logged
+        if chart is not None:
+            try:
+                send_signal_chart('financial-chameleon', ['@thefinancialchameleon'], chart)
+            except Exception as e:
+                print(f"Error sending signal chart: {e}")
+    
+    # Saved before the debug message so a failed debug send never re-announces
+    save_signal_state('VOO', state)
+    market_data.push(SIGNAL_STATE_PATH)
     
     # Convert final_data to simple string for Telegram message
     telegram_debug_msg = signal_change_msg + "═" * 15 + "\n\n" + f"📊 VOO Analysis ({len(final_data)} rows)\n\n"
     
     previous_close = None
     for _, row in final_data.iterrows():
-        telegram_debug_msg += f"Date: {row['date']}\n"
+        telegram_debug_msg += f"Date: {row['date']:%Y-%m-%d}\n"
         
         # Calculate percentage change for the second row
         if previous_close is not None:
@@ -425,6 +755,11 @@ def main(request=None):
         
         previous_close = row['Close']
     
+    # Where this run spent its time, up to the debug send itself
+    summary = timing_summary()
+    if summary:
+        telegram_debug_msg += "\n" + summary + "\n"
+    
     # Send message via Telegram
     send_message(
         bot_name='financial-chameleon',
@@ -446,9 +781,34 @@ def main(request=None):
             current_row=current_row,
             debug=True
         )
+        send_signal_chart(
+            'financial-chameleon',
+            ['@testchameleonchannel'],
+            submit_signal_chart('VOO', fng_df, current_signal, bar_date),
+        )
     
     return "Daily check completed successfully"
 
+def intraday(request=None):
+    """Cloud Function entry point for intraday mode, scheduled every minute during market hours"""
+    from intraday import poll_all
+    
+    start_trace('intraday')
+    try:
+        return poll_all()
+    finally:
+        end_trace()
+
+def run_bots(request=None):
+    """Cloud Function entry point that runs every bot against one shared market snapshot"""
+    from runner import run_all_bots
+    
+    start_trace('runner')
+    try:
+        return run_all_bots()
+    finally:
+        end_trace()
+
 if __name__ == '__main__':
     main()
 
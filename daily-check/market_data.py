@@ -0,0 +1,236 @@
+import os
+
+import pandas as pd
+
+from fng_store import FNG_STORE_PATH, append_fng_points, get_next_fetch_date, load_raw_fng
+from price_cache import CACHE_DIR, get_cache_path, get_cached_history, load_cached_history
+
+
+# Shared by daily-check and weekly-insights. Each function keeps its working copy
+# under CACHE_DIR; when CHAMELEON_DATA_BUCKET is set, every cache file is also
+# mirrored to that Cloud Storage bucket so the other function (and the next cold
+# start) reads what this one stored instead of downloading it again.
+DATA_BUCKET = os.getenv('CHAMELEON_DATA_BUCKET')
+DATA_PREFIX = os.getenv('CHAMELEON_DATA_PREFIX', 'market-data')
+
+INDICATORS_DIR = os.path.join(CACHE_DIR, 'indicators')
+
+BUY_SIGNALS = ('BUY', 'CAUTIOUS BUY')
+
+_bucket = None
+
+
+def get_bucket():
+    """Get the Cloud Storage bucket, creating the client on first use."""
+    global _bucket
+
+    if _bucket is None:
+        # only imported here, nothing else needs cloud storage
+        from google.cloud import storage
+        _bucket = storage.Client().bucket(DATA_BUCKET)
+
+    return _bucket
+
+def _blob_name(path) -> str:
+    relative = os.path.relpath(path, CACHE_DIR).replace(os.sep, '/')
+    return f'{DATA_PREFIX}/{relative}'
+
+def _mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+def pull(path) -> bool:
+    """
+    Download the bucket copy of a cache file if it is newer than the local one.
+
+    Args:
+        path (str): Local cache file path under CACHE_DIR
+
+    Returns:
+        bool: True if the local file was replaced
+    """
+    if not DATA_BUCKET:
+        return False
+
+    from google.api_core.exceptions import GoogleAPIError
+
+    try:
+        blob = get_bucket().get_blob(_blob_name(path))
+        if blob is None:
+            return False
+
+        updated = blob.updated.timestamp()
+        local_mtime = _mtime(path)
+        if local_mtime is not None and updated <= local_mtime:
+            return False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.download'
+        blob.download_to_filename(tmp_path)
+        os.replace(tmp_path, path)
+        # Stamp the bucket time so an unchanged object is not downloaded again
+        os.utime(path, (updated, updated))
+        return True
+
+    except (GoogleAPIError, OSError) as e:
+        print(f"Error pulling {path} from data bucket: {e}")
+        return False
+
+def push(path) -> None:
+    """
+    Upload a cache file to the bucket, if one is configured.
+
+    Args:
+        path (str): Local cache file path under CACHE_DIR
+    """
+    if not DATA_BUCKET or not os.path.exists(path):
+        return
+
+    from google.api_core.exceptions import GoogleAPIError
+
+    try:
+        blob = get_bucket().blob(_blob_name(path))
+        blob.upload_from_filename(path)
+        if blob.updated is not None:
+            updated = blob.updated.timestamp()
+            os.utime(path, (updated, updated))
+
+    except (GoogleAPIError, OSError) as e:
+        print(f"Error pushing {path} to data bucket: {e}")
+
+def get_prices(ticker, rows=202, refresh=False) -> pd.DataFrame:
+    """
+    Get daily OHLCV history, downloading only bars no run has stored yet.
+
+    Args:
+        ticker (str): Stock ticker symbol
+        rows (int): Number of trading days to return
+        refresh (bool): If True, ignore stored bars and download the full window
+
+    Returns:
+        pd.DataFrame: The same shape as yf.Ticker(ticker).history(period=f'{rows}d')
+    """
+    path = get_cache_path(ticker)
+    pull(path)
+
+    before = _mtime(path)
+    history = get_cached_history(ticker, rows=rows, refresh=refresh)
+    if _mtime(path) != before:
+        push(path)
+
+    return history
+
+def load_stored_prices(ticker) -> pd.DataFrame:
+    """
+    Get the stored daily OHLCV history without downloading anything.
+
+    Args:
+        ticker (str): Stock ticker symbol
+
+    Returns:
+        pd.DataFrame: Stored history, or an empty DataFrame if none is stored
+    """
+    pull(get_cache_path(ticker))
+    return load_cached_history(ticker)
+
+def get_fng(fetch=None) -> dict:
+    """
+    Get the full Fear and Greed history from the shared FNG store.
+
+    Args:
+        fetch (callable, optional): Takes a 'YYYY-MM-DD' start date and returns a
+            raw CNN payload. Called only when the store is missing settled days;
+            if None, the store is read as it is.
+
+    Returns:
+        dict: Payload accepted by process_fng(), or {} if nothing is stored
+    """
+    pull(FNG_STORE_PATH)
+
+    start_date = get_next_fetch_date()
+    if fetch is not None and start_date is not None:
+        if append_fng_points(fetch(start_date)):
+            push(FNG_STORE_PATH)
+
+    return load_raw_fng()
+
+def get_indicators_path(ticker) -> str:
+    safe_name = ticker.replace(os.sep, '_').replace('/', '_')
+    return os.path.join(INDICATORS_DIR, f'{safe_name}.parquet')
+
+def save_indicators(ticker, indicators: pd.DataFrame) -> None:
+    """
+    Merge newly computed daily indicator rows into the ticker's stored history.
+
+    Daily runs only see their price window, so rows accumulate here run by run;
+    a bar computed again replaces its stored row.
+
+    Args:
+        ticker (str): Stock ticker symbol
+        indicators (pd.DataFrame): Frame from kernel.compute_signal_frame()
+    """
+    stored = load_indicators(ticker)
+    if not stored.empty:
+        indicators = pd.concat([stored, indicators], ignore_index=True)
+        indicators = indicators.drop_duplicates(subset='date', keep='last').sort_values('date')
+
+    os.makedirs(INDICATORS_DIR, exist_ok=True)
+    path = get_indicators_path(ticker)
+
+    tmp_path = f'{path}.tmp'
+    indicators.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    push(path)
+
+def load_indicators(ticker) -> pd.DataFrame:
+    """
+    Load the daily indicator frame the last daily run stored.
+
+    Args:
+        ticker (str): Stock ticker symbol
+
+    Returns:
+        pd.DataFrame: One row per bar, or an empty DataFrame if none is stored
+    """
+    path = get_indicators_path(ticker)
+    pull(path)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+
+    try:
+        return pd.read_parquet(path)
+    except (OSError, ValueError) as e:
+        print(f"Error reading indicators for {ticker}: {e}")
+        return pd.DataFrame()
+
+def weekly_aggregates(indicators: pd.DataFrame) -> pd.DataFrame:
+    """
+    Roll daily indicator rows up into one row per Monday-Friday week.
+
+    Each row is the last daily row of its week, so Close, moving averages,
+    sentiment and signal are the values the week closed on, plus the week's
+    aggregates.
+
+    Args:
+        indicators (pd.DataFrame): Daily frame from kernel.compute_signal_frame()
+
+    Returns:
+        pd.DataFrame: Weekly rows with added columns 'week_ending', 'days',
+                      'buy_days', 'week_high', 'week_low' and 'week_return_pct'
+    """
+    frame = indicators.assign(
+        week=pd.to_datetime(indicators['date']).dt.to_period('W-FRI'),
+        is_buy=indicators['signal'].isin(BUY_SIGNALS),
+    )
+    grouped = frame.groupby('week', sort=True)
+
+    weekly = grouped.tail(1).copy()
+    weekly['days'] = weekly['week'].map(grouped.size())
+    weekly['buy_days'] = weekly['week'].map(grouped['is_buy'].sum())
+    weekly['week_high'] = weekly['week'].map(grouped['Close'].max())
+    weekly['week_low'] = weekly['week'].map(grouped['Close'].min())
+    weekly['week_ending'] = weekly['week'].dt.end_time.dt.date
+    weekly['week_return_pct'] = weekly['Close'].pct_change() * 100
+
+    weekly = weekly.drop(columns=['week', 'is_buy'])
+    return weekly.reset_index(drop=True)
@@ -0,0 +1,168 @@
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+import threading
+from urllib.parse import unquote_plus
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+# 'record' saves every external response, 'replay' serves them back without any
+# network access. Unset means neither.
+REPLAY_MODE_ENV = 'CHAMELEON_REPLAY_MODE'
+
+# Kept outside the cache directory, which a replay run needs to start empty
+REPLAY_DIR = os.getenv('CHAMELEON_REPLAY_DIR', os.path.join(tempfile.gettempdir(), 'chameleon-replay'))
+
+# Bot tokens never end up in recording keys
+_BOT_TOKEN = re.compile(r'/bot[^/]+/')
+
+# chat_id in a form-encoded or multipart Telegram request body
+_CHAT_ID_FORM = re.compile(rb'(?:^|&)chat_id=([^&]*)')
+_CHAT_ID_MULTIPART = re.compile(rb'name="chat_id"\r\n\r\n([^\r]*)')
+
+# Calls with the same key are numbered in the order this process makes them,
+# so several sends to one chat in a run keep separate recordings. A replay
+# run must therefore make the calls the recorded run made.
+_sequence = {}
+_sequence_lock = threading.Lock()
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when a call was never recorded."""
+
+
+def get_mode():
+    """
+    Get the record/replay mode from the environment.
+
+    Returns:
+        str or None: 'record', 'replay' or None
+
+    Raises:
+        ValueError: If the variable holds anything else
+    """
+    mode = os.getenv(REPLAY_MODE_ENV) or None
+    if mode not in (None, 'record', 'replay'):
+        raise ValueError(f"{REPLAY_MODE_ENV} must be 'record' or 'replay', got {mode!r}")
+    return mode
+
+def next_key(key) -> str:
+    """Number a recording key by how many calls with that key came before it."""
+    with _sequence_lock:
+        count = _sequence.get(key, 0) + 1
+        _sequence[key] = count
+    return f'{key} #{count}'
+
+def _recording_path(source, key) -> str:
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return os.path.join(REPLAY_DIR, source, f'{digest}.pickle')
+
+def load_recording(source, key):
+    path = _recording_path(source, key)
+    if not os.path.exists(path):
+        raise ReplayMissError(f"No {source} recording for {key!r} in {REPLAY_DIR}")
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+def save_recording(source, key, value) -> None:
+    path = _recording_path(source, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(value, f)
+    os.replace(tmp_path, path)
+
+def recorded(source, key, fetch):
+    """
+    Call fetch() through the record/replay layer.
+
+    Used for calls that do not go through http_pool, such as yfinance downloads.
+
+    Args:
+        source (str): Recording group, e.g. 'yahoo'
+        key (str): Identifies the call within the group
+        fetch (callable): Makes the live call
+
+    Returns:
+        The live result, or the recorded one in replay mode
+    """
+    mode = get_mode()
+    if mode is None:
+        return fetch()
+
+    key = next_key(key)
+    if mode == 'replay':
+        return load_recording(source, key)
+
+    result = fetch()
+    if mode == 'record':
+        save_recording(source, key, result)
+    return result
+
+def call_key(method, url, body) -> str:
+    """
+    Recording key for an HTTP call: method, URL without bot token, and body.
+
+    Telegram calls are keyed on their chat_id instead of the body. Message
+    texts carry run-dependent timings and uploads a random multipart boundary,
+    so their bodies never repeat. next_key() tells apart several calls to one chat.
+
+    Args:
+        method (str): HTTP method
+        url (str): Request URL
+        body (bytes or str): Request body, None if there is none
+    """
+    body = body or b''
+    if isinstance(body, str):
+        body = body.encode()
+    key_url = _BOT_TOKEN.sub('/bot<token>/', url)
+
+    if key_url != url:
+        match = _CHAT_ID_FORM.search(body) or _CHAT_ID_MULTIPART.search(body)
+        chat_id = unquote_plus(match.group(1).decode()) if match else ''
+        return f'{method} {key_url} chat_id={chat_id}'
+
+    return f'{method} {key_url} {hashlib.sha1(body).hexdigest()}'
+
+def request_key(request) -> str:
+    """Recording key for a prepared requests request, numbered by next_key()."""
+    return next_key(call_key(request.method, request.url, request.body))
+
+
+class RecordReplayAdapter(HTTPAdapter):
+    """
+    Transport adapter that records responses, or serves recorded ones.
+
+    Mounted on the http_pool session when a replay mode is set, so every call
+    made through http_pool (CNN, Telegram, stand-in Yahoo) is covered.
+    """
+
+    def __init__(self, mode, **kwargs):
+        super().__init__(**kwargs)
+        self.mode = mode
+
+    def send(self, request, **kwargs):
+        key = request_key(request)
+
+        if self.mode == 'replay':
+            status, reason, headers, content = load_recording('http', key)
+            response = Response()
+            response.status_code = status
+            response.reason = reason
+            response.headers = CaseInsensitiveDict(headers)
+            response._content = content
+            response.encoding = get_encoding_from_headers(response.headers)
+            response.url = request.url
+            response.request = request
+            return response
+
+        response = super().send(request, **kwargs)
+        if self.mode == 'record':
+            save_recording('http', key, (response.status_code, response.reason, dict(response.headers), response.content))
+        return response
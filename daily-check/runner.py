@@ -0,0 +1,267 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import market_data
+from batch import BATCH_DEADLINE_SECONDS, get_signal_table, get_universe_data
+from main import FETCH_TIMEOUTS, fetch_concurrently, get_stored_historical_fng, get_ticker_data, run_daily_check, send_message
+from signal_state import (SIGNAL_STATE_PATH, get_expected_session_date, is_session_checked, load_signal_state,
+                          save_signal_state)
+from subscribers import notify_subscribers, watched_tickers
+from spans import end_trace, span, start_trace
+
+
+# One invocation serves every bot: prices for the union of their universes and
+# the FNG history are fetched once, each ticker's signal is computed once, and
+# the bots then evaluate and send in parallel. Watchlist and subscriber tickers
+# are downloaded and evaluated as one grouped panel from batch.py. Deployed as
+# the `run_bots` entry point in main.py, or run with `python runner.py`.
+
+def _env_tickers(name, default) -> tuple:
+    return tuple(ticker.strip() for ticker in os.getenv(name, default).split(',') if ticker.strip())
+
+def run_financial_bot(bot_name, bot, snapshot) -> str:
+    """The daily VOO check, on the shared snapshot instead of its own fetch."""
+    if 'VOO' in snapshot['errors']:
+        raise RuntimeError(f"Could not fetch VOO data: {snapshot['errors']['VOO']}")
+
+    # VOO is left out of the snapshot once its session is evaluated, and
+    # run_daily_check() then skips before it would fetch anything
+    if 'VOO' not in snapshot['prices']:
+        return run_daily_check()
+
+    return run_daily_check({'ticker_data': snapshot['prices']['VOO'], 'raw_fng_data': snapshot['raw_fng_data']})
+
+def run_watchlist_bot(bot_name, bot, snapshot) -> str:
+    """Announce every signal shift in the bot's universe as one message to its channel."""
+    return check_watchlist(bot_name, bot['tickers'], bot['chat_id'], snapshot)
+
+# Bot name -> strategy, universe and channel. A bot without a channel is
+# skipped, so the trading and crypto arms stay off until theirs is set.
+BOTS = {
+    'financial-chameleon': {
+        'strategy': run_financial_bot,
+        'tickers': ('VOO',),
+        'chat_id': '@thefinancialchameleon',
+    },
+    'trading-chameleon': {
+        'strategy': run_watchlist_bot,
+        'tickers': _env_tickers('CHAMELEON_TRADING_TICKERS', 'SPY,QQQ,IWM,DIA'),
+        'chat_id': os.getenv('CHAMELEON_TRADING_CHAT_ID'),
+    },
+    'crypto-chameleon': {
+        'strategy': run_watchlist_bot,
+        'tickers': _env_tickers('CHAMELEON_CRYPTO_TICKERS', 'BTC-USD,ETH-USD'),
+        'chat_id': os.getenv('CHAMELEON_CRYPTO_CHAT_ID'),
+    },
+}
+
+# Bot whose paid subscribers' watchlists are checked on every run, and the
+# channel their alerts sign off with
+SUBSCRIBER_BOT = os.getenv('CHAMELEON_SUBSCRIBER_BOT', 'financial-chameleon')
+SUBSCRIBER_SIGN_OFF = '@thefinancialchameleon'
+
+SIGNAL_EMOJI = {'BUY': "🟢", 'CAUTIOUS BUY': "🟡", 'WAIT': "🔴"}
+
+# Module-level so bot threads are reused across warm invocations
+_bot_executor = ThreadPoolExecutor(max_workers=len(BOTS) + 1, thread_name_prefix='bot')
+
+
+def fetch_snapshot(daily_tickers, universe) -> dict:
+    """
+    Fetch prices and the FNG history for every bot at the same time.
+
+    Args:
+        daily_tickers (iterable): Tickers whose full price history a strategy
+                                  needs, e.g. VOO for run_daily_check()
+        universe (iterable): Watchlist and subscriber tickers, downloaded as one
+                             grouped close panel and evaluated together
+
+    Returns:
+        dict: 'prices' (ticker -> raw price DataFrame), 'signals' (the universe's
+              get_signal_table(), empty if it could not be built), 'raw_fng_data'
+              ({} if it could not be fetched in time) and 'errors' (source -> error)
+    """
+    daily_tickers = list(dict.fromkeys(daily_tickers))
+    universe = list(dict.fromkeys(universe))
+
+    sources = {f'ticker {ticker}': (lambda ticker=ticker: get_ticker_data(ticker)) for ticker in daily_tickers}
+    timeouts = {name: FETCH_TIMEOUTS['ticker'] for name in sources}
+    if universe:
+        # Larger universes take longer, so the universe download gets no per-source limit
+        sources['universe'] = lambda: get_universe_data(universe)
+    # Nothing needs the FNG history when no ticker is left to evaluate
+    if sources:
+        sources['fng'] = get_stored_historical_fng
+        timeouts['fng'] = FETCH_TIMEOUTS['fng']
+
+    results, errors = fetch_concurrently(sources, timeouts=timeouts, deadline=BATCH_DEADLINE_SECONDS)
+
+    snapshot = {
+        'prices': {ticker: results[f'ticker {ticker}'] for ticker in daily_tickers if f'ticker {ticker}' in results},
+        'signals': pd.DataFrame(),
+        'raw_fng_data': results.get('fng', {}),
+        'errors': {name.removeprefix('ticker '): error for name, error in errors.items()},
+    }
+
+    if 'universe' in results:
+        try:
+            snapshot['signals'] = get_signal_table(results['universe'], snapshot['raw_fng_data'])
+        except ValueError as e:
+            print(f"Error computing universe signals: {e}")
+            snapshot['errors']['universe'] = str(e)
+
+    return snapshot
+
+def latest_signals(snapshot, ticker):
+    """
+    A universe ticker's previous and latest signal.
+
+    Returns:
+        tuple or None: (previous signal, new signal, bar date as 'YYYY-MM-DD'),
+                       or None if the ticker has no complete data
+    """
+    table = snapshot['signals']
+    if ticker not in table.index:
+        return None
+
+    row = table.loc[ticker]
+    if row['signal'] is None:
+        return None
+    return row['prev_signal'], row['signal'], f"{row['date']:%Y-%m-%d}"
+
+def build_watchlist_message(changes, chat_id) -> str:
+    """
+    Build one announcement for every shift in a watchlist.
+
+    Args:
+        changes (list): (ticker, previous signal, new signal) tuples
+        chat_id (str): The bot's channel, named in the sign-off
+    """
+    telegram_msg = f"🦎 SIGNAL SHIFT 🦎\n\n"
+    for ticker, prev_signal, current_signal in changes:
+        telegram_msg += f"{SIGNAL_EMOJI.get(current_signal, '⚪')} {ticker}: {current_signal} (was {prev_signal})\n"
+    telegram_msg += f"\n🔔 Stay adaptable to market shifts with {chat_id}"
+
+    return telegram_msg
+
+def check_watchlist(bot_name, tickers, chat_id, snapshot) -> str:
+    """
+    Compare each ticker's last two signals and announce the shifts not yet announced.
+
+    State is kept per bot and ticker, so a ticker two bots watch is announced
+    by each of them once.
+
+    Args:
+        bot_name (str): Bot whose token is used
+        tickers (iterable): The bot's universe
+        chat_id (str): Channel the announcement goes to
+        snapshot (dict): Result of fetch_snapshot()
+
+    Returns:
+        str: What was found and sent
+    """
+    states = {}
+    changes = []
+    missing = []
+    for ticker in tickers:
+        latest = latest_signals(snapshot, ticker)
+        if latest is None:
+            missing.append(ticker)
+            continue
+
+        prev_signal, current_signal, bar_date = latest
+
+        state_key = f'{bot_name}/{ticker}'
+        state = load_signal_state(state_key)
+        if prev_signal != current_signal and state.get('announced_bar_date') != bar_date:
+            changes.append((ticker, prev_signal, current_signal))
+            state['announced_bar_date'] = bar_date
+        state.update({'bar_date': bar_date, 'signal': current_signal})
+        states[state_key] = state
+
+    if changes:
+        send_message(bot_name, chat_id, build_watchlist_message(changes, chat_id))
+
+    # Saved only once the announcement is out, so a failed send is retried next run
+    for state_key, state in states.items():
+        save_signal_state(state_key, state)
+
+    result = f"{len(changes)} of {len(states)} signals changed"
+    if changes:
+        result += ": " + ", ".join(f"{ticker} {current_signal}" for ticker, _, current_signal in changes)
+    if missing:
+        result += f" (no data for {', '.join(missing)})"
+    return result
+
+def run_all_bots(bots=None) -> str:
+    """
+    Fetch one snapshot for every bot, then run all their strategies in parallel.
+
+    Args:
+        bots (dict, optional): Bot configs keyed by bot name. Defaults to BOTS.
+
+    Returns:
+        str: One result line per bot
+    """
+    bots = {name: bot for name, bot in (bots or BOTS).items() if bot['chat_id']}
+
+    # Every bot records what it announced in the shared signal state
+    market_data.pull(SIGNAL_STATE_PATH)
+
+    # The financial bot needs VOO's full price history for run_daily_check(),
+    # unless a previous run already evaluated the latest session. Every other
+    # ticker only needs its closes in the universe panel.
+    session_date = get_expected_session_date()
+    daily_tickers = [
+        ticker for bot in bots.values() if bot['strategy'] is run_financial_bot for ticker in bot['tickers']
+        if not is_session_checked(load_signal_state(ticker), session_date)
+    ]
+    universe = [ticker for bot in bots.values() if bot['strategy'] is not run_financial_bot for ticker in bot['tickers']]
+
+    # Subscribers add their distinct watched tickers, however many of them there are
+    watched = watched_tickers(SUBSCRIBER_BOT) if SUBSCRIBER_BOT in bots else []
+    universe += watched
+
+    with span('snapshot', tickers=len(set(daily_tickers + universe))):
+        snapshot = fetch_snapshot(daily_tickers, universe)
+
+    futures = {name: _bot_executor.submit(bot['strategy'], name, bot, snapshot) for name, bot in bots.items()}
+    if watched:
+        futures[f'{SUBSCRIBER_BOT} subscribers'] = _bot_executor.submit(
+            notify_subscribers, SUBSCRIBER_BOT, watched, snapshot, SUBSCRIBER_SIGN_OFF
+        )
+
+    lines = []
+    for name, future in futures.items():
+        try:
+            lines.append(f"{name}: {future.result()}")
+        except Exception as e:
+            print(f"Error running {name}: {e}")
+            lines.append(f"{name}: error")
+
+    market_data.push(SIGNAL_STATE_PATH)
+
+    return "\n".join(lines)
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Run every bot against one shared market snapshot.')
+    parser.add_argument('bots', nargs='*', help=f"default: every bot with a channel ({', '.join(BOTS)})")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.bots) - set(BOTS)
+    if unknown:
+        parser.error(f"unknown bot: {', '.join(sorted(unknown))}")
+
+    start_trace('runner')
+    try:
+        print(run_all_bots({name: BOTS[name] for name in args.bots} if args.bots else None))
+    finally:
+        end_trace()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
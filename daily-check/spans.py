@@ -0,0 +1,161 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+
+# Set to 0 to turn spans off. They are only recorded while a trace is active,
+# so helpers called outside main() (backtests, benchmarks) never pay for them.
+SPANS_ENV = 'CHAMELEON_SPANS'
+
+_trace = None
+_trace_lock = threading.Lock()
+
+# Fetch threads finish spans at the same time, and print() writes the record
+# and its newline separately, so two records could share one log line
+_output_lock = threading.Lock()
+
+
+class _NoopSpan:
+    """Shared do-nothing span returned while no trace is active."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+
+    def __init__(self, trace, name, fields):
+        self.trace = trace
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self.started) * 1000
+        record = {
+            'span': self.name,
+            'duration_ms': round(duration_ms, 1),
+            'status': 'ok' if exc_type is None else 'error',
+            **self.fields,
+        }
+        if exc_type is not None:
+            record['error'] = f"{exc_type.__name__}: {exc}"
+
+        with _trace_lock:
+            self.trace['spans'].append(record)
+
+        # One JSON object per line is picked up by Cloud Logging as a structured entry
+        line = json.dumps({
+            'severity': 'INFO' if exc_type is None else 'ERROR',
+            'message': f"{self.name} took {duration_ms:.0f} ms",
+            'trace_id': self.trace['trace_id'],
+            **record,
+        }, default=str) + '\n'
+        with _output_lock:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+        return False
+
+
+def is_enabled() -> bool:
+    return os.getenv(SPANS_ENV, '1') != '0'
+
+def start_trace(name):
+    """
+    Start collecting spans for one run, replacing any previous trace.
+
+    Args:
+        name (str): Name of the run, e.g. 'daily-check'
+
+    Returns:
+        str or None: Trace id, or None when spans are disabled
+    """
+    global _trace
+
+    if not is_enabled():
+        _trace = None
+        return None
+
+    _trace = {'name': name, 'trace_id': uuid.uuid4().hex[:16], 'started': time.perf_counter(), 'spans': []}
+    return _trace['trace_id']
+
+def end_trace() -> list:
+    """
+    Stop collecting spans.
+
+    Returns:
+        list: The recorded spans, in the order they finished
+    """
+    global _trace
+
+    trace, _trace = _trace, None
+    return trace['spans'] if trace else []
+
+def span(name, **fields):
+    """
+    Time a block as a named span of the active trace.
+
+    Args:
+        name (str): Span name, e.g. 'fetch ticker'
+        **fields: Extra values logged with the span
+
+    Returns:
+        A context manager. While no trace is active it is a shared no-op.
+    """
+    trace = _trace
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name, fields)
+
+def traced(name):
+    """Decorator that runs every call of the function inside span(name)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _trace
+            if trace is None:
+                return func(*args, **kwargs)
+            with _Span(trace, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def timing_summary() -> str:
+    """
+    Compact one-line-per-span timing summary of the active trace, for Telegram.
+
+    Spans of the same name are summed, e.g. several sends.
+
+    Returns:
+        str: The summary, or '' when no trace is active
+    """
+    trace = _trace
+    if trace is None:
+        return ''
+
+    with _trace_lock:
+        spans = list(trace['spans'])
+
+    totals = {}
+    for record in spans:
+        count, duration_ms = totals.get(record['span'], (0, 0.0))
+        totals[record['span']] = (count + 1, duration_ms + record['duration_ms'])
+
+    elapsed_ms = (time.perf_counter() - trace['started']) * 1000
+    lines = [f"⏱ Timings (total {elapsed_ms:.0f} ms)"]
+    for name, (count, duration_ms) in totals.items():
+        suffix = f" x{count}" if count > 1 else ''
+        lines.append(f"{name}: {duration_ms:.0f} ms{suffix}")
+    return "\n".join(lines)
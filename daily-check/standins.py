@@ -0,0 +1,481 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from synthetic import MARKET_TIMEZONE, make_fng_payload, make_minute_bars, make_ticker_history, trading_dates
+
+
+# Local stand-ins for Yahoo's chart API, CNN's Fear and Greed endpoint and the
+# Telegram Bot API, so main() can run end to end without network access.
+# Point the pipeline at them through http_pool.OVERRIDES_ENV.
+
+YAHOO_HOST = 'query2.finance.yahoo.com'
+CNN_HOST = 'production.dataviz.cnn.io'
+TELEGRAM_HOST = 'api.telegram.org'
+
+DEFAULT_PORTS = {'yahoo': 8180, 'cnn': 8181, 'telegram': 8182}
+
+# Bars each stand-in generates; requests get a slice of them
+HISTORY_ROWS = 400
+
+# Telegram-style limits: messages per second per bot, and seconds between
+# messages to one chat
+TELEGRAM_GLOBAL_RATE = 30
+TELEGRAM_CHAT_INTERVAL = 1.0
+
+_RANGE = re.compile(r'^(\d+)d$')
+_TELEGRAM_PATH = re.compile(r'^/bot([^/]+)/(sendMessage|sendPhoto)$')
+
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    HTTP server with the behaviour shared by every stand-in.
+
+    Args:
+        port (int): Port on 127.0.0.1, 0 for any free port
+        handler (type): Request handler class
+        latency_ms (float): Added delay before every response
+        jitter_ms (float): Random extra delay, up to this many milliseconds
+        error_rate (float): Fraction of requests answered with a 503
+        rate_limit (float, optional): Requests per second before answering 429
+        seed (int): Seed for the jitter and error injection
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port, handler, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, rate_limit=None, seed=0):
+        super().__init__(('127.0.0.1', port), handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'throttled': 0}
+        self.window = []
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def admit(self):
+        """
+        Apply latency, rate limiting and error injection to one request.
+
+        Returns:
+            int or None: 429 or 503 to reject the request, None to serve it
+        """
+        with self.lock:
+            self.stats['requests'] += 1
+            delay = self.latency_ms + self.rng.uniform(0, self.jitter_ms)
+            fail = self.rng.random() < self.error_rate
+
+            throttled = False
+            if self.rate_limit:
+                now = time.monotonic()
+                self.window = [t for t in self.window if now - t < 1.0]
+                throttled = len(self.window) >= self.rate_limit
+                if not throttled:
+                    self.window.append(now)
+
+            if throttled:
+                self.stats['throttled'] += 1
+            elif fail:
+                self.stats['errors'] += 1
+
+        if delay:
+            time.sleep(delay / 1000)
+        if throttled:
+            return 429
+        if fail:
+            return 503
+        return None
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def reject(self, status):
+        if status == 429:
+            self.send_json(429, {'error': 'Too Many Requests'}, {'Retry-After': '1'})
+        else:
+            self.send_json(status, {'error': 'Injected failure'})
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+
+class YahooHandler(StandinHandler):
+    """Yahoo's v8 chart endpoint, with a seeded random walk per ticker ending at the current session."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if not url.path.startswith('/v8/finance/chart/'):
+            self.send_json(404, {'chart': {'result': None, 'error': {'code': 'Not Found'}}})
+            return
+
+        status = self.server.admit()
+        if status:
+            self.reject(status)
+            return
+
+        ticker = url.path.rsplit('/', 1)[-1]
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.send_json(200, self.server.chart(ticker, params))
+
+
+class YahooServer(StandinServer):
+    """
+    Args:
+        intraday_drift (float): Percent move of the minute bars by the close, e.g. -3.0
+        clock (callable): Returns epoch seconds; minute bars after it are not served yet
+    """
+
+    def __init__(self, port, as_of=None, intraday_drift=0.0, clock=time.time, **kwargs):
+        super().__init__(port, YahooHandler, **kwargs)
+        self.as_of = as_of
+        self.intraday_drift = intraday_drift
+        self.clock = clock
+
+    def chart(self, ticker, params) -> dict:
+        # Imported here so run_main() can set the cache directory before signal_state reads it
+        from signal_state import get_expected_session_date
+        end = self.as_of or str(get_expected_session_date())
+        # Same ticker, same prices, whatever the window
+        history_df = make_ticker_history(HISTORY_ROWS, end=end, seed=sum(ticker.encode()))
+
+        if params.get('interval') == '1m':
+            return self.minute_chart(ticker, params, history_df)
+
+        match = _RANGE.match(params.get('range', ''))
+        if match:
+            history_df = history_df.tail(int(match.group(1)))
+        elif 'period1' in params:
+            start = pd.Timestamp(int(params['period1']), unit='s', tz='UTC').tz_convert(MARKET_TIMEZONE).normalize()
+            history_df = history_df[history_df.index >= start]
+
+        seconds = history_df.index.tz_convert('UTC').asi8 // 10**9
+        dividends = {
+            str(day): {'amount': amount, 'date': int(day)}
+            for day, amount in zip(seconds, history_df['Dividends'])
+            if amount
+        }
+
+        return {
+            'chart': {
+                'result': [{
+                    'meta': {'symbol': ticker, 'currency': 'USD', 'exchangeTimezoneName': MARKET_TIMEZONE},
+                    'timestamp': seconds.tolist(),
+                    'events': {'dividends': dividends},
+                    'indicators': {'quote': [{
+                        'open': history_df['Open'].tolist(),
+                        'high': history_df['High'].tolist(),
+                        'low': history_df['Low'].tolist(),
+                        'close': history_df['Close'].tolist(),
+                        'volume': history_df['Volume'].tolist(),
+                    }]},
+                }],
+                'error': None,
+            }
+        }
+
+    def minute_chart(self, ticker, params, history_df) -> dict:
+        """The session's minute bars so far, continuing from the last daily close before it."""
+        now = min(self.clock(), int(params.get('period2', self.clock())))
+        first = int(params['period1']) if 'period1' in params else now
+        session = pd.Timestamp(first, unit='s', tz='UTC').tz_convert(MARKET_TIMEZONE).normalize()
+
+        prev_close = history_df.loc[history_df.index < session, 'Close'].iloc[-1]
+        bars = make_minute_bars(
+            prev_close, session.strftime('%Y-%m-%d'), drift_pct=self.intraday_drift, seed=sum(ticker.encode())
+        )
+        bars = bars[(bars.index <= now) & (bars.index >= int(params.get('period1', 0)))]
+
+        return {
+            'chart': {
+                'result': [{
+                    'meta': {'symbol': ticker, 'currency': 'USD', 'exchangeTimezoneName': MARKET_TIMEZONE},
+                    'timestamp': bars.index.tolist(),
+                    'indicators': {'quote': [{'close': bars.tolist()}]},
+                }],
+                'error': None,
+            }
+        }
+
+
+class CnnHandler(StandinHandler):
+    """CNN's graphdata endpoint: /index/fearandgreed/graphdata/{start_date}."""
+
+    def do_GET(self):
+        prefix = '/index/fearandgreed/graphdata/'
+        path = urlparse(self.path).path
+        if not path.startswith(prefix):
+            self.send_json(404, {'error': 'Not Found'})
+            return
+
+        status = self.server.admit()
+        if status:
+            self.reject(status)
+            return
+
+        start = path[len(prefix):] or None
+        self.send_json(200, self.server.graphdata(start))
+
+
+class CnnServer(StandinServer):
+
+    def __init__(self, port, as_of=None, **kwargs):
+        super().__init__(port, CnnHandler, **kwargs)
+        self.as_of = as_of
+
+    def graphdata(self, start) -> dict:
+        # Imported here so run_main() can set the cache directory before signal_state reads it
+        from signal_state import get_expected_session_date
+        end = self.as_of or str(get_expected_session_date())
+        dates = trading_dates(HISTORY_ROWS, end=end)
+        if start:
+            dates = dates[dates >= pd.Timestamp(start, tz=MARKET_TIMEZONE)]
+        return make_fng_payload(dates, seed=1)
+
+
+class TelegramHandler(StandinHandler):
+    """
+    sendMessage and sendPhoto, answering 429 with retry_after like Telegram.
+
+    GET /_messages lists what was received and GET /_stats the counters.
+    """
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/_messages':
+            with self.server.lock:
+                self.send_json(200, list(self.server.messages))
+        elif path == '/_stats':
+            with self.server.lock:
+                self.send_json(200, dict(self.server.stats))
+        else:
+            self.send_json(404, {'ok': False, 'error_code': 404, 'description': 'Not Found'})
+
+    def do_POST(self):
+        body = self.read_body()
+        match = _TELEGRAM_PATH.match(urlparse(self.path).path)
+        if not match:
+            self.send_json(404, {'ok': False, 'error_code': 404, 'description': 'Not Found'})
+            return
+
+        status = self.server.admit()
+        if status == 429:
+            self.send_json(429, {
+                'ok': False, 'error_code': 429, 'description': 'Too Many Requests: retry after 1',
+                'parameters': {'retry_after': 1},
+            })
+            return
+        if status:
+            self.send_json(status, {'ok': False, 'error_code': status, 'description': 'Injected failure'})
+            return
+
+        content_type = self.headers.get('Content-Type', '')
+        if content_type.startswith('application/x-www-form-urlencoded'):
+            fields = {key: values[0] for key, values in parse_qs(body.decode()).items()}
+        elif content_type.startswith('application/json'):
+            fields = json.loads(body or b'{}')
+        elif content_type.startswith('multipart/form-data'):
+            fields = _multipart_fields(content_type, body)
+        else:
+            fields = {}
+
+        retry_after = self.server.chat_slot(str(fields.get('chat_id', '')))
+        if retry_after:
+            self.send_json(429, {
+                'ok': False, 'error_code': 429, 'description': f'Too Many Requests: retry after {retry_after}',
+                'parameters': {'retry_after': retry_after},
+            })
+            return
+
+        message = self.server.receive(match.group(2), fields)
+        self.send_json(200, {'ok': True, 'result': message})
+
+
+class TelegramServer(StandinServer):
+
+    def __init__(self, port, **kwargs):
+        kwargs.setdefault('rate_limit', TELEGRAM_GLOBAL_RATE)
+        super().__init__(port, TelegramHandler, **kwargs)
+        self.messages = []
+        self.chat_last_sent = {}
+
+    def chat_slot(self, chat_id) -> int:
+        """Seconds to wait before this chat may receive another message, 0 if it may now."""
+        with self.lock:
+            now = time.monotonic()
+            wait = self.chat_last_sent.get(chat_id, -TELEGRAM_CHAT_INTERVAL) + TELEGRAM_CHAT_INTERVAL - now
+            if wait > 0:
+                self.stats['throttled'] += 1
+                return max(1, round(wait))
+            self.chat_last_sent[chat_id] = now
+            return 0
+
+    def receive(self, method, fields) -> dict:
+        with self.lock:
+            message = {'message_id': len(self.messages) + 1, 'method': method, 'date': int(time.time()), **fields}
+            self.messages.append(message)
+
+            result = dict(message)
+            if method == 'sendPhoto':
+                # Uploads get a file_id derived from their bytes; a resent file_id is echoed back
+                photo = fields.get('photo', '')
+                if isinstance(photo, bytes):
+                    message['photo'] = f'<{len(photo)} bytes>'
+                    file_id = 'standin-' + hashlib.sha1(photo).hexdigest()
+                    self.stats['uploads'] = self.stats.get('uploads', 0) + 1
+                else:
+                    file_id = photo
+                result['photo'] = [{'file_id': file_id, 'file_unique_id': file_id[-16:]}]
+            return result
+
+
+def _multipart_fields(content_type, body) -> dict:
+    """Form fields of a multipart body; file parts keep their bytes."""
+    message = BytesParser(policy=HTTP).parsebytes(f'Content-Type: {content_type}\r\n\r\n'.encode() + body)
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        payload = part.get_payload(decode=True)
+        fields[name] = payload if part.get_filename() else payload.decode()
+    return fields
+
+def start_standins(ports=None, as_of=None, **behaviour) -> dict:
+    """
+    Start the Yahoo, CNN and Telegram stand-ins on background threads.
+
+    Args:
+        ports (dict, optional): 'yahoo', 'cnn' and 'telegram' ports. 0 picks a free port.
+        as_of (str, optional): 'YYYY-MM-DD' date of the last bar. Defaults to the current session.
+        **behaviour: latency_ms, jitter_ms, error_rate, rate_limit and seed for every stand-in,
+            and intraday_drift for the Yahoo minute bars
+
+    Returns:
+        dict: Name -> running StandinServer
+    """
+    ports = {**DEFAULT_PORTS, **(ports or {})}
+    intraday_drift = behaviour.pop('intraday_drift', 0.0)
+    servers = {
+        'yahoo': YahooServer(ports['yahoo'], as_of=as_of, intraday_drift=intraday_drift, **behaviour),
+        'cnn': CnnServer(ports['cnn'], as_of=as_of, **behaviour),
+        'telegram': TelegramServer(ports['telegram'], **behaviour),
+    }
+    for server in servers.values():
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return servers
+
+def stop_standins(servers) -> None:
+    for server in servers.values():
+        server.shutdown()
+        server.server_close()
+
+def get_overrides(servers) -> str:
+    """The http_pool.OVERRIDES_ENV value that routes the pipeline to these stand-ins."""
+    hosts = {'yahoo': YAHOO_HOST, 'cnn': CNN_HOST, 'telegram': TELEGRAM_HOST}
+    return ','.join(f'{hosts[name]}={server.base_url}' for name, server in servers.items())
+
+def run_main(servers, runs=1) -> list:
+    """
+    Run main() against the stand-ins with a fresh cache, timing each run.
+
+    Module-level config is read at import, so the environment is set before
+    main is imported.
+    """
+    os.environ['CHAMELEON_HTTP_OVERRIDES'] = get_overrides(servers)
+    if os.getenv('CHAMELEON_REPLAY_MODE'):
+        # A recording only matches a run that starts from the same cache, so
+        # record and replay runs both start from an empty one
+        os.environ['CHAMELEON_CACHE_DIR'] = tempfile.mkdtemp(prefix='chameleon-standins-')
+    else:
+        os.environ.setdefault('CHAMELEON_CACHE_DIR', tempfile.mkdtemp(prefix='chameleon-standins-'))
+    os.environ.setdefault('F_TELEBOT_TOKEN', 'standin-token')
+
+    import main
+    import signal_state
+
+    timings = []
+    for run in range(runs):
+        # Forget the last run so every run does the full fetch and compute
+        signal_state.save_signal_state('VOO', {})
+        if run:
+            # Stay under the stand-in's per-chat limit
+            time.sleep(TELEGRAM_CHAT_INTERVAL)
+        started = time.perf_counter()
+        result = main.main()
+        timings.append(time.perf_counter() - started)
+        print(f"{result} ({timings[-1] * 1000:.0f} ms)")
+    return timings
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Run local stand-ins for Yahoo, CNN and Telegram.')
+    for name, port in DEFAULT_PORTS.items():
+        parser.add_argument(f'--{name}-port', type=int, default=port, help=f'default: {port}')
+    parser.add_argument('--as-of', help='date of the last bar, YYYY-MM-DD (default: current session)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='delay added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='random extra delay, up to this much')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with a 503')
+    parser.add_argument('--rate-limit', type=float, help='requests per second per stand-in before answering 429')
+    parser.add_argument('--seed', type=int, default=0, help='seed for jitter and error injection')
+    parser.add_argument('--intraday-drift', type=float, default=0.0,
+                        help='percent move of the minute bars by the close, e.g. -3 for a crash day')
+    parser.add_argument('--run-main', type=int, metavar='N', help='run main() N times against the stand-ins, then exit')
+    args = parser.parse_args(argv)
+
+    ports = {name: getattr(args, f'{name}_port') for name in DEFAULT_PORTS}
+    behaviour = {
+        'latency_ms': args.latency_ms,
+        'jitter_ms': args.jitter_ms,
+        'error_rate': args.error_rate,
+        'seed': args.seed,
+        'intraday_drift': args.intraday_drift,
+    }
+    if args.rate_limit is not None:
+        behaviour['rate_limit'] = args.rate_limit
+
+    servers = start_standins(ports, as_of=args.as_of, **behaviour)
+    print(f"CHAMELEON_HTTP_OVERRIDES='{get_overrides(servers)}'")
+
+    try:
+        if args.run_main:
+            run_main(servers, args.run_main)
+            return 0
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        stop_standins(servers)
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup_baseline.json')
+
+# Fail when the median cold import is this much slower than the baseline
+REGRESSION_THRESHOLD = 0.20
+
+
+def profile_import(module='main', runs=5) -> dict:
+    """
+    Measure cold import time of a module with `python -X importtime`.
+
+    Each run is a fresh interpreter, the same as a Cloud Function cold start.
+
+    Args:
+        module (str): Module to import (e.g., 'main')
+        runs (int): Number of fresh interpreters to sample
+
+    Returns:
+        dict: 'median_ms' total import time of the module, 'runs_ms' every
+              sample, and 'top' the slowest imports of the last run as
+              (module, cumulative_ms) pairs
+    """
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    top = []
+
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+        timings = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            timings.append((name.strip(), int(cumulative) / 1000))
+
+        total = next(ms for name, ms in reversed(timings) if name == module)
+        samples.append(total)
+        top = sorted(timings, key=lambda timing: timing[1], reverse=True)[1:16]
+
+    return {
+        'median_ms': statistics.median(samples),
+        'runs_ms': samples,
+        'top': top,
+    }
+
+def load_baseline(path=BASELINE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_baseline(baseline: dict, path=BASELINE_PATH) -> None:
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Report cold-start import time and check it against a baseline.')
+    parser.add_argument('module', nargs='?', default='main', help='module to import (default: main)')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to sample (default: 5)')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='allowed slowdown vs baseline as a fraction (default: 0.20)')
+    parser.add_argument('--update-baseline', action='store_true', help='store this run as the new baseline')
+    args = parser.parse_args(argv)
+
+    report = profile_import(args.module, runs=args.runs)
+
+    print(f"Cold import of '{args.module}': {report['median_ms']:.1f} ms median over {args.runs} runs")
+    print("Slowest imports (cumulative):")
+    for name, ms in report['top']:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    baseline = load_baseline()
+
+    if args.update_baseline:
+        baseline[args.module] = round(report['median_ms'], 1)
+        save_baseline(baseline)
+        print(f"Baseline for '{args.module}' set to {baseline[args.module]:.1f} ms")
+        return 0
+
+    # Without a baseline nothing is checked, so that must not pass as a green gate
+    if args.module not in baseline:
+        print(f"No baseline for '{args.module}'. Run with --update-baseline to record one.")
+        return 1
+
+    limit = baseline[args.module] * (1 + args.threshold)
+    print(f"Baseline: {baseline[args.module]:.1f} ms, limit: {limit:.1f} ms")
+    if report['median_ms'] > limit:
+        print("Cold-start regression detected")
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
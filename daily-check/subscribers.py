@@ -0,0 +1,252 @@
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+from collections import defaultdict
+from contextlib import closing
+
+import market_data
+from price_cache import CACHE_DIR
+from signal_state import load_signal_state, save_signal_state
+from spans import span
+
+
+# Paid-tier watchlists: which tickers each subscriber chat follows, per bot.
+# The watchlist table's ticker index is the ticker -> subscribers lookup: a run
+# reads the distinct watched tickers, computes each one's signal once, and only
+# looks up the chats watching the tickers that changed.
+SUBSCRIBERS_DB_PATH = os.getenv('CHAMELEON_SUBSCRIBERS_DB_PATH', os.path.join(CACHE_DIR, 'subscribers.sqlite3'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watchlist (
+    bot_name TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    PRIMARY KEY (bot_name, chat_id, ticker)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS watchlist_by_ticker ON watchlist (bot_name, ticker, chat_id);
+"""
+
+
+def connect(path=SUBSCRIBERS_DB_PATH) -> sqlite3.Connection:
+    """Open the watchlist database, creating it if needed."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+def _normalize(tickers) -> list:
+    return list(dict.fromkeys(ticker.strip().upper() for ticker in tickers if ticker.strip()))
+
+def subscribe(bot_name, chat_id, tickers, path=SUBSCRIBERS_DB_PATH) -> None:
+    """
+    Add tickers to a chat's watchlist.
+
+    Args:
+        bot_name (str): Bot the chat subscribed through
+        chat_id (str): Subscriber chat id
+        tickers (iterable): Ticker symbols, any case
+        path (str): Path to the watchlist database
+    """
+    market_data.pull(path)
+    with closing(connect(path)) as conn, conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO watchlist (bot_name, chat_id, ticker) VALUES (?, ?, ?)",
+            [(bot_name, str(chat_id), ticker) for ticker in _normalize(tickers)],
+        )
+    market_data.push(path)
+
+def unsubscribe(bot_name, chat_id, tickers=None, path=SUBSCRIBERS_DB_PATH) -> None:
+    """
+    Remove tickers from a chat's watchlist.
+
+    Args:
+        tickers (iterable, optional): Tickers to remove. All of them if not provided.
+    """
+    market_data.pull(path)
+    with closing(connect(path)) as conn, conn:
+        if tickers is None:
+            conn.execute("DELETE FROM watchlist WHERE bot_name = ? AND chat_id = ?", (bot_name, str(chat_id)))
+        else:
+            conn.executemany(
+                "DELETE FROM watchlist WHERE bot_name = ? AND chat_id = ? AND ticker = ?",
+                [(bot_name, str(chat_id), ticker) for ticker in _normalize(tickers)],
+            )
+    market_data.push(path)
+
+def get_watchlist(bot_name, chat_id, path=SUBSCRIBERS_DB_PATH) -> list:
+    """A chat's watched tickers, sorted."""
+    market_data.pull(path)
+    with closing(connect(path)) as conn:
+        rows = conn.execute(
+            "SELECT ticker FROM watchlist WHERE bot_name = ? AND chat_id = ? ORDER BY ticker",
+            (bot_name, str(chat_id)),
+        )
+        return [ticker for ticker, in rows]
+
+def watched_tickers(bot_name, path=SUBSCRIBERS_DB_PATH) -> list:
+    """
+    Get the distinct tickers any of a bot's subscribers watch, from the ticker index.
+
+    Returns:
+        list: Sorted tickers, [] if there are no subscribers
+    """
+    market_data.pull(path)
+    if not os.path.exists(path):
+        return []
+
+    with closing(connect(path)) as conn:
+        rows = conn.execute("SELECT DISTINCT ticker FROM watchlist WHERE bot_name = ? ORDER BY ticker", (bot_name,))
+        return [ticker for ticker, in rows]
+
+def get_subscribers(bot_name, tickers, path=SUBSCRIBERS_DB_PATH) -> dict:
+    """
+    Look up the chats watching each ticker, one index seek per ticker.
+
+    Args:
+        bot_name (str): Bot the watchlists belong to
+        tickers (iterable): Tickers to look up, e.g. the ones whose signal changed
+        path (str): Path to the watchlist database
+
+    Returns:
+        dict: Ticker -> list of chat ids watching it
+    """
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+
+    with closing(connect(path)) as conn:
+        return {
+            ticker: [chat_id for chat_id, in conn.execute(
+                "SELECT chat_id FROM watchlist WHERE bot_name = ? AND ticker = ? ORDER BY chat_id",
+                (bot_name, ticker),
+            )]
+            for ticker in tickers
+        }
+
+def count_subscribers(bot_name, path=SUBSCRIBERS_DB_PATH) -> dict:
+    """Ticker -> number of chats watching it, for the list command."""
+    market_data.pull(path)
+    with closing(connect(path)) as conn:
+        rows = conn.execute(
+            "SELECT ticker, COUNT(*) FROM watchlist WHERE bot_name = ? GROUP BY ticker ORDER BY ticker",
+            (bot_name,),
+        )
+        return dict(rows)
+
+def get_signal_changes(bot_name, tickers, snapshot) -> dict:
+    """
+    Find each watched ticker's signal shift that subscribers have not been sent yet.
+
+    State is kept once per ticker, not per subscriber.
+
+    Args:
+        bot_name (str): Bot the watchlists belong to
+        tickers (iterable): Distinct watched tickers
+        snapshot (dict): Result of runner.fetch_snapshot()
+
+    Returns:
+        dict: Ticker -> (previous signal, new signal, bar date)
+    """
+    from runner import latest_signals
+
+    changes = {}
+    for ticker in tickers:
+        latest = latest_signals(snapshot, ticker)
+        if latest is None:
+            continue
+
+        prev_signal, current_signal, bar_date = latest
+        state = load_signal_state(f'{bot_name}/subscribers/{ticker}')
+        if prev_signal != current_signal and state.get('announced_bar_date') != bar_date:
+            changes[ticker] = (prev_signal, current_signal, bar_date)
+    return changes
+
+def notify_subscribers(bot_name, tickers, snapshot, sign_off, path=SUBSCRIBERS_DB_PATH) -> str:
+    """
+    Send each subscriber one message with the shifts in their watchlist.
+
+    Subscribers are only looked up for the tickers that changed, so work grows
+    with the number of changed tickers and the chats watching them. Chats whose
+    changed tickers are the same share one message text.
+
+    Args:
+        bot_name (str): Bot whose token is used
+        tickers (list): Result of watched_tickers()
+        snapshot (dict): Result of runner.fetch_snapshot() covering the tickers
+        sign_off (str): Channel named at the end of every message
+        path (str): Path to the watchlist database
+
+    Returns:
+        str: What was found and sent
+    """
+    from broadcast import deliver
+    from runner import build_watchlist_message
+
+    changes = get_signal_changes(bot_name, tickers, snapshot)
+
+    per_chat = defaultdict(list)
+    for ticker, chat_ids in get_subscribers(bot_name, changes, path).items():
+        for chat_id in chat_ids:
+            per_chat[chat_id].append(ticker)
+
+    texts = {}
+    messages = []
+    for chat_id, chat_tickers in per_chat.items():
+        key = tuple(chat_tickers)
+        if key not in texts:
+            texts[key] = build_watchlist_message([(ticker, *changes[ticker][:2]) for ticker in key], sign_off)
+        messages.append({'chat_id': chat_id, 'text': texts[key]})
+
+    report = {'sent': 0, 'failed': []}
+    if messages:
+        with span('broadcast', bot=bot_name, chats=len(messages)):
+            report = asyncio.run(deliver(bot_name, messages))
+        if report['failed']:
+            print(f"Watchlist alerts via {bot_name}: {len(report['failed'])} of {report['total']} messages failed")
+
+    # Failed chats are not retried on the next run, or everyone else would get the shift twice
+    for ticker, (_, current_signal, bar_date) in changes.items():
+        save_signal_state(f'{bot_name}/subscribers/{ticker}', {
+            'bar_date': bar_date,
+            'signal': current_signal,
+            'announced_bar_date': bar_date,
+        })
+
+    return (
+        f"{len(changes)} of {len(tickers)} watched tickers changed, "
+        f"{report['sent']} of {len(messages)} subscriber messages sent"
+    )
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Manage subscriber watchlists.')
+    parser.add_argument('--bot', default='financial-chameleon', help='default: financial-chameleon')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="add tickers to a chat's watchlist")
+    add.add_argument('chat_id')
+    add.add_argument('tickers', nargs='+')
+
+    remove = commands.add_parser('remove', help="remove tickers, or the whole watchlist")
+    remove.add_argument('chat_id')
+    remove.add_argument('tickers', nargs='*')
+
+    show = commands.add_parser('list', help="show one chat's watchlist, or every ticker's subscribers")
+    show.add_argument('chat_id', nargs='?')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'add':
+        subscribe(args.bot, args.chat_id, args.tickers)
+    elif args.command == 'remove':
+        unsubscribe(args.bot, args.chat_id, args.tickers or None)
+    elif args.chat_id:
+        print(' '.join(get_watchlist(args.bot, args.chat_id)))
+    else:
+        for ticker, count in count_subscribers(args.bot).items():
+            print(f"{ticker}: {count} subscribers")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+from backtest import prepare_backtest, simulate_dca
+from batch import get_universe_data
+from kernel import close_drop_pct, ma_buy_condition
+from main import get_stored_historical_fng, process_fng
+
+
+# Rough peak bytes simulate_dca() needs per bar x ticker x parameter-set cell
+BYTES_PER_CELL = 160
+
+PARAMETERS = ('fng_buy', 'fng_wait', 'drop_pct')
+
+
+def build_grid(fng_buy, fng_wait, drop_pct) -> pd.DataFrame:
+    """
+    Build every combination of signal thresholds.
+
+    Args:
+        fng_buy (iterable): FNG values below which the signal is always BUY (default rule: 40)
+        fng_wait (iterable): FNG values above which the signal is WAIT (default rule: 60)
+        drop_pct (iterable): Daily % changes at or below which the signal is CAUTIOUS BUY (default rule: -1.5)
+
+    Returns:
+        pd.DataFrame: One row per parameter set with columns PARAMETERS
+    """
+    mesh = np.meshgrid(
+        np.asarray(list(fng_buy), dtype=float),
+        np.asarray(list(fng_wait), dtype=float),
+        np.asarray(list(drop_pct), dtype=float),
+        indexing='ij',
+    )
+    return pd.DataFrame({name: values.ravel() for name, values in zip(PARAMETERS, mesh)})
+
+def buy_mask_grid(fng_value, drop_pct, ma_buy, grid: pd.DataFrame) -> np.ndarray:
+    """
+    Evaluate the add_signal() rules for many threshold sets in one broadcast.
+
+    A bar is a buy (BUY or CAUTIOUS BUY) if fear is below fng_buy, the daily drop
+    reaches drop_pct, or the market is not greedy and the moving average rule holds.
+
+    Args:
+        fng_value (np.ndarray): FNG values, bars x tickers
+        drop_pct (np.ndarray): Daily % change, bars x tickers
+        ma_buy (np.ndarray): Moving average BUY condition, bars x tickers
+        grid (pd.DataFrame): Parameter sets from build_grid()
+
+    Returns:
+        np.ndarray: Boolean array, bars x tickers x parameter sets
+    """
+    fng_buy = grid['fng_buy'].to_numpy()
+    fng_wait = grid['fng_wait'].to_numpy()
+    drop = grid['drop_pct'].to_numpy()
+
+    fng_value = fng_value[..., np.newaxis]
+    return (
+        (fng_value < fng_buy)
+        | (drop_pct[..., np.newaxis] <= drop)
+        | (~(fng_value > fng_wait) & ma_buy[..., np.newaxis])
+    )
+
+def _broadcast_params(values: np.ndarray, n_params: int) -> np.ndarray:
+    """Repeat a bars x tickers array for every parameter set, flattened to bars x (tickers * params)."""
+    shape = values.shape + (n_params,)
+    return np.broadcast_to(values[..., np.newaxis], shape).reshape(values.shape[0], -1)
+
+def run_sweep(close_panel: pd.DataFrame, fng_df: pd.DataFrame, grid: pd.DataFrame,
+              monthly_budget=1000.0, start_date=None, memory_budget_mb=512,
+              rank_by='cagr_diff') -> pd.DataFrame:
+    """
+    Backtest every threshold set in the grid against one shared price/FNG panel.
+
+    Args:
+        close_panel (pd.DataFrame): Dates x tickers closing prices
+        fng_df (pd.DataFrame): Processed FNG data from process_fng()
+        grid (pd.DataFrame): Parameter sets from build_grid()
+        monthly_budget (float): Cash contributed per month
+        start_date (str, optional): 'YYYY-MM-DD' first date to contribute on
+        memory_budget_mb (int): Peak memory allowed per chunk of parameter sets
+        rank_by (str): Metric to sort by, descending
+
+    Returns:
+        pd.DataFrame: One row per parameter set with metrics averaged across
+                      tickers, best first
+    """
+    inputs = prepare_backtest(close_panel, fng_df, monthly_budget=monthly_budget, start_date=start_date)
+    panel, active = inputs['panel'], inputs['active']
+    contributions, years_to_end = inputs['contributions'], inputs['years_to_end']
+    close = panel['Close']
+
+    # Threshold-independent pieces are computed once and shared by every chunk
+    drop_pct = close_drop_pct(close, panel['prev_close'])
+    ma_buy = ma_buy_condition(close, panel['50ma'], panel['200ma'])
+    naive = simulate_dca(close, contributions > 0, contributions, active, years_to_end)
+
+    cells_per_param = close.size
+    chunk_size = max(1, int(memory_budget_mb * 1024 * 1024 // (BYTES_PER_CELL * cells_per_param)))
+
+    n_tickers = close.shape[1]
+    results = []
+    for start in range(0, len(grid), chunk_size):
+        chunk = grid.iloc[start:start + chunk_size]
+        n_params = len(chunk)
+
+        buy_days = buy_mask_grid(panel['fng_value'], drop_pct, ma_buy, chunk).reshape(close.shape[0], -1)
+        metrics = simulate_dca(
+            _broadcast_params(close, n_params),
+            buy_days,
+            _broadcast_params(contributions, n_params),
+            _broadcast_params(active, n_params),
+            _broadcast_params(years_to_end, n_params),
+        )
+
+        per_ticker = {key: values.reshape(n_tickers, n_params) for key, values in metrics.items()}
+        baseline = {key: values[:, np.newaxis] for key, values in naive.items()}
+
+        chunk_results = chunk.reset_index(drop=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            chunk_results['cagr'] = np.nanmean(per_ticker['cagr'], axis=0)
+            chunk_results['cagr_diff'] = np.nanmean(per_ticker['cagr'] - baseline['cagr'], axis=0)
+            chunk_results['max_drawdown'] = np.nanmean(per_ticker['max_drawdown'], axis=0)
+            chunk_results['avg_cost_diff_pct'] = np.nanmean(
+                (per_ticker['avg_cost'] / baseline['avg_cost'] - 1) * 100, axis=0
+            )
+            chunk_results['final_value_diff_pct'] = np.nanmean(
+                (per_ticker['final_value'] / baseline['final_value'] - 1) * 100, axis=0
+            )
+            chunk_results['idle_cash'] = np.nanmean(per_ticker['cash'], axis=0)
+        results.append(chunk_results)
+
+    table = pd.concat(results, ignore_index=True)
+    table = table.sort_values(rank_by, ascending=False).reset_index(drop=True)
+    table.index.name = 'rank'
+
+    return table
+
+def sweep_universe(tickers, fng_buy=range(20, 55, 5), fng_wait=range(50, 85, 5),
+                   drop_pct=(-1.0, -1.5, -2.0, -2.5, -3.0), period='max', **kwargs) -> pd.DataFrame:
+    """
+    Download full histories and rank signal thresholds for one or many tickers.
+
+    Args:
+        tickers (list): Ticker symbols to backtest
+        fng_buy (iterable): Candidate FNG BUY thresholds
+        fng_wait (iterable): Candidate FNG WAIT thresholds
+        drop_pct (iterable): Candidate CAUTIOUS BUY daily drops in %
+        period (str): yfinance period string for the price history
+        **kwargs: Passed through to run_sweep()
+
+    Returns:
+        pd.DataFrame: Ranked table from run_sweep()
+    """
+    close_panel = get_universe_data(tickers, period=period)
+    fng_df = process_fng(get_stored_historical_fng())
+    grid = build_grid(fng_buy, fng_wait, drop_pct)
+    return run_sweep(close_panel, fng_df, grid, **kwargs)
+
+if __name__ == '__main__':
+    print(sweep_universe(['VOO']).head(10))
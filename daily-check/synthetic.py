@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+
+# Synthetic data in the same shapes the pipeline receives from yfinance and CNN,
+# for benchmarks and offline runs. Everything is seeded, so a given call always
+# returns the same data.
+
+MARKET_TIMEZONE = 'America/New_York'
+
+DEFAULT_END = '2025-07-01'
+
+# Sub-indicators CNN returns next to the headline index
+FNG_INDICATORS = (
+    'market_momentum_sp500',
+    'market_momentum_sp125',
+    'stock_price_strength',
+    'stock_price_breadth',
+    'put_call_options',
+    'market_volatility_vix',
+    'market_volatility_vix_50',
+    'junk_bond_demand',
+    'safe_haven_demand',
+)
+
+
+def trading_dates(rows, end=DEFAULT_END) -> pd.DatetimeIndex:
+    """Weekdays ending at `end`, stamped at midnight New York time like yfinance daily bars."""
+    return pd.bdate_range(end=end, periods=rows, tz=MARKET_TIMEZONE, name='Date')
+
+def make_close_panel(rows, tickers, end=DEFAULT_END, seed=0) -> np.ndarray:
+    """
+    Random-walk closing prices.
+
+    Args:
+        rows (int): Bars per ticker
+        tickers (int): Number of tickers
+        end (str): Date of the last bar
+        seed (int): Random seed
+
+    Returns:
+        np.ndarray: Closes, rows x tickers
+    """
+    rng = np.random.default_rng(seed)
+    start = rng.uniform(20, 500, tickers)
+    returns = rng.normal(0.0003, 0.012, (rows, tickers))
+    return start * np.exp(np.cumsum(returns, axis=0))
+
+def make_ticker_history(rows=202, end=DEFAULT_END, seed=0) -> pd.DataFrame:
+    """
+    One ticker's daily history in the shape of yf.Ticker(ticker).history().
+
+    Args:
+        rows (int): Number of bars
+        end (str): Date of the last bar
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: Open, High, Low, Close, Volume, Dividends, Stock Splits,
+                      indexed by a tz-aware 'Date' index
+    """
+    rng = np.random.default_rng(seed + 1)
+    close = make_close_panel(rows, 1, end=end, seed=seed)[:, 0]
+    open_ = close * (1 + rng.normal(0, 0.004, rows))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, rows))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, rows))
+
+    dividends = np.zeros(rows)
+    dividends[rows % 63::63] = np.round(close[rows % 63::63] * 0.004, 4)
+
+    return pd.DataFrame(
+        {
+            'Open': open_,
+            'High': high,
+            'Low': low,
+            'Close': close,
+            'Volume': rng.integers(1_000_000, 10_000_000, rows),
+            'Dividends': dividends,
+            'Stock Splits': np.zeros(rows),
+        },
+        index=trading_dates(rows, end=end),
+    )
+
+def make_universe_panel(tickers=500, rows=202, end=DEFAULT_END, seed=0) -> pd.DataFrame:
+    """
+    Many tickers' closes in the shape of batch.get_universe_data().
+
+    Args:
+        tickers (int): Number of tickers
+        rows (int): Bars per ticker
+        end (str): Date of the last bar
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: Dates x tickers closing prices with a tz-naive index
+    """
+    close = make_close_panel(rows, tickers, end=end, seed=seed)
+    index = trading_dates(rows, end=end).tz_localize(None)
+    return pd.DataFrame(close, index=index, columns=[f'T{i:04d}' for i in range(tickers)])
+
+def _fng_rating(score):
+    if score <= 25:
+        return 'extreme fear'
+    elif score <= 45:
+        return 'fear'
+    elif score <= 55:
+        return 'neutral'
+    elif score <= 75:
+        return 'greed'
+    return 'extreme greed'
+
+def _fng_series(dates, rng, intraday=True) -> list:
+    """End-of-day points at midnight UTC, plus a mid-session point for the last day like CNN's live feed."""
+    scores = np.clip(50 + np.cumsum(rng.normal(0, 4, len(dates))) * 0.3 + rng.normal(0, 8, len(dates)), 0, 100)
+    days_ms = dates.tz_localize(None).normalize().asi8 // 1_000_000
+
+    data = [
+        {'x': float(x), 'y': float(y), 'rating': _fng_rating(y)}
+        for x, y in zip(days_ms, scores)
+    ]
+    if intraday and data:
+        last = data[-1]
+        data.append({'x': last['x'] + 14.5 * 60 * 60 * 1000, 'y': last['y'], 'rating': last['rating']})
+
+    return data
+
+def make_fng_payload(dates=None, rows=202, end=DEFAULT_END, seed=0, indicators=True) -> dict:
+    """
+    A Fear and Greed payload in the shape of CNN's graphdata endpoint.
+
+    Args:
+        dates (pd.DatetimeIndex, optional): Days to cover. Defaults to `rows` weekdays ending at `end`.
+        rows (int): Number of days when dates is not given
+        end (str): Last day when dates is not given
+        seed (int): Random seed
+        indicators (bool): If True, include the sub-indicator series
+
+    Returns:
+        dict: Payload accepted by process_fng()
+    """
+    if dates is None:
+        dates = trading_dates(rows, end=end)
+
+    rng = np.random.default_rng(seed + 2)
+    historical = _fng_series(dates, rng)
+    latest = historical[-1]
+    timestamp = pd.Timestamp(latest['x'], unit='ms', tz='UTC').isoformat()
+
+    payload = {
+        'fear_and_greed': {
+            'score': latest['y'],
+            'rating': latest['rating'],
+            'timestamp': timestamp,
+            'previous_close': historical[-2]['y'] if len(historical) > 1 else latest['y'],
+            'previous_1_week': historical[max(len(historical) - 6, 0)]['y'],
+            'previous_1_month': historical[max(len(historical) - 22, 0)]['y'],
+            'previous_1_year': historical[max(len(historical) - 253, 0)]['y'],
+        },
+        'fear_and_greed_historical': {
+            'timestamp': latest['x'],
+            'score': latest['y'],
+            'rating': latest['rating'],
+            'data': historical,
+        },
+    }
+
+    if indicators:
+        for name in FNG_INDICATORS:
+            series = _fng_series(dates, rng)
+            payload[name] = {
+                'timestamp': series[-1]['x'],
+                'score': series[-1]['y'],
+                'rating': series[-1]['rating'],
+                'data': series,
+            }
+
+    return payload
+
+def make_minute_bars(prev_close, session_date=DEFAULT_END, minutes=390, drift_pct=0.0, seed=0) -> pd.Series:
+    """
+    One session's one-minute closes in the shape of price_cache.fetch_minute_bars().
+
+    Args:
+        prev_close (float): Previous session's close, where the walk starts
+        session_date (str): Session date
+        minutes (int): Number of bars from the 9:30 open
+        drift_pct (float): Percent change the walk trends towards by the last bar,
+                           e.g. -3.0 for a crash day
+        seed (int): Random seed
+
+    Returns:
+        pd.Series: Closes indexed by bar start in epoch seconds
+    """
+    rng = np.random.default_rng(seed + 3)
+    opening = pd.Timestamp(f'{session_date} 09:30', tz=MARKET_TIMEZONE)
+    seconds = opening.value // 10**9 + 60 * np.arange(minutes)
+
+    trend = np.linspace(0, np.log1p(drift_pct / 100), minutes)
+    noise = np.cumsum(rng.normal(0, 0.0004, minutes))
+    return pd.Series(prev_close * np.exp(trend + noise), index=seconds, name='Close')
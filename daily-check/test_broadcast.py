@@ -0,0 +1,219 @@
+import asyncio
+import time
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+import broadcast
+
+
+API_BASE = 'http://telegram.test'
+
+# The event loop may wake a sleeper up to its clock resolution early
+TIMING_SLACK = 0.01
+
+
+@pytest.fixture(autouse=True)
+def fast_limits(monkeypatch):
+    monkeypatch.setattr(broadcast, 'GLOBAL_RATE', 1000.0)
+    monkeypatch.setattr(broadcast, 'PRIVATE_CHAT_INTERVAL', 0.0)
+    monkeypatch.setattr(broadcast, 'GROUP_CHAT_INTERVAL', 0.0)
+    monkeypatch.setattr(broadcast, 'RETRY_BACKOFF', 0.01)
+    monkeypatch.setattr(broadcast, 'get_telebot_token', lambda bot_name, refresh=False: 'token')
+
+
+class FakeTelegram:
+    """Answers sendMessage with handler(chat_id, token) and logs every call."""
+
+    def __init__(self, handler=None):
+        self.handler = handler or (lambda chat_id, token: (200, {'ok': True}))
+        self.calls = []
+
+    def __call__(self, request):
+        data = {name: values[0] for name, values in parse_qs(request.content.decode()).items()}
+        token = request.url.path.split('/')[1][len('bot'):]
+        self.calls.append({'chat_id': data['chat_id'], 'token': token, 'at': time.monotonic(), 'data': data})
+        status, payload = self.handler(data['chat_id'], token)
+        return httpx.Response(status, json=payload)
+
+    def transport(self):
+        return httpx.MockTransport(self)
+
+
+def deliver(telegram, messages, **kwargs):
+    return asyncio.run(broadcast.deliver(
+        'financial-chameleon', messages, transport=telegram.transport(), api_base=API_BASE, **kwargs
+    ))
+
+
+def messages_to(*chat_ids):
+    return [{'chat_id': chat_id, 'text': 'hello'} for chat_id in chat_ids]
+
+
+def test_sends_every_message():
+    telegram = FakeTelegram()
+    report = deliver(telegram, messages_to(*map(str, range(1, 51))))
+
+    assert report['total'] == report['sent'] == 50
+    assert report['failed'] == []
+    assert sorted(int(call['chat_id']) for call in telegram.calls) == list(range(1, 51))
+
+
+def test_no_messages():
+    report = deliver(FakeTelegram(), [])
+    assert report['total'] == report['sent'] == 0
+
+
+def test_paid_broadcast_and_parse_mode():
+    telegram = FakeTelegram()
+    deliver(telegram, [{'chat_id': '1', 'text': '*hi*', 'parse_mode': 'Markdown'}], paid=True)
+
+    assert telegram.calls[0]['data'] == {
+        'chat_id': '1', 'text': '*hi*', 'parse_mode': 'Markdown', 'allow_paid_broadcast': 'true'
+    }
+
+
+def test_429_waits_retry_after_and_retries():
+    throttled = set()
+
+    def handler(chat_id, token):
+        if chat_id not in throttled:
+            throttled.add(chat_id)
+            return 429, {'ok': False, 'description': 'Too Many Requests', 'parameters': {'retry_after': 0.2}}
+        return 200, {'ok': True}
+
+    telegram = FakeTelegram(handler)
+    report = deliver(telegram, messages_to('1'))
+
+    assert report['sent'] == 1
+    assert report['throttled'] == report['retries'] == 1
+    first, second = telegram.calls
+    assert second['at'] - first['at'] >= 0.2 - TIMING_SLACK
+
+
+def test_rate_limiter_pause_holds_back_next_slot():
+    async def run():
+        limiter = broadcast.RateLimiter(0.0)
+        await limiter.acquire()
+        limiter.pause(0.2)
+        paused = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - paused
+
+    assert asyncio.run(run()) >= 0.2 - TIMING_SLACK
+
+
+def test_gives_up_after_max_attempts():
+    telegram = FakeTelegram(lambda chat_id, token: (
+        429, {'ok': False, 'description': 'Too Many Requests', 'parameters': {'retry_after': 0.01}}
+    ))
+    report = deliver(telegram, messages_to('1'))
+
+    assert report['sent'] == 0
+    assert report['failed'] == [{'chat_id': '1', 'status': 429, 'description': 'Too Many Requests'}]
+    assert len(telegram.calls) == broadcast.MAX_ATTEMPTS
+
+
+def test_global_rate_limit(monkeypatch):
+    monkeypatch.setattr(broadcast, 'GLOBAL_RATE', 50.0)
+    telegram = FakeTelegram()
+    deliver(telegram, messages_to(*map(str, range(1, 11))))
+
+    times = sorted(call['at'] for call in telegram.calls)
+    # Ten evenly spaced slots span nine intervals
+    assert times[-1] - times[0] >= 9 / 50 - TIMING_SLACK
+
+
+def test_per_chat_interval(monkeypatch):
+    monkeypatch.setattr(broadcast, 'GROUP_CHAT_INTERVAL', 0.1)
+    telegram = FakeTelegram()
+    deliver(telegram, messages_to('-100', '-100', '-100', '1'))
+
+    group = [call['at'] for call in telegram.calls if call['chat_id'] == '-100']
+    assert len(group) == 3
+    assert all(later - earlier >= 0.1 - TIMING_SLACK for earlier, later in zip(group, group[1:]))
+
+
+def test_server_errors_are_retried():
+    failures = []
+
+    def handler(chat_id, token):
+        if len(failures) < 2:
+            failures.append(chat_id)
+            return 502, {'ok': False, 'description': 'Bad Gateway'}
+        return 200, {'ok': True}
+
+    report = deliver(FakeTelegram(handler), messages_to('1'))
+
+    assert report['sent'] == 1
+    assert report['retries'] == 2
+
+
+def test_rotated_token_is_refreshed_once(monkeypatch):
+    refreshes = []
+
+    def get_telebot_token(bot_name, refresh=False):
+        if refresh:
+            refreshes.append(bot_name)
+            return 'new'
+        return 'old'
+
+    monkeypatch.setattr(broadcast, 'get_telebot_token', get_telebot_token)
+    telegram = FakeTelegram(lambda chat_id, token: (
+        (200, {'ok': True}) if token == 'new' else (401, {'ok': False, 'description': 'Unauthorized'})
+    ))
+    report = deliver(telegram, messages_to(*map(str, range(1, 21))))
+
+    assert report['sent'] == 20
+    assert refreshes == ['financial-chameleon']
+
+
+def test_unchanged_token_fails_on_401():
+    telegram = FakeTelegram(lambda chat_id, token: (401, {'ok': False, 'description': 'Unauthorized'}))
+    report = deliver(telegram, messages_to('1'))
+
+    assert report['failed'] == [{'chat_id': '1', 'status': 401, 'description': 'Unauthorized'}]
+
+
+def test_blocked_chat_fails_without_retry():
+    telegram = FakeTelegram(lambda chat_id, token: (
+        (403, {'ok': False, 'description': 'Forbidden: bot was blocked by the user'}) if chat_id == '2'
+        else (200, {'ok': True})
+    ))
+    report = deliver(telegram, messages_to('1', '2', '3'))
+
+    assert report['sent'] == 2
+    assert report['retries'] == 0
+    assert report['failed'] == [{'chat_id': '2', 'status': 403, 'description': 'Forbidden: bot was blocked by the user'}]
+
+
+def test_bad_request_fails_without_retry():
+    telegram = FakeTelegram(lambda chat_id, token: (400, {'ok': False, 'description': 'Bad Request: chat not found'}))
+    report = deliver(telegram, messages_to('1'))
+
+    assert len(telegram.calls) == 1
+    assert report['failed'] == [{'chat_id': '1', 'status': 400, 'description': 'Bad Request: chat not found'}]
+
+
+def test_migrated_group_is_sent_to_new_id():
+    telegram = FakeTelegram(lambda chat_id, token: (
+        (400, {'ok': False, 'description': 'Bad Request: group chat was upgraded to a supergroup chat',
+               'parameters': {'migrate_to_chat_id': -1001}}) if chat_id == '-5'
+        else (200, {'ok': True})
+    ))
+    report = deliver(telegram, messages_to('-5'))
+
+    assert report['sent'] == 1
+    assert [call['chat_id'] for call in telegram.calls] == ['-5', '-1001']
+
+
+def test_non_json_error_body():
+    def handler(request):
+        return httpx.Response(404, text='<html>Not Found</html>')
+
+    report = asyncio.run(broadcast.deliver(
+        'financial-chameleon', messages_to('1'), transport=httpx.MockTransport(handler), api_base=API_BASE
+    ))
+
+    assert report['failed'] == [{'chat_id': '1', 'status': 404, 'description': '<html>Not Found</html>'}]
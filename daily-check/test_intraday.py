@@ -0,0 +1,199 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import intraday
+from intraday import DEBOUNCE_BARS, EARLY_SIGNAL, IntradayTracker
+from signal_state import MARKET_TIMEZONE
+from synthetic import make_ticker_history
+
+
+SESSION_DATE = '2025-07-02'
+NOW = datetime(2025, 7, 2, 11, 0, tzinfo=MARKET_TIMEZONE)
+
+# Bar start times of the session, one minute apart from the open
+OPEN = int(pd.Timestamp('2025-07-02 09:30', tz=MARKET_TIMEZONE).timestamp())
+
+
+def make_tracker(fng_value=50.0, armed=True) -> IntradayTracker:
+    daily_close = make_ticker_history(rows=260, end='2025-07-01')['Close']
+    return IntradayTracker.start('VOO', SESSION_DATE, daily_close, fng_value, armed=armed)
+
+
+def bar_time(minute) -> int:
+    return OPEN + 60 * minute
+
+
+def drop(tracker, pct) -> float:
+    return tracker.prev_close * (1 + pct / 100)
+
+
+def test_start_ignores_session_bar():
+    daily_close = make_ticker_history(rows=260, end=SESSION_DATE)['Close']
+    tracker = IntradayTracker.start('VOO', SESSION_DATE, daily_close, 50.0)
+
+    assert tracker.prev_close == daily_close.iloc[-2]
+    assert tracker.ma_state.last_date == '2025-07-01'
+
+
+def test_start_needs_a_close_before_session():
+    daily_close = make_ticker_history(rows=5, end='2025-07-10')['Close']
+    with pytest.raises(ValueError):
+        IntradayTracker.start('VOO', '2025-07-01', daily_close, 50.0)
+
+
+def test_moving_averages_match_full_recompute():
+    daily_close = make_ticker_history(rows=260, end='2025-07-01')['Close']
+    tracker = IntradayTracker.start('VOO', SESSION_DATE, daily_close, 50.0)
+    seeded = tracker.ma_state.count
+
+    for minute, close in enumerate([500.0, 498.5, 503.25]):
+        tracker.update(bar_time(minute), close)
+
+    closes = pd.concat([daily_close, pd.Series([503.25])], ignore_index=True)
+    for window in (50, 200):
+        assert tracker.latest[f'{window}ma'] == pytest.approx(closes.rolling(window).mean().iloc[-1], rel=1e-12)
+    # Every minute bar overwrites the one session bar
+    assert tracker.ma_state.count == seeded + 1
+
+
+def test_fires_once_after_debounce():
+    tracker = make_tracker()
+    close = drop(tracker, -2.0)
+
+    fired = [tracker.update(bar_time(minute), close) for minute in range(DEBOUNCE_BARS + 3)]
+
+    assert tracker.latest['signal'] == EARLY_SIGNAL
+    assert fired == [False] * (DEBOUNCE_BARS - 1) + [True] + [False] * 3
+    assert not tracker.armed
+
+
+def test_recovery_resets_debounce():
+    tracker = make_tracker()
+    closes = [drop(tracker, -2.0)] * (DEBOUNCE_BARS - 1) + [drop(tracker, 0.5)] + [drop(tracker, -2.0)] * DEBOUNCE_BARS
+
+    fired = [tracker.update(bar_time(minute), close) for minute, close in enumerate(closes)]
+
+    assert fired.index(True) == len(closes) - 1
+    assert fired.count(True) == 1
+
+
+def test_fearful_market_is_not_an_early_signal():
+    # Below 40 the signal is BUY whatever the drop, which the daily check announces
+    tracker = make_tracker(fng_value=20.0)
+    fired = [tracker.update(bar_time(minute), drop(tracker, -3.0)) for minute in range(DEBOUNCE_BARS)]
+
+    assert tracker.latest['signal'] == 'BUY'
+    assert not any(fired)
+
+
+def test_disarmed_tracker_never_fires():
+    tracker = make_tracker(armed=False)
+    fired = [tracker.update(bar_time(minute), drop(tracker, -2.0)) for minute in range(DEBOUNCE_BARS + 1)]
+
+    assert not any(fired)
+
+
+def test_old_bars_are_ignored():
+    tracker = make_tracker()
+    tracker.update(bar_time(5), 500.0)
+
+    assert not tracker.update(bar_time(5), 400.0)
+    assert not tracker.update(bar_time(4), 400.0)
+    assert tracker.bars == 1
+    assert tracker.latest['close'] == 500.0
+
+
+def test_dict_round_trip():
+    tracker = make_tracker()
+    for minute in range(DEBOUNCE_BARS - 1):
+        tracker.update(bar_time(minute), drop(tracker, -2.0))
+
+    restored = IntradayTracker.from_dict(tracker.to_dict())
+    assert restored.to_dict() == tracker.to_dict()
+    # The streak carries over, so the next poll completes the debounce
+    assert restored.update(bar_time(DEBOUNCE_BARS - 1), drop(tracker, -2.0))
+
+
+@pytest.fixture
+def polling(tmp_path, monkeypatch):
+    """Poll a synthetic session with in-memory bars and a recording announcer."""
+    monkeypatch.setattr(intraday, 'INTRADAY_STATE_DIR', str(tmp_path))
+    monkeypatch.setattr(intraday, 'start_tracker', lambda ticker, session_date: make_tracker())
+
+    session = {'bars': pd.Series(dtype=float), 'announced': [], 'failures': 0}
+
+    def fetch_minute_bars(ticker, since=None):
+        bars = session['bars']
+        return bars if since is None else bars[bars.index > since]
+
+    def announce_early_signal(tracker):
+        if session['failures']:
+            session['failures'] -= 1
+            raise ConnectionError('Telegram unreachable')
+        session['announced'].append(tracker.latest['close'])
+
+    monkeypatch.setattr(intraday, 'fetch_minute_bars', fetch_minute_bars)
+    monkeypatch.setattr(intraday, 'announce_early_signal', announce_early_signal)
+    return session
+
+
+def add_bars(session, closes):
+    start = len(session['bars'])
+    new = pd.Series(closes, index=[bar_time(start + i) for i in range(len(closes))], dtype=float)
+    session['bars'] = pd.concat([session['bars'], new])
+
+
+def test_poll_resumes_from_saved_tracker(polling):
+    prev_close = make_tracker().prev_close
+    add_bars(polling, [prev_close * 0.98] * (DEBOUNCE_BARS - 1))
+    assert not intraday.poll_ticker('VOO', now=NOW)['fired']
+
+    add_bars(polling, [prev_close * 0.98])
+    result = intraday.poll_ticker('VOO', now=NOW)
+
+    assert result['fired']
+    assert result['bars'] == DEBOUNCE_BARS
+    assert len(polling['announced']) == 1
+
+    add_bars(polling, [prev_close * 0.97])
+    assert not intraday.poll_ticker('VOO', now=NOW)['fired']
+    assert len(polling['announced']) == 1
+
+
+def test_failed_announcement_is_retried_next_poll(polling):
+    prev_close = make_tracker().prev_close
+    polling['failures'] = 1
+    add_bars(polling, [prev_close * 0.98] * DEBOUNCE_BARS)
+
+    with pytest.raises(ConnectionError):
+        intraday.poll_ticker('VOO', now=NOW)
+    assert intraday.load_tracker('VOO').armed
+
+    add_bars(polling, [prev_close * 0.98])
+    assert intraday.poll_ticker('VOO', now=NOW)['fired']
+    assert len(polling['announced']) == 1
+
+
+def test_new_session_starts_new_tracker(polling):
+    add_bars(polling, [500.0])
+    intraday.poll_ticker('VOO', now=NOW)
+
+    tracker = intraday.load_tracker('VOO')
+    tracker.session_date = '2025-07-01'
+    intraday.save_tracker(tracker)
+
+    assert intraday.poll_ticker('VOO', now=NOW)['bars'] == 1
+
+
+@pytest.mark.parametrize('now,expected', [
+    (datetime(2025, 7, 2, 9, 29, tzinfo=MARKET_TIMEZONE), False),
+    (datetime(2025, 7, 2, 9, 30, tzinfo=MARKET_TIMEZONE), True),
+    (datetime(2025, 7, 2, 15, 59, tzinfo=MARKET_TIMEZONE), True),
+    (datetime(2025, 7, 2, 16, 0, tzinfo=MARKET_TIMEZONE), False),
+    (datetime(2025, 7, 5, 11, 0, tzinfo=MARKET_TIMEZONE), False),
+])
+def test_is_market_open(now, expected):
+    assert intraday.is_market_open(now) == expected
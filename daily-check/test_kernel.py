@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import kernel
+from main import add_signal, process_data, process_fng
+from synthetic import make_fng_payload, make_ticker_history
+
+
+def reference_signal(fng_value, close, prev_close, ma50, ma200):
+    """The np.where chain add_signal() used before the rules were compiled."""
+    drop_pct = ((close - prev_close) / prev_close) * 100
+    return np.where(
+        fng_value < 40, 'BUY', np.where(
+            drop_pct <= -1.5, 'CAUTIOUS BUY', np.where(
+                fng_value > 60, 'WAIT', np.where(
+                    (close > ma200) & (close < ma50) & (ma50 > ma200), 'BUY', 'WAIT'
+                )
+            )
+        )
+    )
+
+
+def reference_rating(value):
+    """get_rating() from the original process_fng()."""
+    if value <= 25:
+        return "Extreme Fear"
+    elif value <= 45:
+        return "Fear"
+    elif value <= 55:
+        return "Neutral"
+    elif value <= 75:
+        return "Greed"
+    else:
+        return "Extreme Greed"
+
+
+def test_rolling_mean_matches_pandas():
+    rng = np.random.default_rng(0)
+    values = 100 + rng.standard_normal((500, 4)).cumsum(axis=0)
+    values[:30, 1] = np.nan
+    values[250, 2] = np.nan
+
+    result = kernel.rolling_mean(values, 50)
+    expected = pd.DataFrame(values).rolling(50).mean().to_numpy()
+
+    np.testing.assert_allclose(result, expected, rtol=1e-12, atol=0)
+    np.testing.assert_array_equal(np.isnan(result), np.isnan(expected))
+
+
+def test_rolling_mean_shorter_than_window():
+    assert np.isnan(kernel.rolling_mean(np.arange(10.0), 50)).all()
+
+
+def test_fng_rating_bounds_are_inclusive():
+    values = np.array([0, 25, 25.5, 45, 46, 55, 56, 75, 76, 100])
+    assert list(kernel.fng_rating(values)) == [reference_rating(value) for value in values]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_signal_matches_original_chain(seed):
+    rng = np.random.default_rng(seed)
+    shape = (300, 20)
+    fng_value = rng.uniform(0, 100, shape)
+    fng_value[rng.random(shape) < 0.05] = np.nan
+    close = 100 + rng.normal(0, 5, shape)
+    prev_close = close * (1 + rng.normal(0, 0.015, shape))
+    ma50 = 100 + rng.normal(0, 3, shape)
+    ma200 = 100 + rng.normal(0, 3, shape)
+    ma200[:10] = np.nan
+
+    result = kernel.signal(fng_value, close, prev_close, ma50, ma200)
+    expected = reference_signal(fng_value, close, prev_close, ma50, ma200)
+
+    np.testing.assert_array_equal(result.astype(str), expected)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_compute_signal_frame_matches_process_data(seed):
+    ticker_df = make_ticker_history(rows=260, seed=seed)
+    raw_fng_data = make_fng_payload(rows=260, seed=seed)
+
+    expected = add_signal(process_data(ticker_df, raw_fng_data))
+    frame = kernel.compute_signal_frame(ticker_df, process_fng(raw_fng_data))
+    result = frame.tail(2)
+
+    assert list(result.columns) == list(expected.columns)
+    for column in ('Close', '50ma', '100ma', '200ma', 'prev_close', 'close_drop_pct', 'fng_value'):
+        np.testing.assert_allclose(
+            result[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float), rtol=1e-6
+        )
+    for column in ('rating', 'bullbear', 'signal'):
+        assert list(result[column].astype(str)) == list(expected[column].astype(str))
+
+    # Every bar, not only the last two, follows the original rules
+    close = frame['Close'].to_numpy(dtype=float)
+    expected_signal = reference_signal(
+        frame['fng_value'].to_numpy(dtype=float),
+        close,
+        kernel.shift(close),
+        frame['50ma'].to_numpy(dtype=float),
+        frame['200ma'].to_numpy(dtype=float),
+    )
+    np.testing.assert_array_equal(frame['signal'].astype(str).to_numpy(), expected_signal)
+
+
+def test_process_data_reuses_parsed_fng():
+    ticker_df = make_ticker_history(rows=260)
+    raw_fng_data = make_fng_payload(rows=260)
+
+    pd.testing.assert_frame_equal(
+        process_data(ticker_df, raw_fng_data, fng_df=process_fng(raw_fng_data)),
+        process_data(ticker_df, raw_fng_data),
+    )
+
+
+def test_process_data_without_fng():
+    ticker_df = make_ticker_history(rows=260)
+    processed_df = process_data(ticker_df, {})
+
+    assert len(processed_df) == 3
+    assert processed_df['fng_value'].isna().all()
+    assert list(processed_df['rating'].astype(str)) == ['Unknown'] * 3
+    assert list(add_signal(processed_df)['signal'].astype(str)) == list(
+        reference_signal(
+            np.full(2, np.nan),
+            processed_df['Close'].to_numpy()[1:],
+            processed_df['Close'].to_numpy()[:-1],
+            processed_df['50ma'].to_numpy()[1:],
+            processed_df['200ma'].to_numpy()[1:],
+        )
+    )
+
+
+def test_process_data_does_not_modify_input():
+    ticker_df = make_ticker_history(rows=260)
+    before = ticker_df.copy()
+    add_signal(process_data(ticker_df, make_fng_payload(rows=260)))
+    pd.testing.assert_frame_equal(ticker_df, before)
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ma_state
+from ma_state import MovingAverageState
+
+
+def make_closes(rows, seed=0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    closes = 100 + rng.standard_normal(rows).cumsum()
+    return pd.Series(closes, index=pd.bdate_range('2020-01-01', periods=rows))
+
+
+def expected_averages(closes: pd.Series) -> dict:
+    return {f'{window}ma': closes.rolling(window).mean().iloc[-1] for window in (50, 100, 200)}
+
+
+def assert_averages_equal(result, expected):
+    assert result.keys() == expected.keys()
+    for key, value in expected.items():
+        if np.isnan(value):
+            assert np.isnan(result[key]), key
+        else:
+            assert result[key] == pytest.approx(value, rel=1e-12), key
+
+
+def apply(state, closes: pd.Series):
+    for date, close in closes.items():
+        state.update(date.strftime('%Y-%m-%d'), close)
+
+
+@pytest.mark.parametrize('seeded', [0, 10, 150, 200, 250])
+def test_pushes_match_rolling_mean(seeded):
+    closes = make_closes(700)
+    state = MovingAverageState.from_history('VOO', closes.iloc[:seeded])
+
+    apply(state, closes.iloc[seeded:])
+
+    assert_averages_equal(state.moving_averages(), expected_averages(closes))
+    assert state.reconcile() <= ma_state.VALIDATION_TOLERANCE
+
+
+def test_windows_stay_nan_until_filled():
+    closes = make_closes(120)
+    state = MovingAverageState.from_history('VOO', closes.iloc[:40])
+    apply(state, closes.iloc[40:])
+
+    averages = state.moving_averages()
+    assert not np.isnan(averages['50ma'])
+    assert not np.isnan(averages['100ma'])
+    assert np.isnan(averages['200ma'])
+
+
+def test_same_date_replaces_newest_bar():
+    closes = make_closes(300)
+    state = MovingAverageState.from_history('VOO', closes)
+    last_date = closes.index[-1].strftime('%Y-%m-%d')
+    count = state.count
+
+    assert state.update(last_date, 123.0)
+    assert state.count == count
+
+    revised = closes.copy()
+    revised.iloc[-1] = 123.0
+    assert_averages_equal(state.moving_averages(), expected_averages(revised))
+
+
+def test_older_date_is_ignored():
+    closes = make_closes(300)
+    state = MovingAverageState.from_history('VOO', closes)
+    before = state.moving_averages()
+
+    assert not state.update(closes.index[-5].strftime('%Y-%m-%d'), 1.0)
+    assert state.moving_averages() == before
+
+
+def test_reconcile_repairs_drift():
+    closes = make_closes(300)
+    state = MovingAverageState.from_history('VOO', closes)
+    state.sums += 1.0
+
+    assert state.reconcile() > ma_state.VALIDATION_TOLERANCE
+    assert_averages_equal(state.moving_averages(), expected_averages(closes))
+    assert state.updates_since_validation == 0
+
+
+def test_reconcile_rebuilds_from_history():
+    closes = make_closes(300)
+    state = MovingAverageState.from_history('VOO', closes.iloc[:-1])
+    # A close was revised upstream after the state saw it
+    revised = closes.copy()
+    revised.iloc[-10] += 5.0
+
+    state.update(closes.index[-1].strftime('%Y-%m-%d'), closes.iloc[-1])
+    assert state.reconcile(revised) > ma_state.VALIDATION_TOLERANCE
+    assert_averages_equal(state.moving_averages(), expected_averages(revised))
+
+
+@pytest.mark.parametrize('rows', [30, 200, 537])
+def test_dict_round_trip(rows):
+    closes = make_closes(rows + 20)
+    state = MovingAverageState.from_history('VOO', closes.iloc[:rows])
+    apply(state, closes.iloc[rows:])
+
+    restored = MovingAverageState.from_dict(state.to_dict())
+    assert_averages_equal(restored.moving_averages(), state.moving_averages())
+
+    # The ring positions survive too, so later pushes stay exact
+    extra = make_closes(rows + 60, seed=1).iloc[rows + 20:]
+    extra.index = pd.bdate_range(closes.index[-1] + pd.offsets.BDay(), periods=len(extra))
+    apply(restored, extra)
+    assert_averages_equal(restored.moving_averages(), expected_averages(pd.concat([closes, extra])))
+
+
+def test_update_moving_averages_persists_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(ma_state, 'MA_STATE_DIR', str(tmp_path))
+    closes = make_closes(260)
+    loads = []
+
+    def history_loader():
+        loads.append(1)
+        return closes.iloc[:-2]
+
+    ma_state.update_moving_averages('VOO', closes.iloc[-3:-1], history_loader=history_loader)
+    result = ma_state.update_moving_averages('VOO', closes.iloc[-1:], history_loader=history_loader)
+
+    # Seeded once, then advanced from the saved state
+    assert len(loads) == 1
+    assert result['date'] == closes.index[-1].strftime('%Y-%m-%d')
+    assert_averages_equal({key: result[key] for key in ('50ma', '100ma', '200ma')}, expected_averages(closes))
@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+
+import price_cache
+from synthetic import make_ticker_history
+
+
+@pytest.fixture
+def yahoo(tmp_path, monkeypatch):
+    """Serve fetch_history() from a synthetic full history and record every call."""
+    monkeypatch.setattr(price_cache, 'CACHE_DIR', str(tmp_path))
+    source = {'history': make_ticker_history(rows=600, end='2025-07-01')}
+    calls = []
+
+    def fetch_history(ticker, period=None, start=None):
+        calls.append({'period': period, 'start': start})
+        history_df = source['history']
+        if period is not None:
+            return history_df.tail(int(period.rstrip('d')))
+        return history_df[history_df.index >= pd.Timestamp(start, tz=history_df.index.tz)]
+
+    monkeypatch.setattr(price_cache, 'fetch_history', fetch_history)
+    return source, calls
+
+
+def test_first_call_downloads_full_window(yahoo):
+    source, calls = yahoo
+    history_df = price_cache.get_cached_history('VOO', rows=202)
+
+    assert calls == [{'period': '202d', 'start': None}]
+    pd.testing.assert_frame_equal(history_df, source['history'].tail(202))
+    assert len(price_cache.load_cached_history('VOO')) == 202
+
+
+def test_later_call_downloads_from_second_to_last_cached_bar(yahoo):
+    source, calls = yahoo
+    full = source['history']
+    source['history'] = full.iloc[:-3]
+    price_cache.get_cached_history('VOO', rows=202)
+    cached_df = price_cache.load_cached_history('VOO')
+
+    source['history'] = full
+    history_df = price_cache.get_cached_history('VOO', rows=202)
+
+    assert calls[-1] == {'period': None, 'start': cached_df.index[-2].strftime('%Y-%m-%d')}
+    pd.testing.assert_frame_equal(history_df, full.tail(202), check_freq=False)
+
+
+def test_newest_cached_bar_is_replaced(yahoo):
+    source, calls = yahoo
+    full = source['history']
+    # The newest bar was cached mid-session at a different price
+    partial = full.copy()
+    partial.iloc[-1, partial.columns.get_loc('Close')] += 1.0
+    source['history'] = partial
+    price_cache.get_cached_history('VOO', rows=202)
+
+    source['history'] = full
+    history_df = price_cache.get_cached_history('VOO', rows=202)
+
+    assert len(calls) == 2
+    assert history_df['Close'].iloc[-1] == full['Close'].iloc[-1]
+
+
+def test_shifted_adjusted_prices_refresh_full_window(yahoo):
+    source, calls = yahoo
+    price_cache.get_cached_history('VOO', rows=202)
+
+    # A split back-adjusts every bar
+    adjusted = source['history'].copy()
+    adjusted[['Open', 'High', 'Low', 'Close']] /= 2
+    source['history'] = adjusted
+    history_df = price_cache.get_cached_history('VOO', rows=202)
+
+    assert calls[-1] == {'period': '202d', 'start': None}
+    pd.testing.assert_frame_equal(history_df, adjusted.tail(202))
+
+
+def test_cache_keeps_longest_window(yahoo):
+    source, calls = yahoo
+    for rows in (202, 399, 202):
+        history_df = price_cache.get_cached_history('VOO', rows=rows)
+        assert len(history_df) == rows
+
+    assert [call['period'] for call in calls] == ['202d', '399d', None]
+    assert len(price_cache.load_cached_history('VOO')) == 399
+
+
+def test_refresh_ignores_cache(yahoo):
+    source, calls = yahoo
+    price_cache.get_cached_history('VOO', rows=202)
+    price_cache.get_cached_history('VOO', rows=202, refresh=True)
+
+    assert [call['period'] for call in calls] == ['202d', '202d']
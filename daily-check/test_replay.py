@@ -0,0 +1,149 @@
+import asyncio
+
+import httpx
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+import broadcast
+import replay
+from broadcast import RecordReplayTransport
+from replay import RecordReplayAdapter, ReplayMissError, call_key, next_key, recorded
+
+
+@pytest.fixture(autouse=True)
+def recordings(tmp_path, monkeypatch):
+    """Fresh recording directory and call numbering for every test."""
+    monkeypatch.setattr(replay, 'REPLAY_DIR', str(tmp_path))
+    monkeypatch.setattr(replay, '_sequence', {})
+    monkeypatch.delenv(replay.REPLAY_MODE_ENV, raising=False)
+    return tmp_path
+
+
+def start_run(monkeypatch, mode):
+    """A new process: the mode is set and numbering starts over."""
+    monkeypatch.setenv(replay.REPLAY_MODE_ENV, mode)
+    monkeypatch.setattr(replay, '_sequence', {})
+
+
+def test_get_mode(monkeypatch):
+    assert replay.get_mode() is None
+    monkeypatch.setenv(replay.REPLAY_MODE_ENV, 'replay')
+    assert replay.get_mode() == 'replay'
+    monkeypatch.setenv(replay.REPLAY_MODE_ENV, 'playback')
+    with pytest.raises(ValueError):
+        replay.get_mode()
+
+
+def test_next_key_numbers_repeated_keys():
+    assert [next_key('a'), next_key('b'), next_key('a'), next_key('a')] == ['a #1', 'b #1', 'a #2', 'a #3']
+
+
+def test_telegram_calls_are_keyed_on_chat_id():
+    url = 'https://api.telegram.org/bot123:secret/sendMessage'
+
+    form = call_key('POST', url, 'chat_id=%40channel&text=took+812+ms')
+    assert form == 'POST https://api.telegram.org/bot<token>/sendMessage chat_id=@channel'
+    assert call_key('POST', url, b'chat_id=%40channel&text=took+640+ms') == form
+
+    multipart = b'--abc\r\nContent-Disposition: form-data; name="chat_id"\r\n\r\n-100\r\n--abc--\r\n'
+    assert call_key('POST', url.replace('sendMessage', 'sendPhoto'), multipart).endswith('/sendPhoto chat_id=-100')
+
+
+def test_other_calls_are_keyed_on_body():
+    url = 'https://production.dataviz.cnn.io/index/fearandgreed/graphdata/2025-06-01'
+
+    assert call_key('GET', url, None) == call_key('GET', url, b'')
+    assert call_key('POST', url, b'a=1') != call_key('POST', url, b'a=2')
+    assert call_key('GET', url, None) != call_key('GET', url + '?x=1', None)
+
+
+def test_recorded_passes_through_without_mode():
+    calls = []
+    assert recorded('yahoo', 'VOO', lambda: calls.append(1) or 'live') == 'live'
+    assert calls == [1]
+
+
+def test_recorded_replays_in_call_order(monkeypatch):
+    start_run(monkeypatch, 'record')
+    assert [recorded('yahoo', 'VOO', lambda value=value: value) for value in ('first', 'second')] == ['first', 'second']
+
+    start_run(monkeypatch, 'replay')
+
+    def fetch():
+        raise AssertionError('replay must not make live calls')
+
+    assert [recorded('yahoo', 'VOO', fetch) for _ in range(2)] == ['first', 'second']
+    with pytest.raises(ReplayMissError):
+        recorded('yahoo', 'VOO', fetch)
+
+
+def test_replay_miss_raises(monkeypatch):
+    start_run(monkeypatch, 'replay')
+    with pytest.raises(ReplayMissError):
+        recorded('yahoo', 'never recorded', lambda: None)
+
+
+def test_adapter_records_and_replays(monkeypatch):
+    sent = []
+
+    def send(self, request, **kwargs):
+        sent.append(request.url)
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        response._content = f'{{"n": {len(sent)}}}'.encode()
+        response.url = request.url
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, 'send', send)
+
+    def get_twice(mode):
+        session = requests.Session()
+        session.mount('https://', RecordReplayAdapter(mode))
+        return [session.get('https://cnn.test/graphdata').json() for _ in range(2)]
+
+    start_run(monkeypatch, 'record')
+    assert get_twice('record') == [{'n': 1}, {'n': 2}]
+
+    start_run(monkeypatch, 'replay')
+    assert get_twice('replay') == [{'n': 1}, {'n': 2}]
+    assert len(sent) == 2
+
+
+def test_transport_records_and_replays(monkeypatch):
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        return httpx.Response(200, json={'ok': True, 'n': len(sent)})
+
+    def offline(request):
+        raise AssertionError('replay must not make live calls')
+
+    async def send(mode, handler, times):
+        async with httpx.AsyncClient(transport=RecordReplayTransport(mode, httpx.MockTransport(handler))) as client:
+            return [
+                (await client.post('https://api.telegram.org/bottoken/sendMessage', data={'chat_id': '1', 'text': 'x'})).json()
+                for _ in range(times)
+            ]
+
+    start_run(monkeypatch, 'record')
+    assert asyncio.run(send('record', handler, 2)) == [{'ok': True, 'n': 1}, {'ok': True, 'n': 2}]
+
+    start_run(monkeypatch, 'replay')
+    assert asyncio.run(send('replay', offline, 2)) == [{'ok': True, 'n': 1}, {'ok': True, 'n': 2}]
+
+    # A third send to the chat was never recorded
+    start_run(monkeypatch, 'replay')
+    with pytest.raises(ReplayMissError):
+        asyncio.run(send('replay', offline, 3))
+
+
+def test_broadcast_replay_miss_raises(monkeypatch):
+    monkeypatch.setattr(broadcast, 'get_telebot_token', lambda bot_name, refresh=False: 'token')
+    start_run(monkeypatch, 'replay')
+
+    with pytest.raises(ReplayMissError):
+        asyncio.run(broadcast.deliver('financial-chameleon', [{'chat_id': '1', 'text': 'x'}], api_base='http://telegram.test'))
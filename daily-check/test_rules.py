@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+import rules
+from rules import compile_rules, decision_table_rules, parse_condition
+
+
+@pytest.mark.parametrize('condition,expected', [
+    ('fng_value < 40', (False, 'fng_value', '<', (('value', 40.0),))),
+    ('drop_pct <= -1.5', (False, 'drop_pct', '<=', (('value', -1.5),))),
+    ('close > ma200', (False, 'close', '>', (('feature', 'ma200'),))),
+    ('not ma50 > ma200', (True, 'ma50', '>', (('feature', 'ma200'),))),
+    ('close between ma100 ma200', (False, 'close', 'between', (('feature', 'ma100'), ('feature', 'ma200')))),
+    ("fng_desc in ('fear', \"greed\")", (False, 'fng_desc', 'in', (('value', 'fear'), ('value', 'greed')))),
+    (('fng_desc', 'in', ('fear',)), (False, 'fng_desc', 'in', (('value', 'fear'),))),
+    (('close', '>', 'ma200'), (False, 'close', '>', (('value', 'ma200'),))),
+])
+def test_parse_condition(condition, expected):
+    assert parse_condition(condition) == expected
+
+
+@pytest.mark.parametrize('condition', [
+    'close ~ 3',
+    'close >',
+    'close between ma50',
+    'close between 1 2 3',
+    'close < 1 2',
+    'close in ()',
+    'close < 3 + 4',
+    ('close', '~', 3),
+    ('close', 'between', (1,)),
+])
+def test_parse_condition_rejects(condition):
+    with pytest.raises(ValueError):
+        parse_condition(condition)
+
+
+def test_first_matching_rule_wins():
+    evaluator = compile_rules({
+        'rules': [
+            {'when': ['x < 0'], 'then': 'negative'},
+            {'when': ['x < 10'], 'then': 'small'},
+        ],
+        'default': 'large',
+    })
+    x = np.array([-5.0, 0.0, 5.0, 10.0, np.nan])
+
+    assert list(evaluator({'x': x})) == ['negative', 'small', 'small', 'large', 'large']
+
+
+def test_nan_compares_false_and_not_inverts():
+    evaluator = compile_rules({'rules': [{'when': ['not x > 0'], 'then': 'yes'}], 'default': 'no'})
+    assert list(evaluator({'x': np.array([1.0, -1.0, np.nan])})) == ['no', 'yes', 'yes']
+
+
+def test_between_is_strict_in_either_order():
+    evaluator = compile_rules({'rules': [{'when': ['x between a b'], 'then': 'in'}], 'default': 'out'})
+    features = {'x': np.array([1.0, 2.0, 3.0, 5.0]), 'a': np.array([3.0, 3.0, 1.0, 1.0]), 'b': np.array([1.0, 1.0, 3.0, 9.0])}
+
+    assert list(evaluator(features)) == ['out', 'in', 'out', 'in']
+
+
+def test_in_matches_any_listed_value():
+    evaluator = compile_rules({'rules': [{'when': ["s in ('a', 'c')"], 'then': 1}], 'default': 0})
+    assert list(evaluator({'s': np.array(['a', 'b', 'c'], dtype=object)})) == [1, 0, 1]
+
+
+def test_features_broadcast():
+    evaluator = compile_rules({'rules': [{'when': ['close > level'], 'then': 'above'}], 'default': 'below'})
+    result = evaluator({'close': np.array([[1.0, 5.0], [9.0, 2.0]]), 'level': np.array([3.0, 4.0])})
+
+    assert result.shape == (2, 2)
+    assert result.tolist() == [['below', 'above'], ['above', 'below']]
+
+
+def test_shared_conditions_are_compiled_once():
+    evaluator = compile_rules({
+        'rules': [
+            {'when': ['x > 0', 'y > 0'], 'then': 'both'},
+            {'when': ['x > 0'], 'then': 'x'},
+        ],
+        'default': None,
+    })
+
+    assert len(evaluator.conditions) == 2
+    assert evaluator.features == ('x', 'y')
+
+
+def test_missing_feature_raises():
+    evaluator = compile_rules({'rules': [{'when': ['x > y'], 'then': 1}], 'default': 0})
+    with pytest.raises(KeyError):
+        evaluator({'x': np.array([1.0])})
+
+
+def test_decision_table_merges_columns_with_same_output():
+    table = {
+        ('low', 'fear'): 'BUY',
+        ('low', 'greed'): 'BUY',
+        ('low', 'neutral'): 'WAIT',
+        ('high', 'fear'): 'WAIT',
+    }
+    result = decision_table_rules(['trend > 0'], [('low', ['x < 1']), ('high', [])], 'mood', table)
+
+    assert result == [
+        {'when': ['trend > 0', 'x < 1', ('mood', 'in', ('fear', 'greed'))], 'then': 'BUY'},
+        {'when': ['trend > 0', 'x < 1', ('mood', 'in', ('neutral',))], 'then': 'WAIT'},
+        {'when': ['trend > 0', ('mood', 'in', ('fear',))], 'then': 'WAIT'},
+    ]
+
+    evaluator = compile_rules({'rules': result, 'default': 'NONE'})
+    features = {
+        'trend': np.array([1.0, 1.0, 1.0, -1.0]),
+        'x': np.array([0.0, 0.0, 2.0, 0.0]),
+        'mood': np.array(['greed', 'neutral', 'fear', 'fear'], dtype=object),
+    }
+    assert list(evaluator(features)) == ['BUY', 'WAIT', 'WAIT', 'NONE']
+
+
+def test_operators_cover_comparisons():
+    assert set(rules.COMPARISONS) | {'between', 'in'} == set(rules.OPERATORS)
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+
+# Each Cloud Function is deployed from its own directory with --source=., so
+# modules both functions import are copied rather than imported from a sibling
+# directory. daily-check holds the originals; these copies must match them.
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SHARED_MODULES = {
+    'weekly-insights': (
+        'fng_store.py',
+        'http_pool.py',
+        'kernel.py',
+        'lazy.py',
+        'market_data.py',
+        'price_cache.py',
+        'replay.py',
+        'rules.py',
+        'signal_state.py',
+    ),
+    'legacy-code': ('rules.py',),
+}
+
+
+def _read(*parts) -> bytes:
+    with open(os.path.join(REPO_DIR, *parts), 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('directory,module', [
+    (directory, module) for directory, modules in SHARED_MODULES.items() for module in modules
+])
+def test_copy_matches_daily_check(directory, module):
+    assert _read(directory, module) == _read('daily-check', module), (
+        f"{directory}/{module} differs from daily-check/{module}; copy the daily-check version over"
+    )
@@ -0,0 +1,140 @@
+import os
+
+import pandas as pd
+import pytest
+
+import broadcast
+import signal_state
+import subscribers
+
+
+BOT = 'financial-chameleon'
+SIGN_OFF = '@thefinancialchameleon'
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / 'subscribers.sqlite3')
+
+
+@pytest.fixture(autouse=True)
+def clean_signal_state():
+    yield
+    if os.path.exists(signal_state.SIGNAL_STATE_PATH):
+        os.remove(signal_state.SIGNAL_STATE_PATH)
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Capture what deliver() would send."""
+    messages = []
+
+    async def deliver(bot_name, batch, paid=False, transport=None, api_base=None):
+        messages.extend(batch)
+        return {'total': len(batch), 'sent': len(batch), 'failed': [], 'retries': 0, 'throttled': 0}
+
+    monkeypatch.setattr(broadcast, 'deliver', deliver)
+    return messages
+
+
+def make_snapshot(signals) -> dict:
+    """A fetch_snapshot() result from ticker -> (previous signal, signal)."""
+    table = pd.DataFrame(
+        [(ticker, prev_signal, current_signal, pd.Timestamp('2025-07-01')) for ticker, (prev_signal, current_signal) in signals.items()],
+        columns=['ticker', 'prev_signal', 'signal', 'date'],
+    ).set_index('ticker')
+    return {'signals': table}
+
+
+def test_subscribe_normalizes_and_deduplicates(db):
+    subscribers.subscribe(BOT, 1, [' voo', 'QQQ', 'voo', ''], path=db)
+    subscribers.subscribe(BOT, 1, ['VOO'], path=db)
+
+    assert subscribers.get_watchlist(BOT, '1', path=db) == ['QQQ', 'VOO']
+
+
+def test_unsubscribe(db):
+    subscribers.subscribe(BOT, '1', ['VOO', 'QQQ', 'SPY'], path=db)
+    subscribers.unsubscribe(BOT, '1', ['qqq'], path=db)
+    assert subscribers.get_watchlist(BOT, '1', path=db) == ['SPY', 'VOO']
+
+    subscribers.unsubscribe(BOT, '1', path=db)
+    assert subscribers.get_watchlist(BOT, '1', path=db) == []
+
+
+def test_watched_tickers_are_distinct_per_bot(db):
+    assert subscribers.watched_tickers(BOT, path=db) == []
+
+    subscribers.subscribe(BOT, '1', ['VOO', 'QQQ'], path=db)
+    subscribers.subscribe(BOT, '2', ['VOO'], path=db)
+    subscribers.subscribe('other-bot', '3', ['SPY'], path=db)
+
+    assert subscribers.watched_tickers(BOT, path=db) == ['QQQ', 'VOO']
+    assert subscribers.count_subscribers(BOT, path=db) == {'QQQ': 1, 'VOO': 2}
+
+
+def test_get_subscribers_only_for_requested_tickers(db):
+    subscribers.subscribe(BOT, '1', ['VOO', 'QQQ'], path=db)
+    subscribers.subscribe(BOT, '2', ['VOO'], path=db)
+
+    assert subscribers.get_subscribers(BOT, ['VOO'], path=db) == {'VOO': ['1', '2']}
+    assert subscribers.get_subscribers(BOT, ['SPY'], path=db) == {'SPY': []}
+    assert subscribers.get_subscribers(BOT, [], path=db) == {}
+
+
+def test_each_chat_gets_one_message_with_its_changes(db, sent):
+    subscribers.subscribe(BOT, '1', ['VOO', 'QQQ', 'SPY'], path=db)
+    subscribers.subscribe(BOT, '2', ['QQQ', 'VOO'], path=db)
+    subscribers.subscribe(BOT, '3', ['SPY'], path=db)
+    tickers = subscribers.watched_tickers(BOT, path=db)
+    snapshot = make_snapshot({'VOO': ('WAIT', 'BUY'), 'QQQ': ('BUY', 'CAUTIOUS BUY'), 'SPY': ('WAIT', 'WAIT')})
+
+    result = subscribers.notify_subscribers(BOT, tickers, snapshot, SIGN_OFF, path=db)
+
+    assert result == "2 of 3 watched tickers changed, 2 of 2 subscriber messages sent"
+    by_chat = {message['chat_id']: message['text'] for message in sent}
+    assert set(by_chat) == {'1', '2'}
+    # Chats with the same changed tickers share one text
+    assert by_chat['1'] is by_chat['2']
+    assert 'VOO: BUY (was WAIT)' in by_chat['1']
+    assert 'QQQ: CAUTIOUS BUY (was BUY)' in by_chat['1']
+    assert 'SPY' not in by_chat['1']
+    assert by_chat['1'].endswith(SIGN_OFF)
+
+
+def test_shift_is_announced_once(db, sent):
+    subscribers.subscribe(BOT, '1', ['VOO'], path=db)
+    snapshot = make_snapshot({'VOO': ('WAIT', 'BUY')})
+
+    subscribers.notify_subscribers(BOT, ['VOO'], snapshot, SIGN_OFF, path=db)
+    result = subscribers.notify_subscribers(BOT, ['VOO'], snapshot, SIGN_OFF, path=db)
+
+    assert len(sent) == 1
+    assert result == "0 of 1 watched tickers changed, 0 of 0 subscriber messages sent"
+
+
+def test_missing_tickers_are_skipped(db, sent):
+    subscribers.subscribe(BOT, '1', ['VOO', 'NEW'], path=db)
+    snapshot = make_snapshot({'VOO': ('WAIT', 'BUY')})
+
+    result = subscribers.notify_subscribers(BOT, ['NEW', 'VOO'], snapshot, SIGN_OFF, path=db)
+
+    assert result == "1 of 2 watched tickers changed, 1 of 1 subscriber messages sent"
+    assert [message['chat_id'] for message in sent] == ['1']
+
+
+def test_subscribers_are_looked_up_only_for_changed_tickers(db, sent, monkeypatch):
+    subscribers.subscribe(BOT, '1', ['VOO', 'QQQ', 'SPY'], path=db)
+    looked_up = []
+    get_subscribers = subscribers.get_subscribers
+
+    def spy(bot_name, tickers, path):
+        tickers = list(tickers)
+        looked_up.extend(tickers)
+        return get_subscribers(bot_name, tickers, path)
+
+    monkeypatch.setattr(subscribers, 'get_subscribers', spy)
+    snapshot = make_snapshot({'VOO': ('WAIT', 'WAIT'), 'QQQ': ('BUY', 'WAIT'), 'SPY': ('BUY', 'BUY')})
+    subscribers.notify_subscribers(BOT, ['QQQ', 'SPY', 'VOO'], snapshot, SIGN_OFF, path=db)
+
+    assert looked_up == ['QQQ']
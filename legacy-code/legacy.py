@@ -1,6 +1,9 @@
 import asyncio
+import threading
+import time
+from types import MappingProxyType
 
-from google.cloud import secretmanager, storage
+from google.cloud import secretmanager
 
 import telegram
 
@@ -10,8 +13,23 @@ import pandas as pd
 import fear_and_greed
 import yfinance as yf
 
+from rules import compile_rules, decision_table_rules
 
-def access_secret(secret_name):
+
+# Secret Manager client and secret values are cached per warm instance
+SECRET_TTL_SECONDS = 60 * 60
+
+_secret_client = None
+_secret_cache = {}
+
+def access_secret(secret_name, refresh=False):
+    global _secret_client
+
+    cached = _secret_cache.get(secret_name)
+    if not refresh and cached is not None:
+        value, fetched_at = cached
+        if time.monotonic() - fetched_at < SECRET_TTL_SECONDS:
+            return value
 
     secret_dict = {
         'financial-chameleon': 'the-financial-chameleon-tele-bot',
@@ -19,19 +37,25 @@ def access_secret(secret_name):
         'crypto-chameleon': 'the-crypto-chameleon-tele-bot'
     }
 
-    client = secretmanager.SecretManagerServiceClient()
+    if _secret_client is None:
+        _secret_client = secretmanager.SecretManagerServiceClient()
     project_id = "the-financial-chameleon"
     secret_id = secret_dict[secret_name]
     name = f"projects/{project_id}/secrets/{secret_id}/versions/latest"
-    response = client.access_secret_version(request={"name": name})
+    response = _secret_client.access_secret_version(request={"name": name})
 
-    return response.payload.data.decode('UTF-8')
+    value = response.payload.data.decode('UTF-8')
+    _secret_cache[secret_name] = (value, time.monotonic())
+    return value
 
 
 def download_blob_into_memory(bucket_name, blob_name):
     # bucket_name = 'your-bucket-name'
     # blob_name = 'storage-object-name'
 
+    # only imported here, no other code path needs cloud storage
+    from google.cloud import storage
+
     storage_client = storage.Client()
     bucket = storage_client.bucket(bucket_name)
 
@@ -99,16 +123,49 @@ def create_decision_tables():
 
     return bull_decision_table, bear_decision_table
 
+def _freeze_decision_table(table):
+    return MappingProxyType({
+        (row, column): table.loc[row, column]
+        for row in table.index
+        for column in table.columns
+    })
+
+# built once per cold start and read-only afterwards, keyed by (row, fng_desc)
+BULL_DECISIONS, BEAR_DECISIONS = (_freeze_decision_table(table) for table in create_decision_tables())
+
+CATCH_ALL_MSG = f'Should I invest today \U0001F52E:\nWait for a couple of days, let the market settle. \U0000E433'
+
+# where the latest close sits against the moving averages, tried in order
+BULL_ROWS = [
+    ('200ma', ['close < ma200']),
+    ('100ma', ['close between ma100 ma200']),
+    ('50ma', ['close between ma50 ma100']),
+    ('50ma+-', ['close > ma50']),
+]
+BEAR_ROWS = [
+    ('50ma+-', ['close < ma50']),
+    ('50ma', ['close between ma50 ma100']),
+    ('100ma', ['close between ma100 ma200']),
+    ('200ma', ['close < ma200']),
+]
+
+# bull table when the 50ma is above the 200ma, bear table otherwise
+SIIT_RULES = {
+    'rules': (
+        decision_table_rules(['ma50 > ma200'], BULL_ROWS, 'fng_desc', BULL_DECISIONS)
+        + decision_table_rules(['not ma50 > ma200'], BEAR_ROWS, 'fng_desc', BEAR_DECISIONS)
+    ),
+    'default': CATCH_ALL_MSG,
+}
+SIIT_EVALUATOR = compile_rules(SIIT_RULES)
+
 def get_fng():
     fng = fear_and_greed.get()
     fng_value, fng_desc = int(round(fng[0])), fng[1]
     return fng_value, fng_desc
 
-def get_moving_averages(ticker):
-
-    ticker_data = yf.Ticker(ticker)
-    df = ticker_data.history(period='201d')
-
+def _moving_averages(df):
+    df = df.copy()
     df['50ma'] = df['Close'].rolling(window=50, center=False).mean()
     df['100ma'] = df['Close'].rolling(window=100, center=False).mean()
     df['200ma'] = df['Close'].rolling(window=200, center=False).mean()
@@ -119,77 +176,96 @@ def get_moving_averages(ticker):
     
     return (ma50, ma100, ma200)
 
+def get_moving_averages(ticker):
+    return get_market_context(ticker).moving_averages
+
+
+class MarketContext:
+    """
+    One snapshot of everything get_siit() and get_siit_debug() read for a ticker.
+
+    The price history and the Fear and Greed reading are fetched once when the
+    context is built; the latest close is the newest bar of the same history.
+    """
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self.history = yf.Ticker(ticker).history(period='201d')
+        self.moving_averages = _moving_averages(self.history)
+        self.fng_value, self.fng_desc = get_fng()
+        self.latest_close = self.history.iloc[-1]['Close']
+
+
+# contexts for the current run, cleared at the start of every main() call
+_market_contexts = {}
+_market_contexts_lock = threading.Lock()
+
+def get_market_context(ticker, refresh=False):
+    with _market_contexts_lock:
+        if refresh or ticker not in _market_contexts:
+            _market_contexts[ticker] = MarketContext(ticker)
+        return _market_contexts[ticker]
+
+def clear_market_contexts():
+    with _market_contexts_lock:
+        _market_contexts.clear()
+
 def is_between(price, num1, num2):
     lower_bound = min(num1, num2)
     upper_bound = max(num1, num2)
     return lower_bound < price < upper_bound
 
 def get_siit_debug(ticker):
-    ma50, ma100, ma200 = get_moving_averages(ticker)
-    fng_value, fng_desc = get_fng()
-    latest_close = yf.Ticker(ticker).history(period='1d').iloc[-1]['Close']
+    context = get_market_context(ticker)
+    ma50, ma100, ma200 = context.moving_averages
 
-    return (ma50, ma100, ma200, fng_value, fng_desc, latest_close)
+    return (ma50, ma100, ma200, context.fng_value, context.fng_desc, context.latest_close)
+
+def evaluate_siit(close, ma50, ma100, ma200, fng_desc):
+    # works on scalars or on whole arrays of closes, moving averages and fng descriptions
+    return SIIT_EVALUATOR({
+        'close': close,
+        'ma50': ma50,
+        'ma100': ma100,
+        'ma200': ma200,
+        'fng_desc': np.asarray(fng_desc, dtype=object),
+    })
 
 def get_siit(ticker):
 
-    ma50, ma100, ma200 = get_moving_averages(ticker)
-    fng_value, fng_desc = get_fng()
-    latest_close = yf.Ticker(ticker).history(period='1d').iloc[-1]['Close']
-
-    # determing to use bull or bear table:
-
-    bull = True
-
-    if ma50 > ma200:
-        # bull
-        decision_table = create_decision_tables()[0]
-    else:
-        # bear
-        bull = False
-        decision_table = create_decision_tables()[1]
-
-    catch_all = False
-    catch_all_msg = f'Should I invest today \U0001F52E:\nWait for a couple of days, let the market settle. \U0000E433'
-
-    if bull:
-        if latest_close < ma200:
-            row = '200ma'
-        elif is_between(latest_close, ma100, ma200):
-            row = '100ma'
-        elif is_between(latest_close, ma50, ma100):
-            row = '50ma'
-        elif latest_close > ma50:
-            row = '50ma+-'
-        else:
-            catch_all = True
-
-    else:
-        # bear
-        if latest_close < ma50:
-            row = '50ma+-'
-        elif is_between(latest_close, ma50, ma100):
-            row = '50ma'
-        elif is_between(latest_close, ma100, ma200):
-            row = '100ma'
-        elif latest_close < ma200:
-            row = '200ma'
-        else:
-            catch_all = True
-
-    if catch_all:
-        siit = catch_all_msg
-    else:
-        siit = decision_table.loc[row, fng_desc]
-
-    return siit
+    context = get_market_context(ticker)
+    ma50, ma100, ma200 = context.moving_averages
+
+    return evaluate_siit(context.latest_close, ma50, ma100, ma200, context.fng_desc)
+
 
+# one Bot per token, initialized once and reused across messages and warm
+# invocations. Its HTTP client belongs to the event loop it was initialized
+# on, so every send runs on the same long-lived loop.
+_bots = {}
+_loop = None
+_loop_lock = threading.Lock()
+
+def run_async(coro):
+    """Run a coroutine on the process-wide event loop, one caller at a time."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+        return _loop.run_until_complete(coro)
+
+async def get_bot(token):
+    bot = _bots.get(token)
+    if bot is None:
+        bot = telegram.Bot(token=token)
+        await bot.initialize()
+        _bots[token] = bot
+    return bot
 
 async def send_message(bot_name, chat_id, msg, parse_mode=None):
     token = access_secret(bot_name)
-    bot = telegram.Bot(token=token)
-    async with bot:
-        await bot.send_message(chat_id=chat_id, text=msg, parse_mode=parse_mode)
+    bot = await get_bot(token)
+    await bot.send_message(chat_id=chat_id, text=msg, parse_mode=parse_mode)
 
 async def send_photo(bot_name, chat_id, pic, filetype='obj', caption=None):
 
@@ -198,16 +274,14 @@ async def send_photo(bot_name, chat_id, pic, filetype='obj', caption=None):
         raise ValueError(f'send_photo: filetype must bu one of {valid}')
 
     token = access_secret(bot_name)
-    bot = telegram.Bot(token=token)
+    bot = await get_bot(token)
 
     if filetype == 'path':
         with open(pic, 'rb') as image_file:
-            async with bot:
-                await bot.send_photo(chat_id=chat_id, photo=image_file, caption=caption)
+            await bot.send_photo(chat_id=chat_id, photo=image_file, caption=caption)
 
     elif filetype == 'obj':
-        async with bot:
-            await bot.send_photo(chat_id=chat_id, photo=pic, caption=caption)
+        await bot.send_photo(chat_id=chat_id, photo=pic, caption=caption)
 
 # template main function
 def main(request):
@@ -218,9 +292,12 @@ def main(request):
     # which chat to send to
     chat_id = '@thefinancialchameleon'
 
+    # fetch fresh data once per run, shared by get_siit() and get_siit_debug()
+    clear_market_contexts()
+
     msg = get_siit('VOO')
 
-    asyncio.run(send_message(
+    run_async(send_message(
         bot_name=bot_name,
         chat_id=chat_id,
         msg=msg,
@@ -232,7 +309,7 @@ def main(request):
 
     debug_msg = f'VOO\nLatest Close: {latest_close}\nMA50: {ma50}\nMA100: {ma100}\nMA200: {ma200}\nFNG: {fng_value}\nFNG Desc: {fng_desc}\n\nSIIT: {msg}'
 
-    asyncio.run(send_message(
+    run_async(send_message(
         bot_name=debug_bot_name,
         chat_id=debug_chat_id,
         msg=debug_msg
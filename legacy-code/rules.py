@@ -0,0 +1,218 @@
+import operator
+import re
+from functools import reduce
+
+import numpy as np
+
+
+# A strategy is a dict {'rules': [...], 'default': output}. Each rule is
+# {'when': [condition, ...], 'then': output}; the first rule whose conditions
+# all hold decides the output, and 'default' applies when none do.
+#
+# A condition is either a string such as
+#     'fng_value < 40'                 feature against a number
+#     'close > ma200'                  feature against another feature
+#     'close between ma100 ma200'      strictly between two operands, either order
+#     "fng_desc in ('fear', 'greed')"  feature equals any listed operand
+#     'not ma50 > ma200'               negation, True wherever the condition is not
+# or a tuple (feature, op, value) whose value is always a literal, which is
+# convenient when building rules in code. NaN compares False, as in np.where().
+
+COMPARISONS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+OPERATORS = tuple(COMPARISONS) + ('between', 'in')
+
+_CONDITION = re.compile(r'^\s*(not\s+)?([A-Za-z_]\w*)\s*(<=|>=|==|!=|<|>|\bbetween\b|\bin\b)\s*(.+?)\s*$')
+_OPERAND = re.compile(r"'[^']*'|\"[^\"]*\"|-?\d+(?:\.\d+)?|[A-Za-z_]\w*")
+
+
+def _parse_operand(token):
+    if token[0] in '\'"':
+        return ('value', token[1:-1])
+    if token[0].isdigit() or token[0] == '-':
+        return ('value', float(token))
+    return ('feature', token)
+
+def _check_arity(condition, op, operands):
+    expected = {'between': 2}.get(op, 1)
+    if op == 'in' and not operands:
+        raise ValueError(f"Condition needs at least one operand: {condition!r}")
+    if op != 'in' and len(operands) != expected:
+        raise ValueError(f"Condition needs {expected} operand(s): {condition!r}")
+
+def parse_condition(condition) -> tuple:
+    """
+    Parse one condition into its canonical form.
+
+    Args:
+        condition (str or tuple): Condition string or (feature, op, value) tuple
+
+    Returns:
+        tuple: (negate, feature, op, operands), where each operand is
+               ('feature', name) or ('value', literal)
+
+    Raises:
+        ValueError: If the condition cannot be parsed
+    """
+    if isinstance(condition, tuple):
+        feature, op, value = condition
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator {op!r} in condition {condition!r}")
+        values = tuple(value) if op in ('between', 'in') else (value,)
+        operands = tuple(('value', v) for v in values)
+        _check_arity(condition, op, operands)
+        return (False, feature, op, operands)
+
+    match = _CONDITION.match(condition)
+    if match is None:
+        raise ValueError(f"Cannot parse condition {condition!r}")
+    negate, feature, op, rhs = match.groups()
+
+    tokens = _OPERAND.findall(rhs)
+    if _OPERAND.sub('', rhs).strip(' \t(),[]'):
+        raise ValueError(f"Cannot parse operands in condition {condition!r}")
+    operands = tuple(_parse_operand(token) for token in tokens)
+    _check_arity(condition, op, operands)
+
+    return (bool(negate), feature, op, operands)
+
+
+class CompiledRules:
+    """
+    Vectorized evaluator for a strategy.
+
+    Conditions shared between rules are evaluated once per call, and every rule
+    is applied to whole arrays, so one call covers any number of bars and tickers.
+    """
+
+    def __init__(self, strategy: dict):
+        conditions = []
+        self.rules = []
+        for rule in strategy['rules']:
+            indices = []
+            for condition in rule['when']:
+                parsed = parse_condition(condition)
+                if parsed not in conditions:
+                    conditions.append(parsed)
+                indices.append(conditions.index(parsed))
+            self.rules.append(tuple(indices))
+
+        self.conditions = conditions
+        self.outputs = np.empty(len(self.rules) + 1, dtype=object)
+        self.outputs[:] = [rule['then'] for rule in strategy['rules']] + [strategy.get('default')]
+
+        features = set()
+        for _, feature, _, operands in conditions:
+            features.add(feature)
+            features.update(name for kind, name in operands if kind == 'feature')
+        self.features = tuple(sorted(features))
+
+    def _evaluate_condition(self, condition, features) -> np.ndarray:
+        negate, feature, op, operands = condition
+        left = features[feature]
+        values = [features[name] if kind == 'feature' else name for kind, name in operands]
+
+        if op == 'between':
+            lower, upper = np.minimum(*values), np.maximum(*values)
+            result = (lower < left) & (left < upper)
+        elif op == 'in':
+            result = reduce(operator.or_, (left == value for value in values))
+        else:
+            result = COMPARISONS[op](left, values[0])
+
+        result = np.asarray(result, dtype=bool)
+        return ~result if negate else result
+
+    def rule_index(self, features: dict) -> np.ndarray:
+        """
+        Index of the first matching rule for every element, len(rules) where none match.
+
+        Args:
+            features (dict): Feature name -> array; arrays must broadcast together
+
+        Returns:
+            np.ndarray: Integer array of the broadcast shape
+        """
+        missing = [name for name in self.features if name not in features]
+        if missing:
+            raise KeyError(f"Missing features for rules: {missing}")
+
+        arrays = {name: np.asarray(features[name]) for name in self.features}
+        shape = np.broadcast_shapes(*(array.shape for array in arrays.values()))
+
+        with np.errstate(invalid='ignore'):
+            results = [np.broadcast_to(self._evaluate_condition(condition, arrays), shape)
+                       for condition in self.conditions]
+
+        index = np.full(shape, len(self.rules))
+        undecided = np.ones(shape, dtype=bool)
+        for i, rule in enumerate(self.rules):
+            matched = reduce(operator.and_, (results[c] for c in rule), undecided)
+            index[matched] = i
+            undecided &= ~matched
+            if not undecided.any():
+                break
+
+        return index
+
+    def evaluate(self, features: dict) -> np.ndarray:
+        """
+        Evaluate the strategy over whole arrays.
+
+        Args:
+            features (dict): Feature name -> array; arrays must broadcast together
+
+        Returns:
+            np.ndarray: Object array of outputs, in the broadcast shape
+        """
+        return self.outputs[self.rule_index(features)]
+
+    __call__ = evaluate
+
+
+def compile_rules(strategy: dict) -> CompiledRules:
+    """
+    Compile a declarative strategy into a vectorized evaluator.
+
+    Args:
+        strategy (dict): {'rules': [{'when': [...], 'then': output}, ...], 'default': output}
+
+    Returns:
+        CompiledRules: Callable taking a dict of feature arrays
+    """
+    return CompiledRules(strategy)
+
+def decision_table_rules(when, rows, column, table) -> list:
+    """
+    Expand a row x column decision table into rules.
+
+    Rows are tried in order; within a row, columns that share an output are
+    merged into one 'in' condition.
+
+    Args:
+        when (list): Conditions every rule of the table shares, e.g. the regime
+        rows (list): (row label, [conditions]) pairs in priority order
+        column (str): Categorical feature that selects the column
+        table (Mapping): (row label, column value) -> output
+
+    Returns:
+        list: Rules for a strategy's 'rules' list
+    """
+    rules = []
+    for label, conditions in rows:
+        by_output = {}
+        for (row, value), output in table.items():
+            if row == label:
+                by_output.setdefault(output, []).append(value)
+        for output, values in by_output.items():
+            rules.append({
+                'when': list(when) + list(conditions) + [(column, 'in', tuple(values))],
+                'then': output,
+            })
+    return rules
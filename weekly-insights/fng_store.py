@@ -0,0 +1,115 @@
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+
+# Cloud Functions only allow writes under /tmp, so default there
+CACHE_DIR = os.getenv('CHAMELEON_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'chameleon-cache'))
+FNG_STORE_PATH = os.path.join(CACHE_DIR, 'fng_history.csv')
+
+# CNN serves whatever history it has on or after this date
+FNG_BACKFILL_START = '2011-01-03'
+
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+
+def load_fng_points(store_path=FNG_STORE_PATH) -> pd.DataFrame:
+    """
+    Load stored end-of-day Fear and Greed points.
+
+    Args:
+        store_path (str): Path to the FNG store file
+
+    Returns:
+        pd.DataFrame: Columns ['x', 'y'] with x as epoch milliseconds, sorted by x
+    """
+    if not os.path.exists(store_path):
+        return pd.DataFrame({'x': pd.Series(dtype='int64'), 'y': pd.Series(dtype='float64')})
+
+    return pd.read_csv(store_path, dtype={'x': 'int64', 'y': 'float64'})
+
+def get_next_fetch_date(store_path=FNG_STORE_PATH):
+    """
+    Get the start date for the next delta fetch.
+
+    Args:
+        store_path (str): Path to the FNG store file
+
+    Returns:
+        str or None: 'YYYY-MM-DD' to pass to get_raw_historical_fng(), the
+                     backfill start if the store is empty, or None if the store
+                     already holds every settled day
+    """
+    points = load_fng_points(store_path)
+    if points.empty:
+        return FNG_BACKFILL_START
+
+    last_date = pd.to_datetime(points['x'].iloc[-1], unit='ms').date()
+    next_date = last_date + timedelta(days=1)
+
+    if next_date > datetime.now(timezone.utc).date():
+        return None
+
+    return next_date.strftime('%Y-%m-%d')
+
+def append_fng_points(raw_data: dict, store_path=FNG_STORE_PATH) -> int:
+    """
+    Append new end-of-day points from a CNN payload to the store.
+
+    Only points stamped at 00:00:00 UTC (the same rows process_fng() keeps) and
+    newer than the last stored point are written, so existing rows never change.
+
+    Args:
+        raw_data (dict): Raw JSON data from get_raw_historical_fng()
+        store_path (str): Path to the FNG store file
+
+    Returns:
+        int: Number of points appended
+    """
+    if not raw_data:
+        return 0
+
+    try:
+        historical_data = raw_data['fear_and_greed_historical']['data']
+    except KeyError as e:
+        print(f"Error parsing FNG data: {e}")
+        return 0
+
+    new_points = pd.DataFrame(historical_data, columns=['x', 'y'])
+    if new_points.empty:
+        return 0
+
+    new_points['x'] = new_points['x'].astype('int64')
+    new_points = new_points[new_points['x'] % MS_PER_DAY == 0]
+
+    stored_points = load_fng_points(store_path)
+    if not stored_points.empty:
+        new_points = new_points[new_points['x'] > stored_points['x'].iloc[-1]]
+
+    new_points = new_points.drop_duplicates(subset='x').sort_values('x')
+    if new_points.empty:
+        return 0
+
+    os.makedirs(os.path.dirname(store_path), exist_ok=True)
+    write_header = not os.path.exists(store_path)
+    new_points.to_csv(store_path, mode='a', header=write_header, index=False)
+
+    return len(new_points)
+
+def load_raw_fng(store_path=FNG_STORE_PATH) -> dict:
+    """
+    Load the stored history in the same shape as the CNN graphdata payload.
+
+    Args:
+        store_path (str): Path to the FNG store file
+
+    Returns:
+        dict: Payload accepted by process_fng(), or {} if the store is empty
+    """
+    points = load_fng_points(store_path)
+    if points.empty:
+        return {}
+
+    return {'fear_and_greed_historical': {'data': points.to_dict('records')}}
@@ -0,0 +1,126 @@
+import os
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from replay import RecordReplayAdapter, get_mode
+
+
+# Connections kept alive per host. Module-level state survives warm Cloud Function invocations.
+POOL_SIZE = int(os.getenv('CHAMELEON_HTTP_POOL_SIZE', '10'))
+
+# (connect, read) timeouts in seconds per host
+HOST_TIMEOUTS = {
+    'api.telegram.org': (3.05, 10),
+    'production.dataviz.cnn.io': (3.05, 15),
+}
+DEFAULT_TIMEOUT = (3.05, 30)
+
+# yfinance keeps its own process-wide curl_cffi session, so Yahoo calls only take a read timeout
+YAHOO_TIMEOUT = float(os.getenv('CHAMELEON_YAHOO_TIMEOUT', '15'))
+
+# Send a host's requests to another base URL, e.g. local stand-ins:
+# CHAMELEON_HTTP_OVERRIDES='api.telegram.org=http://127.0.0.1:8082,production.dataviz.cnn.io=http://127.0.0.1:8081'
+OVERRIDES_ENV = 'CHAMELEON_HTTP_OVERRIDES'
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Get the shared keep-alive session, creating it on first use.
+
+    Returns:
+        requests.Session: Session with a connection pool of POOL_SIZE per host
+    """
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                mode = get_mode()
+                if mode is None:
+                    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                else:
+                    adapter = RecordReplayAdapter(mode, pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+
+    return _session
+
+def reset_session() -> None:
+    """Close the shared session so the next request opens fresh connections."""
+    global _session
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def get_overrides() -> dict:
+    """
+    Get the host -> base URL overrides from the environment.
+
+    Returns:
+        dict: e.g. {'api.telegram.org': 'http://127.0.0.1:8082'}
+    """
+    overrides = {}
+    for entry in os.getenv(OVERRIDES_ENV, '').split(','):
+        if '=' in entry:
+            host, base_url = entry.split('=', 1)
+            overrides[host.strip()] = base_url.strip().rstrip('/')
+    return overrides
+
+def resolve_url(url) -> str:
+    """
+    Apply any host override to a URL, keeping its path and query.
+
+    Args:
+        url (str): Request URL
+
+    Returns:
+        str: The URL to actually request
+    """
+    parsed = urlparse(url)
+    base_url = get_overrides().get(parsed.hostname)
+    if base_url is None:
+        return url
+    return base_url + url[len(f'{parsed.scheme}://{parsed.netloc}'):]
+
+def get_timeout(url):
+    """
+    Get the (connect, read) timeout for a URL's host.
+
+    Args:
+        url (str): Request URL
+
+    Returns:
+        tuple: (connect, read) timeout in seconds
+    """
+    return HOST_TIMEOUTS.get(urlparse(url).hostname, DEFAULT_TIMEOUT)
+
+def request(method, url, **kwargs) -> requests.Response:
+    """
+    Send a request through the shared session with the host's default timeout.
+
+    Args:
+        method (str): HTTP method
+        url (str): Request URL
+        **kwargs: Passed through to requests.Session.request()
+
+    Returns:
+        requests.Response: The response
+    """
+    kwargs.setdefault('timeout', get_timeout(url))
+    return get_session().request(method, resolve_url(url), **kwargs)
+
+def get(url, **kwargs) -> requests.Response:
+    return request('GET', url, **kwargs)
+
+def post(url, **kwargs) -> requests.Response:
+    return request('POST', url, **kwargs)
@@ -1,30 +1,33 @@
 import requests
+import threading
+import time
 from datetime import datetime, timedelta
 
 # data manipulation packages
 import numpy as np
 import pandas as pd
 
-# financial imports
-import fear_and_greed
-import yfinance as yf
+import http_pool
+import market_data
+from kernel import compute_signal_frame, to_dates
+from signal_state import SIGNAL_STATE_PATH, load_signal_state
 
-# telegram - using requests for synchronous HTTP calls
+# telegram - using pooled requests sessions for synchronous HTTP calls
 
 
-def get_ticker_data(ticker) -> pd.DataFrame:
+def get_ticker_data(ticker, rows=202) -> pd.DataFrame:
     """
-    Get raw ticker data from yfinance.
+    Get raw ticker data from yfinance, served from the shared price cache.
     
     Args:
         ticker (str): Stock ticker symbol (e.g., 'VOO', 'AAPL')
+        rows (int): Number of trading days to return
         
     Returns:
         pd.DataFrame: Raw price data with OHLCV columns
     """
 
-    ticker_data = yf.Ticker(ticker)
-    return ticker_data.history(period='201d')
+    return market_data.get_prices(ticker, rows=rows)
 
 def get_raw_historical_fng(start_date=None, days_back=5) -> dict:
     """
@@ -54,7 +57,7 @@ def get_raw_historical_fng(start_date=None, days_back=5) -> dict:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }      
         
-        response = requests.get(url, headers=headers)
+        response = http_pool.get(url, headers=headers)
         response.raise_for_status()
         
         return response.json()
@@ -66,6 +69,52 @@ def get_raw_historical_fng(start_date=None, days_back=5) -> dict:
         print(f"Error parsing FNG data: {e}")
         return {}
 
+def get_stored_historical_fng() -> dict:
+    """
+    Get the full Fear and Greed Index history from the shared FNG store.
+    
+    The store is backfilled on first use and afterwards only the days it is
+    missing are requested from CNN.
+    
+    Returns:
+        dict: Raw JSON data in the same shape as get_raw_historical_fng()
+    """
+    return market_data.get_fng(fetch=lambda start_date: get_raw_historical_fng(start_date=start_date))
+
+# Rows the daily job keeps in the shared price cache, downloaded here only if
+# nothing is cached yet
+DAILY_HISTORY_ROWS = 202
+
+def get_weekly_data(ticker) -> pd.DataFrame:
+    """
+    Get weekly rows built from the daily indicators the daily runs stored.
+    
+    Prices are read from the shared cache without downloading. If the stored
+    rows are missing or end before the latest cached bar, the indicators are
+    computed here from the cached prices and FNG history and merged into the
+    stored rows; Yahoo is only called when no prices are cached at all.
+    
+    Args:
+        ticker (str): Stock ticker symbol
+        
+    Returns:
+        pd.DataFrame: Weekly rows from market_data.weekly_aggregates()
+    """
+    indicators = market_data.load_indicators(ticker)
+    ticker_df = market_data.load_stored_prices(ticker)
+    
+    latest_bar = to_dates(ticker_df.index[-1:])[0] if not ticker_df.empty else None
+    stored_through = to_dates(pd.to_datetime(indicators['date'])).max() if not indicators.empty else None
+    
+    if stored_through is None or (latest_bar is not None and stored_through < latest_bar):
+        print(f"Stored indicators for {ticker} end at {stored_through}, computing them from cached prices")
+        if ticker_df.empty:
+            ticker_df = get_ticker_data(ticker, rows=DAILY_HISTORY_ROWS)
+        market_data.save_indicators(ticker, compute_signal_frame(ticker_df, process_fng(get_stored_historical_fng())))
+        indicators = market_data.load_indicators(ticker)
+    
+    return market_data.weekly_aggregates(indicators)
+
 def process_fng(raw_data: dict) -> pd.DataFrame:
     """
     Process raw Fear and Greed Index data into a DataFrame.
@@ -259,25 +308,62 @@ def add_bull_bear(df: pd.DataFrame) -> pd.DataFrame:
     df_copy['bullbear'] = df_copy.apply(determine_sentiment, axis=1)
     return df_copy
 
-def access_secret(secret_name):
+# Secret Manager client and secret values are cached per warm instance
+SECRET_TTL_SECONDS = 60 * 60
+
+_secret_client = None
+_secret_cache = {}
+_secret_lock = threading.Lock()
+
+def get_secret_client():
+    """Get the shared SecretManagerServiceClient, creating it on first use."""
+    global _secret_client
 
     from google.cloud import secretmanager
 
+    with _secret_lock:
+        if _secret_client is None:
+            _secret_client = secretmanager.SecretManagerServiceClient()
+        return _secret_client
+
+def access_secret(secret_name, refresh=False):
+    """
+    Get a bot token from Secret Manager, served from the process-wide cache.
+    
+    Args:
+        secret_name (str): Bot name, e.g. 'financial-chameleon'
+        refresh (bool): If True, skip the cache and fetch the latest version
+        
+    Returns:
+        str: The secret value
+    """
+    cached = _secret_cache.get(secret_name)
+    if not refresh and cached is not None:
+        value, fetched_at = cached
+        if time.monotonic() - fetched_at < SECRET_TTL_SECONDS:
+            return value
+
     secret_dict = {
         'financial-chameleon': 'the-financial-chameleon-tele-bot',
         'trading-chameleon': 'the-trading-chameleon-tele-bot',
         'crypto-chameleon': 'the-crypto-chameleon-tele-bot'
     }
 
-    client = secretmanager.SecretManagerServiceClient()
+    client = get_secret_client()
     project_id = "the-financial-chameleon"
     secret_id = secret_dict[secret_name]
     name = f"projects/{project_id}/secrets/{secret_id}/versions/latest"
     response = client.access_secret_version(request={"name": name})
 
-    return response.payload.data.decode('UTF-8')
+    value = response.payload.data.decode('UTF-8')
+    _secret_cache[secret_name] = (value, time.monotonic())
+    return value
+
+def clear_secret_cache():
+    """Drop every cached secret so the next lookup goes to Secret Manager."""
+    _secret_cache.clear()
 
-def get_telebot_token(bot_name):
+def get_telebot_token(bot_name, refresh=False):
     import os
     
     # Check if running in GCP Cloud Functions (multiple environment variables indicate GCP)
@@ -286,7 +372,7 @@ def get_telebot_token(bot_name):
         os.getenv('K_SERVICE') or 
         os.getenv('GCLOUD_PROJECT')):
         # Running in GCP, use Secret Manager
-        return access_secret(bot_name)
+        return access_secret(bot_name, refresh=refresh)
     else:
         # Running locally, use environment variables
         from dotenv import load_dotenv
@@ -309,9 +395,6 @@ def get_telebot_token(bot_name):
         return token
 
 def send_message(bot_name, chat_id, msg, parse_mode=None):
-    token = get_telebot_token(bot_name)
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
-    
     data = {
         'chat_id': chat_id,
         'text': msg
@@ -320,7 +403,14 @@ def send_message(bot_name, chat_id, msg, parse_mode=None):
     if parse_mode:
         data['parse_mode'] = parse_mode
     
-    response = requests.post(url, data=data)
+    token = get_telebot_token(bot_name)
+    response = http_pool.post(f"https://api.telegram.org/bot{token}/sendMessage", data=data)
+    
+    # A rotated token shows up as 401, so fetch the latest version once and retry
+    if response.status_code == 401:
+        token = get_telebot_token(bot_name, refresh=True)
+        response = http_pool.post(f"https://api.telegram.org/bot{token}/sendMessage", data=data)
+    
     response.raise_for_status()
     return response.json()
 
@@ -365,27 +455,43 @@ def send_signal_change_message(bot_name, chat_id, current_signal, current_row, d
     # Send to main channel
     send_message(bot_name, chat_id, telegram_msg)
 
-def main(request=None):
-    """Cloud Function entry point and main logic"""
+def announced_this_week(ticker, week_row) -> bool:
+    """
+    Whether the daily check or intraday mode already announced a shift in the row's week.
     
-    # get raw data
-    raw_ticker_data = get_ticker_data('VOO')
-    raw_fng_data = get_raw_historical_fng()
+    Both post every shift to the main channel as it happens, so the weekly job
+    only announces a week-over-week shift that neither of them sent.
+    
+    Args:
+        ticker (str): Stock ticker symbol
+        week_row (pd.Series): Row from get_weekly_data()
+        
+    Returns:
+        bool: True if a shift dated within the week was announced
+    """
+    market_data.pull(SIGNAL_STATE_PATH)
+    state = load_signal_state(ticker)
+    
+    week_start = (week_row['week_ending'] - timedelta(days=6)).strftime('%Y-%m-%d')
+    announced = [state.get('announced_bar_date'), (state.get('early_alert') or {}).get('bar_date')]
+    return any(bar_date is not None and bar_date >= week_start for bar_date in announced)
 
-    # process data and get the last 2 complete rows
-    processed_data = process_data(raw_ticker_data, raw_fng_data)
+def main(request=None):
+    """Cloud Function entry point and main logic"""
     
-    # add signals to processed data
-    final_data = add_signal(processed_data)
+    # last two weeks, aggregated from the stored daily rows
+    final_data = get_weekly_data('VOO').tail(2)
     
     # Ensure we have exactly 2 rows for signal comparison
     if len(final_data) != 2:
-        raise ValueError(f"Expected exactly 2 rows for analysis, got {len(final_data)}")
+        raise ValueError(f"Expected exactly 2 weeks for analysis, got {len(final_data)}")
 
     # Check if signal changed between the two rows
     signals = final_data['signal'].tolist()
     if signals[0] == signals[1]:
         signal_change_msg = "Signal unchanged. No message sent to main channel.\n\n"
+    elif announced_this_week('VOO', final_data.iloc[1]):
+        signal_change_msg = f"Signal is {signals[1]}. The shift was already announced to main channel this week.\n\n"
     else:
         signal_change_msg = f"❗ Signal changed! Signal is now {signals[1]}. Update will be sent to main channel. ❗\n\n"
 
@@ -401,11 +507,11 @@ def main(request=None):
         )
     
     # Convert final_data to simple string for Telegram message
-    telegram_debug_msg = signal_change_msg + "═" * 15 + "\n\n" + f"📊 VOO Analysis ({len(final_data)} rows)\n\n"
+    telegram_debug_msg = signal_change_msg + "═" * 15 + "\n\n" + f"📊 VOO Weekly Analysis ({len(final_data)} weeks)\n\n"
     
     previous_close = None
     for _, row in final_data.iterrows():
-        telegram_debug_msg += f"Date: {row['date']}\n"
+        telegram_debug_msg += f"Week Ending: {row['week_ending']} (last bar {row['date']})\n"
         
         # Calculate percentage change for the second row
         if previous_close is not None:
@@ -420,6 +526,8 @@ def main(request=None):
         telegram_debug_msg += f"Sentiment: {row['bullbear']}\n"
         telegram_debug_msg += f"F&G: {row['fng_value']:.0f} ({row['rating']})\n"
         telegram_debug_msg += f"Signal: {row['signal']}\n"
+        telegram_debug_msg += f"Buy Days: {row['buy_days']}/{row['days']}\n"
+        telegram_debug_msg += f"Range: ${row['week_low']:.2f} - ${row['week_high']:.2f}\n"
         telegram_debug_msg += "─" * 15 + "\n"
         
         previous_close = row['Close']
@@ -446,7 +554,7 @@ def main(request=None):
             debug=True
         )
     
-    return "Daily check completed successfully"
+    return "Weekly insights completed successfully"
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,261 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import http_pool
+from http_pool import YAHOO_TIMEOUT
+from lazy import lazy_import
+from replay import recorded
+
+
+yf = lazy_import('yfinance')
+
+# Cloud Functions only allow writes under /tmp, so default there
+CACHE_DIR = os.getenv('CHAMELEON_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'chameleon-cache'))
+
+# Relative tolerance when checking cached adjusted prices against a fresh download
+PRICE_TOLERANCE = 1e-6
+
+# yfinance's chart endpoint. yfinance cannot be pointed elsewhere, so when this
+# host has an http_pool override (a local stand-in) the chart JSON is fetched
+# and parsed here instead.
+YAHOO_CHART_URL = 'https://query2.finance.yahoo.com'
+
+
+def get_cache_path(ticker) -> str:
+    """
+    Get the Parquet file path holding cached history for a ticker.
+
+    Args:
+        ticker (str): Stock ticker symbol (e.g., 'VOO', '^GSPC')
+
+    Returns:
+        str: Absolute path to the ticker's cache file
+    """
+    safe_name = ticker.replace(os.sep, '_').replace('/', '_')
+    return os.path.join(CACHE_DIR, f'{safe_name}.parquet')
+
+def load_cached_history(ticker) -> pd.DataFrame:
+    """
+    Load cached OHLCV history for a ticker.
+
+    Args:
+        ticker (str): Stock ticker symbol
+
+    Returns:
+        pd.DataFrame: Cached history, or an empty DataFrame if nothing is cached
+    """
+    path = get_cache_path(ticker)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+
+    try:
+        return pd.read_parquet(path)
+    except (OSError, ValueError) as e:
+        print(f"Error reading price cache for {ticker}: {e}")
+        return pd.DataFrame()
+
+def save_cached_history(ticker, history_df: pd.DataFrame) -> None:
+    """
+    Write OHLCV history for a ticker to the cache, replacing any previous file.
+
+    Args:
+        ticker (str): Stock ticker symbol
+        history_df (pd.DataFrame): History in the same shape as yf.Ticker.history()
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = get_cache_path(ticker)
+
+    # Write to a temp file first so a crash never leaves a half-written cache
+    tmp_path = f'{path}.tmp'
+    history_df.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+def invalidate_cache(ticker) -> None:
+    """
+    Remove the cached history for a ticker.
+
+    Args:
+        ticker (str): Stock ticker symbol
+    """
+    path = get_cache_path(ticker)
+    if os.path.exists(path):
+        os.remove(path)
+
+def _prices_shifted(cached_df: pd.DataFrame, fresh_df: pd.DataFrame) -> bool:
+    """
+    Check whether adjusted prices changed since the cache was written.
+
+    yfinance back-adjusts the whole history after a split or dividend, so any
+    mismatch on a settled overlapping bar, or a corporate action the cache has
+    not seen yet, means the cached bars are stale.
+    """
+    # The newest cached bar may have been captured mid-session, so skip it
+    settled = cached_df.index[:-1].intersection(fresh_df.index)
+    if settled.empty:
+        return True
+
+    cached_close = cached_df.loc[settled, 'Close'].to_numpy(dtype=float)
+    fresh_close = fresh_df.loc[settled, 'Close'].to_numpy(dtype=float)
+    if not np.allclose(cached_close, fresh_close, rtol=PRICE_TOLERANCE, atol=0):
+        return True
+
+    for column in ('Dividends', 'Stock Splits'):
+        if column not in fresh_df.columns:
+            continue
+        fresh_events = fresh_df[column].fillna(0)
+        cached_events = cached_df[column].reindex(fresh_df.index).fillna(0)
+        if (fresh_events != cached_events).any():
+            return True
+
+    return False
+
+def _history_from_chart(payload: dict) -> pd.DataFrame:
+    """
+    Convert a v8 chart payload into the shape of yf.Ticker.history().
+
+    Prices are taken as served; the stand-in serves them already adjusted.
+    """
+    result = payload['chart']['result'][0]
+    timezone = result['meta']['exchangeTimezoneName']
+    index = pd.to_datetime(result.get('timestamp', []), unit='s', utc=True).tz_convert(timezone).normalize()
+    index.name = 'Date'
+
+    quote = result['indicators']['quote'][0]
+    history_df = pd.DataFrame(
+        {
+            'Open': quote.get('open', []),
+            'High': quote.get('high', []),
+            'Low': quote.get('low', []),
+            'Close': quote.get('close', []),
+            'Volume': quote.get('volume', []),
+        },
+        index=index,
+        dtype=float,
+    )
+
+    events = result.get('events', {})
+    dividends = {event['date']: event['amount'] for event in events.get('dividends', {}).values()}
+    splits = {event['date']: event['numerator'] / event['denominator'] for event in events.get('splits', {}).values()}
+    seconds = index.tz_convert('UTC').asi8 // 10**9
+    history_df['Dividends'] = [dividends.get(day, 0.0) for day in seconds]
+    history_df['Stock Splits'] = [splits.get(day, 0.0) for day in seconds]
+
+    return history_df.dropna(subset=['Close'])
+
+def _download_history(ticker, period=None, start=None) -> pd.DataFrame:
+    if http_pool.resolve_url(YAHOO_CHART_URL) != YAHOO_CHART_URL:
+        params = {'interval': '1d', 'events': 'div,splits'}
+        if period is not None:
+            params['range'] = period
+        else:
+            params['period1'] = int(pd.Timestamp(start, tz='UTC').timestamp())
+            params['period2'] = int(pd.Timestamp.now(tz='UTC').timestamp())
+
+        response = http_pool.get(f'{YAHOO_CHART_URL}/v8/finance/chart/{ticker}', params=params, timeout=YAHOO_TIMEOUT)
+        response.raise_for_status()
+        return _history_from_chart(response.json())
+
+    if period is not None:
+        return yf.Ticker(ticker).history(period=period, timeout=YAHOO_TIMEOUT)
+    return yf.Ticker(ticker).history(start=start, timeout=YAHOO_TIMEOUT)
+
+def fetch_history(ticker, period=None, start=None) -> pd.DataFrame:
+    """
+    Download daily history from Yahoo, through the record/replay layer.
+
+    Args:
+        ticker (str): Stock ticker symbol
+        period (str, optional): yfinance period string, e.g. '202d'
+        start (str, optional): 'YYYY-MM-DD' first date, used when period is None
+
+    Returns:
+        pd.DataFrame: The same shape as yf.Ticker(ticker).history()
+    """
+    key = f'{ticker} period={period} start={start}'
+    return recorded('yahoo', key, lambda: _download_history(ticker, period=period, start=start))
+
+def _download_minute_bars(ticker, since=None) -> pd.Series:
+    if http_pool.resolve_url(YAHOO_CHART_URL) != YAHOO_CHART_URL:
+        params = {'interval': '1m'}
+        if since is None:
+            params['range'] = '1d'
+        else:
+            params['period1'] = int(since) + 1
+            params['period2'] = int(pd.Timestamp.now(tz='UTC').timestamp())
+
+        response = http_pool.get(f'{YAHOO_CHART_URL}/v8/finance/chart/{ticker}', params=params, timeout=YAHOO_TIMEOUT)
+        response.raise_for_status()
+        result = response.json()['chart']['result'][0]
+        seconds = np.asarray(result.get('timestamp', []), dtype=np.int64)
+        close = np.asarray(result['indicators']['quote'][0].get('close', []), dtype=float)
+    else:
+        history_df = yf.Ticker(ticker).history(period='1d', interval='1m', timeout=YAHOO_TIMEOUT)
+        seconds = history_df.index.tz_convert('UTC').asi8 // 10**9
+        close = history_df['Close'].to_numpy(dtype=float)
+
+    bars = pd.Series(close, index=seconds, name='Close').dropna()
+    if since is not None:
+        bars = bars[bars.index > since]
+    return bars
+
+def fetch_minute_bars(ticker, since=None) -> pd.Series:
+    """
+    Download the current session's one-minute closes from Yahoo.
+
+    Args:
+        ticker (str): Stock ticker symbol
+        since (int, optional): Epoch seconds of the last bar already seen; only
+                               newer bars are returned
+
+    Returns:
+        pd.Series: Closes indexed by bar start in epoch seconds, oldest first
+    """
+    key = f'{ticker} interval=1m since={since}'
+    return recorded('yahoo', key, lambda: _download_minute_bars(ticker, since=since))
+
+def get_cached_history(ticker, rows=202, refresh=False) -> pd.DataFrame:
+    """
+    Get the latest daily OHLCV history for a ticker, downloading only missing bars.
+
+    The first call downloads the full window. Later calls download from the
+    second-to-last cached bar onwards: the older overlapping bar is used to detect
+    adjusted-price shifts, and the newest cached bar is replaced in case it was
+    captured before the session closed.
+
+    Args:
+        ticker (str): Stock ticker symbol
+        rows (int): Number of trading days to return, same as period=f'{rows}d'
+        refresh (bool): If True, ignore the cache and download the full window
+
+    Returns:
+        pd.DataFrame: The same shape as yf.Ticker(ticker).history(period=f'{rows}d')
+    """
+    cached_df = pd.DataFrame() if refresh else load_cached_history(ticker)
+
+    # Callers ask for different windows (202 for the signal, 399 for a chart),
+    # so the cache keeps the longest one instead of shrinking to each request
+    keep_rows = max(rows, len(cached_df))
+
+    if len(cached_df) >= max(rows, 2):
+        start = cached_df.index[-2].strftime('%Y-%m-%d')
+        fresh_df = fetch_history(ticker, start=start)
+
+        if fresh_df.empty:
+            return cached_df.tail(rows)
+
+        if not _prices_shifted(cached_df, fresh_df):
+            merged_df = pd.concat([cached_df[cached_df.index < fresh_df.index[0]], fresh_df])
+            merged_df = merged_df[~merged_df.index.duplicated(keep='last')].sort_index()
+            save_cached_history(ticker, merged_df.tail(keep_rows))
+            return merged_df.tail(rows)
+
+        print(f"Adjusted prices shifted for {ticker}, refreshing price cache")
+
+    history_df = fetch_history(ticker, period=f'{keep_rows}d')
+    if not history_df.empty:
+        save_cached_history(ticker, history_df)
+
+    return history_df.tail(rows)
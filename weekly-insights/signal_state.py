@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+
+# Cloud Functions only allow writes under /tmp, so default there
+CACHE_DIR = os.getenv('CHAMELEON_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'chameleon-cache'))
+SIGNAL_STATE_PATH = os.getenv('CHAMELEON_SIGNAL_STATE_PATH', os.path.join(CACHE_DIR, 'signal_state.json'))
+
+MARKET_TIMEZONE = ZoneInfo('America/New_York')
+
+# A session's daily bar is final once the market has closed
+MARKET_CLOSE_HOUR = 16
+
+# Closes and FNG points hashed to detect revised inputs for an already evaluated bar
+HASH_CLOSE_ROWS = 203
+HASH_FNG_POINTS = 5
+
+# Bots run in parallel threads under runner.py and share one state file
+_state_lock = threading.Lock()
+
+
+def load_signal_state(ticker, state_path=SIGNAL_STATE_PATH) -> dict:
+    """
+    Load the persisted signal state for a ticker.
+
+    Args:
+        ticker (str): Stock ticker symbol
+        state_path (str): Path to the state file
+
+    Returns:
+        dict: 'bar_date', 'signal', 'input_hash', 'announced_bar_date' and
+              'checked_session', or {} if the ticker has no state yet
+    """
+    if not os.path.exists(state_path):
+        return {}
+
+    try:
+        with open(state_path) as f:
+            return json.load(f).get(ticker, {})
+    except (OSError, ValueError) as e:
+        print(f"Error reading signal state: {e}")
+        return {}
+
+def save_signal_state(ticker, state: dict, state_path=SIGNAL_STATE_PATH) -> None:
+    """
+    Write a ticker's signal state, keeping every other ticker's record.
+
+    Args:
+        ticker (str): Stock ticker symbol
+        state (dict): Record from load_signal_state(), updated
+        state_path (str): Path to the state file
+    """
+    with _state_lock:
+        records = {}
+        if os.path.exists(state_path):
+            try:
+                with open(state_path) as f:
+                    records = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error reading signal state, starting a new file: {e}")
+
+        records[ticker] = state
+
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+        tmp_path = f'{state_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(records, f, indent=2)
+        os.replace(tmp_path, state_path)
+
+def get_expected_session_date(now=None) -> str:
+    """
+    Get the latest weekday whose session has closed in New York.
+
+    Exchange holidays are not known here, so on a holiday this date has no bar;
+    the caller finds that out from the data and records the session as checked.
+
+    Args:
+        now (datetime, optional): Current time, timezone-aware. Defaults to now.
+
+    Returns:
+        str: Session date in 'YYYY-MM-DD' format
+    """
+    now = (now or datetime.now(MARKET_TIMEZONE)).astimezone(MARKET_TIMEZONE)
+
+    session = now.date()
+    if now.hour < MARKET_CLOSE_HOUR:
+        session -= timedelta(days=1)
+    while session.weekday() >= 5:
+        session -= timedelta(days=1)
+
+    return session.strftime('%Y-%m-%d')
+
+def is_session_checked(state: dict, session_date) -> bool:
+    """True if a previous run already evaluated or confirmed there is no bar for the session."""
+    if not state:
+        return False
+    return max(state.get('bar_date') or '', state.get('checked_session') or '') >= session_date
+
+def get_latest_bar_date(ticker_df: pd.DataFrame) -> str:
+    """Date of the newest bar in raw ticker data, as 'YYYY-MM-DD'."""
+    return pd.Timestamp(ticker_df.index[-1]).strftime('%Y-%m-%d')
+
+def hash_inputs(ticker_df: pd.DataFrame, raw_fng_data: dict) -> str:
+    """
+    Hash the raw inputs that decide the latest signal.
+
+    Covers enough closes for the 200-day average of the compared rows and the
+    newest FNG points, so a revised close or a late FNG value changes the hash.
+
+    Args:
+        ticker_df (pd.DataFrame): Raw ticker data from get_ticker_data()
+        raw_fng_data (dict): Raw FNG payload
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+
+    closes = ticker_df['Close'].tail(HASH_CLOSE_ROWS)
+    digest.update(closes.index.strftime('%Y-%m-%d').str.cat().encode())
+    digest.update(np.round(closes.to_numpy(dtype=float), 6).tobytes())
+
+    points = (raw_fng_data or {}).get('fear_and_greed_historical', {}).get('data', [])
+    digest.update(json.dumps(points[-HASH_FNG_POINTS:], sort_keys=True).encode())
+
+    return digest.hexdigest()